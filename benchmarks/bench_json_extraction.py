@@ -0,0 +1,74 @@
+"""Microbenchmarks for pulling the answer JSON out of large model responses.
+
+Compares the previous greedy ``\\{.*\\}`` regex + ``json.loads`` approach with
+``extract_json_object`` on synthetic responses of growing size, including
+responses with trailing commentary and truncated output.
+
+Usage:
+    python -m benchmarks.bench_json_extraction --items 100 1000 10000
+"""
+import argparse
+import json
+import re
+import timeit
+from typing import Any, Dict, Optional
+
+from src.utils.json_parsing import extract_json_object
+
+def make_response(items: int) -> str:
+    """Synthetic response: prose, a fenced JSON answer, then commentary with braces"""
+    answer = {
+        "variants": [
+            {
+                "name": f"KRAS p.G{i}D",
+                "type": "mutation",
+                "drugs": ["bortezomib", "lenalidomide"],
+                "evidence_level": "B",
+                "references": [f"PMID:{1000 + i}"]
+            }
+            for i in range(items)
+        ],
+        "clinical_evidence": [],
+        "molecular_data": []
+    }
+    return (
+        "Here is the structured analysis you asked for:\n```json\n"
+        + json.dumps(answer, indent=2)
+        + "\n```\nNote: entries marked {uncertain} need manual review; see {Table 2}."
+    )
+
+def regex_extract(content: str) -> Optional[Dict[str, Any]]:
+    """The previous approach; fails when commentary after the JSON contains braces"""
+    match = re.search(r'\{.*\}', content, re.DOTALL)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group())
+    except json.JSONDecodeError:
+        return None
+
+def bench(label: str, func, content: str, repeat: int) -> float:
+    seconds = min(timeit.repeat(lambda: func(content), number=1, repeat=repeat))
+    return seconds * 1000
+
+def main(sizes, repeat: int):
+    print(f"{'items':>8} {'chars':>10} {'case':>10} {'regex ms':>10} {'ok':>4} {'extract ms':>11} {'ok':>4}")
+    for items in sizes:
+        response = make_response(items)
+        truncated = response[:int(len(response) * 0.9)]
+        for case, content in (("complete", response), ("truncated", truncated)):
+            regex_ok = regex_extract(content) is not None
+            candidate = extract_json_object(content)
+            extract_ok = candidate is not None and bool(candidate.value.get("variants"))
+            print(
+                f"{items:>8} {len(content):>10} {case:>10} "
+                f"{bench('regex', regex_extract, content, repeat):>10.2f} {'yes' if regex_ok else 'no':>4} "
+                f"{bench('extract', extract_json_object, content, repeat):>11.2f} {'yes' if extract_ok else 'no':>4}"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.items, args.repeat)
@@ -0,0 +1,60 @@
+"""Measure LLMProcessor throughput against a local fake Messages API.
+
+With a truly non-blocking transport, throughput should grow roughly linearly
+with concurrency until the fixed server latency is fully overlapped.
+
+Usage:
+    python -m benchmarks.bench_llm_concurrency --requests 64 --latency 0.2
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import List
+
+from src.extractors.llm_processor import LLMProcessor
+from .fake_anthropic_server import FakeAnthropicServer
+
+async def run_level(processor: LLMProcessor, requests: int, concurrency: int) -> float:
+    """Send ``requests`` analyses with at most ``concurrency`` in flight; return req/s"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_request(i: int):
+        async with semaphore:
+            await processor.analyze_text(text=f"Sample text {i}", prompt="Benchmark prompt")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request(i) for i in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+async def main(requests: int, latency: float, levels: List[int], use_async_client: bool):
+    async with FakeAnthropicServer(latency=latency) as server:
+        processor = LLMProcessor(
+            api_key="benchmark",
+            base_url=server.base_url,
+            use_async_client=use_async_client,
+            executor_workers=max(levels)
+        )
+        processor.logger.setLevel(logging.WARNING)
+
+        transport = "async client" if processor.async_client is not None else "executor"
+        print(f"Transport: {transport}, server latency: {latency * 1000:.0f} ms, requests: {requests}")
+        print(f"{'concurrency':>12} {'req/s':>10} {'speedup':>10}")
+
+        baseline = None
+        for level in levels:
+            throughput = await run_level(processor, requests, level)
+            baseline = baseline or throughput
+            print(f"{level:>12} {throughput:>10.1f} {throughput / baseline:>9.1f}x")
+
+        if processor.async_client is not None:
+            await processor.async_client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--executor", action="store_true", help="Force the executor-backed transport")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency, args.levels, not args.executor))
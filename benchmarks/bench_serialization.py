@@ -0,0 +1,98 @@
+"""Encode/decode throughput of CivicExtraction on a large synthetic corpus.
+
+Compares the fast path (``to_json``/``from_json``, orjson when installed,
+with and without validation on decode) with the previous stdlib
+``json.dump(..., default=str)`` output path and pydantic's
+``model_dump_json``/``model_validate_json``. Decoded extractions are kept
+alive, as when loading a corpus, so garbage collection is part of the cost.
+
+Usage:
+    python -m benchmarks.bench_serialization --papers 200 2000 --items 50
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+
+from src.models.data_models import CivicExtraction, SourceReference
+from src.utils import serialization
+
+def make_corpus(papers: int, items: int):
+    """``papers`` extractions with ``items`` variants and evidence items each"""
+    corpus = []
+    for paper in range(papers):
+        variants = [{
+            "description": f"KRAS G{i}D",
+            "variant_type": "missense",
+            "significance": "resistance",
+            "frequency": "12%",
+            "drugs": ["bortezomib", "lenalidomide"],
+            "evidence_level": "B",
+            "molecular_effect": "gain of function",
+            "clinical_relevance": "predictive",
+            "resistance_mechanisms": [],
+            "biomarker_status": "positive",
+            "confidence": 0.71,
+            "citations": [f"PMID:{30000000 + i}"]
+        } for i in range(items)]
+        evidence = [{
+            "description": "Response: partial response",
+            "evidence_type": "Response",
+            "drugs": ["daratumumab"],
+            "trial_phase": "III",
+            "patient_population": f"cohort {i}",
+            "confidence": 0.6
+        } for i in range(items)]
+        corpus.append(CivicExtraction(
+            variants=variants,
+            clinical_evidence=evidence,
+            source=SourceReference(path=f"paper_{paper}.pdf", content_hash="0" * 64, page_spans=[(0, 4000)] * 12),
+            metadata={"timestamp": str(datetime.now()), "confidence_scores": {"overall": 0.7}}
+        ))
+    return corpus
+
+def timed(fn, corpus):
+    start = time.perf_counter()
+    result = [fn(extraction) for extraction in corpus]
+    return result, time.perf_counter() - start
+
+def main(sizes, items):
+    backend = "orjson" if serialization.orjson is not None else "stdlib json"
+    print(f"fast path backend: {backend}")
+    print(f"{'papers':>7} {'method':<29} {'MB':>7} {'encode s':>9} {'decode s':>9} {'MB/s enc':>9} {'MB/s dec':>9}")
+    for papers in sizes:
+        corpus = make_corpus(papers, items)
+        methods = {
+            "to_json / from_json": (
+                lambda e: e.to_json(),
+                CivicExtraction.from_json
+            ),
+            "to_json / from_json(trusted)": (
+                lambda e: e.to_json(),
+                lambda data: CivicExtraction.from_json(data, validate=False)
+            ),
+            "json.dumps(default=str)": (
+                lambda e: json.dumps(e.model_dump(), indent=2, default=str).encode("utf-8"),
+                lambda data: CivicExtraction.model_validate(json.loads(data))
+            ),
+            "model_dump_json": (
+                lambda e: e.model_dump_json(),
+                CivicExtraction.model_validate_json
+            )
+        }
+        for name, (encode, decode) in methods.items():
+            encoded, encode_time = timed(encode, corpus)
+            decoded, decode_time = timed(decode, encoded)
+            assert decoded == corpus, f"{name} does not round-trip"
+            megabytes = sum(len(data) for data in encoded) / 1e6
+            print(
+                f"{papers:>7} {name:<29} {megabytes:>7.1f} {encode_time:>9.3f} {decode_time:>9.3f} "
+                f"{megabytes / encode_time:>9.1f} {megabytes / decode_time:>9.1f}"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, nargs="+", default=[200, 2000])
+    parser.add_argument("--items", type=int, default=50)
+    args = parser.parse_args()
+    main(args.papers, args.items)
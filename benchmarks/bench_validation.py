@@ -0,0 +1,50 @@
+"""Throughput of DataValidator on large historical corpora.
+
+Builds synthetic extractions whose items mostly pass the rules, with a
+share of missing and mistyped fields, and times ``validate_extractions``.
+
+Usage:
+    python -m benchmarks.bench_validation --items 10000 100000 500000
+"""
+import argparse
+import time
+
+from src.models.data_models import CivicExtraction
+from src.utils.validators import DataValidator
+
+def make_corpus(items: int, per_paper: int = 50):
+    """Extractions holding ``items`` variants in total; every 10th item is broken"""
+    extractions = []
+    for start in range(0, items, per_paper):
+        variants = []
+        for i in range(start, min(items, start + per_paper)):
+            variant = {
+                "description": f"KRAS G{i}D",
+                "variant_type": "mutation",
+                "significance": "resistance",
+                "confidence": 0.8,
+                "drugs": ["bortezomib"]
+            }
+            if i % 10 == 0:
+                variant["significance"] = ""
+                variant["confidence"] = "high"
+            variants.append(variant)
+        extractions.append(CivicExtraction(variants=variants))
+    return extractions
+
+def main(sizes):
+    validator = DataValidator()
+    print(f"{'items':>8} {'papers':>7} {'failures':>9} {'seconds':>8} {'items/s':>11}")
+    for items in sizes:
+        corpus = make_corpus(items)
+        start = time.perf_counter()
+        failures = validator.check_extractions(corpus)
+        elapsed = time.perf_counter() - start
+        total = sum(len(paper) for paper in failures)
+        print(f"{items:>8} {len(corpus):>7} {total:>9} {elapsed:>8.3f} {items / elapsed:>11.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[10000, 100000, 500000])
+    args = parser.parse_args()
+    main(args.items)
@@ -0,0 +1,97 @@
+"""Minimal local stand-in for the Anthropic Messages API used by benchmarks.
+
+Every ``POST /v1/messages`` request is answered with a canned message after a
+fixed delay, so throughput measured against it reflects how well the client
+overlaps in-flight requests rather than real model latency.
+"""
+import asyncio
+import json
+from typing import Optional
+
+DEFAULT_RESPONSE_TEXT = json.dumps({
+    "variants": [{"name": "KRAS G12D", "type": "mutation", "evidence_level": "B"}],
+    "clinical_evidence": [],
+    "molecular_data": []
+})
+
+class FakeAnthropicServer:
+    """Asyncio HTTP/1.1 server that mimics ``/v1/messages``"""
+
+    def __init__(self, latency: float = 0.2, response_text: str = DEFAULT_RESPONSE_TEXT):
+        self.latency = latency
+        self.response_text = response_text
+        self.request_count = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections = set()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self) -> "FakeAnthropicServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "FakeAnthropicServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _message_body(self) -> bytes:
+        return json.dumps({
+            "id": f"msg_fake_{self.request_count}",
+            "type": "message",
+            "role": "assistant",
+            "model": "claude-3-opus-20240229",
+            "content": [{"type": "text", "text": self.response_text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 10, "output_tokens": 10}
+        }).encode()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                content_length = 0
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    if name.strip().lower() == "content-length":
+                        content_length = int(value.strip())
+                if content_length:
+                    await reader.readexactly(content_length)
+
+                self.request_count += 1
+                await asyncio.sleep(self.latency)
+
+                body = self._message_body()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+                    b"\r\n" + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
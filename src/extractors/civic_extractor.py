@@ -1,17 +1,38 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterable, AsyncIterator, List, Callable, Hashable, Optional, Tuple
+import asyncio
+import json
 import logging
 from datetime import datetime
 from tqdm import tqdm
+from ..models.confidence import ConfidenceCalculator
 from ..models.data_models import CivicExtraction
 from ..utils.logger import setup_logger
+from .text_chunker import TextChunker, TextChunk
 
 class CivicExtractor:
-    def __init__(self, llm_processor):
+    def __init__(
+        self,
+        llm_processor,
+        chunker: Optional[TextChunker] = None,
+        max_concurrent_chunks: int = 4,
+        stream_responses: bool = False,
+        keep_raw_text: bool = True
+    ):
         self.llm_processor = llm_processor
+        self.chunker = chunker or TextChunker()
+        self.max_concurrent_chunks = max(1, max_concurrent_chunks)
+        self.stream_responses = stream_responses
+        # When False, extractions carry only a SourceReference set by the caller
+        self.keep_raw_text = keep_raw_text
+        self.cleaners = {
+            "variants": self._clean_variant_data,
+            "clinical_evidence": self._clean_clinical_evidence,
+            "molecular_data": self._clean_molecular_data
+        }
         self.logger = setup_logger(__name__)
         self.logger.info("🧬 Initializing CIVIC Extractor")
 
-    def _clean_variant_data(self, variant: Dict[str, Any]) -> Dict[str, Any]:
+    def _clean_variant_data(self, variant: Dict[str, Any], confidence: Optional[float] = None) -> Dict[str, Any]:
         """Enhanced variant data cleaning"""
         return {
             "description": variant.get("name", ""),
@@ -24,7 +45,7 @@ class CivicExtractor:
             "clinical_relevance": variant.get("clinical_relevance", ""),
             "resistance_mechanisms": variant.get("resistance_mechanisms", []),  # Added
             "biomarker_status": variant.get("biomarker_status", ""),  # Added
-            "confidence": self._calculate_confidence(variant),
+            "confidence": self._calculate_confidence(variant) if confidence is None else confidence,
             "citations": variant.get("references", [])  # Added
         }
 
@@ -45,35 +66,25 @@ class CivicExtractor:
 
     def _calculate_confidence(self, data: Dict[str, Any]) -> float:
         """Enhanced confidence calculation"""
-        score = 0.0
-        required_fields = [
-            "name", "type", "significance", "evidence_level", 
-            "molecular_effect", "clinical_relevance"
-        ]
-        
-        # Check completeness
-        completeness = sum(1 for field in required_fields if data.get(field)) / len(required_fields)
-        
-        # Evidence level weighting
-        evidence_weights = {
-            "A": 1.0,  # Multiple high-quality trials
-            "B": 0.8,  # Single high-quality trial
-            "C": 0.6,  # Multiple lower-quality studies
-            "D": 0.4   # Case reports or expert opinion
-        }
-        evidence_score = evidence_weights.get(data.get("evidence_level", "").upper(), 0.2)
-        
-        # Supporting data weight
-        supporting_data = len(data.get("supporting_data", []))
-        support_score = min(1.0, supporting_data / 3)  # Normalize to max of 1.0
-        
-        # Calculate weighted score
-        score = (completeness * 0.3) + (evidence_score * 0.5) + (support_score * 0.2)
-        return round(min(1.0, score), 2)
-
-
+        return float(ConfidenceCalculator.score_variants([data])[0])
 
+    def _clean_section(self, section: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Clean all items of one section; variant confidences are scored in one batch"""
+        items = [item for item in items if isinstance(item, dict)]
+        if section != "variants":
+            return [self._keep_react_context(item, self.cleaners[section](item)) for item in items]
+        scores = ConfidenceCalculator.score_variants(items)
+        return [
+            self._keep_react_context(item, self._clean_variant_data(item, confidence=float(score)))
+            for item, score in zip(items, scores)
+        ]
 
+    @staticmethod
+    def _keep_react_context(item: Dict[str, Any], cleaned: Dict[str, Any]) -> Dict[str, Any]:
+        """Carry an item's resolved ReACT context over to its cleaned form"""
+        if isinstance(item.get("react_context"), dict):
+            cleaned["react_context"] = item["react_context"]
+        return cleaned
 
     def _clean_molecular_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Clean and standardize molecular data"""
@@ -86,6 +97,215 @@ class CivicExtractor:
             "confidence": data.get("confidence", 0.0)
         }
 
+    @staticmethod
+    def _normalize_key(value: Any) -> str:
+        """Case- and whitespace-insensitive key component"""
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, sort_keys=True, default=str).lower()
+        return " ".join(str(value or "").split()).lower()
+
+    def _variant_key(self, variant: Dict[str, Any]) -> Optional[Hashable]:
+        name = self._normalize_key(variant.get("description"))
+        if not name:
+            return None
+        return (name, self._normalize_key(variant.get("variant_type")))
+
+    def _evidence_key(self, evidence: Dict[str, Any]) -> Optional[Hashable]:
+        # The cleaned description is "<type>: <outcome>", so it is never empty
+        evidence_type = str(evidence.get("evidence_type") or "")
+        outcome = str(evidence.get("description") or "").removeprefix(f"{evidence_type}: ")
+        if not self._normalize_key(evidence_type) and not self._normalize_key(outcome):
+            return None
+        return (
+            self._normalize_key(evidence.get("description")),
+            self._normalize_key(sorted(self._normalize_key(d) for d in evidence.get("drugs", []))),
+            self._normalize_key(evidence.get("patient_population"))
+        )
+
+    def _molecular_key(self, data: Dict[str, Any]) -> Optional[Hashable]:
+        # Checked on the pathway itself; the description is "Pathway: <pathway>"
+        pathway = self._normalize_key(data.get("pathway"))
+        return (pathway,) if pathway else None
+
+    @staticmethod
+    def _merge_values(existing: Any, new: Any) -> Any:
+        """Combine two values of the same field from duplicate items"""
+        if isinstance(existing, list) and isinstance(new, list):
+            merged = list(existing)
+            merged.extend(item for item in new if item not in existing)
+            return merged
+        if isinstance(existing, (int, float)) and isinstance(new, (int, float)):
+            return max(existing, new)
+        return existing if existing not in (None, "", [], {}) else new
+
+    def _deduplicate(
+        self,
+        items: List[Dict[str, Any]],
+        key_fn: Callable[[Dict[str, Any]], Optional[Hashable]]
+    ) -> List[Dict[str, Any]]:
+        """Merge items that describe the same entity, preserving first-seen order.
+
+        ``key_fn`` returns None for items whose source fields name nothing
+        (no variant name, evidence type or outcome, or pathway); those
+        cannot be told apart and are all kept.
+        """
+        merged: Dict[Hashable, Dict[str, Any]] = {}
+        for index, item in enumerate(items):
+            key = key_fn(item)
+            if key is None:
+                key = (None, index)
+            if key not in merged:
+                merged[key] = dict(item)
+                continue
+            target = merged[key]
+            for field, value in item.items():
+                target[field] = self._merge_values(target.get(field), value)
+        return list(merged.values())
+
+    async def stream_civic_items(
+        self,
+        text: str,
+        status: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(section, cleaned_item)`` pairs while the model is still generating.
+
+        ``status["error"]`` is set when the request could not be made.
+        """
+        async for section, item in self.llm_processor.stream_analysis(
+            text=text,
+            prompt=self.llm_processor.prompt_templates.VARIANT_ANALYSIS,
+            status=status
+        ):
+            if section in self.cleaners and isinstance(item, dict):
+                yield section, self._keep_react_context(item, self.cleaners[section](item))
+
+    async def _analyze_chunk(self, chunk: TextChunk) -> Dict[str, Any]:
+        """Analyze one chunk and return its cleaned items per section"""
+        self.logger.debug(
+            f"Analyzing chunk {chunk.index + 1} "
+            f"(characters {chunk.start}-{chunk.end})"
+        )
+        if not self.stream_responses:
+            analysis = await self.llm_processor.analyze_text(
+                text=chunk.text,
+                prompt=self.llm_processor.prompt_templates.VARIANT_ANALYSIS
+            )
+            # Block indices are only meaningful within this chunk's response
+            self.llm_processor.resolve_react_contexts(analysis)
+            cleaned = {
+                section: self._clean_section(section, analysis.get(section, []))
+                for section in self.cleaners
+            }
+            if analysis.get("error"):
+                cleaned["error"] = analysis["error"]
+            return cleaned
+        
+        # Clean items as they stream in; keep what arrived if the stream breaks
+        cleaned = {section: [] for section in self.cleaners}
+        status: Dict[str, Any] = {}
+        try:
+            async for section, item in self.stream_civic_items(chunk.text, status):
+                cleaned[section].append(item)
+            if status.get("error"):
+                cleaned["error"] = status["error"]
+        except Exception as e:
+            self.logger.warning(
+                f"⚠️ Chunk {chunk.index + 1} interrupted; keeping "
+                f"{sum(len(items) for items in cleaned.values())} streamed items"
+            )
+            cleaned["error"] = str(e)
+        return cleaned
+
+    async def _analyze_chunks(self, chunks: List[TextChunk]) -> List[Dict[str, Any]]:
+        """Run the variant analysis prompt over all chunks concurrently"""
+        semaphore = asyncio.Semaphore(self.max_concurrent_chunks)
+
+        async def analyze(chunk: TextChunk) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._analyze_chunk(chunk)
+
+        return await asyncio.gather(*(analyze(chunk) for chunk in chunks))
+
+    def _build_extraction(
+        self,
+        analyses: List[Dict[str, Any]],
+        num_chunks: int,
+        text_length: int,
+        start_time: datetime,
+        raw_text: Optional[str] = None,
+        progress: Optional[tqdm] = None
+    ) -> CivicExtraction:
+        """Reduce cleaned per-chunk results into a single extraction"""
+        failed_chunks = sum(1 for analysis in analyses if analysis.get("error"))
+        
+        # Reduce: merge duplicates across chunks
+        variants = self._deduplicate([
+            variant
+            for analysis in analyses
+            for variant in analysis['variants']
+        ], self._variant_key)
+        if progress is not None:
+            progress.update(1)
+        
+        # Process clinical evidence
+        clinical_evidence = self._deduplicate([
+            evidence
+            for analysis in analyses
+            for evidence in analysis['clinical_evidence']
+        ], self._evidence_key)
+        if progress is not None:
+            progress.update(1)
+        
+        # Process molecular data
+        molecular_data = self._deduplicate([
+            data
+            for analysis in analyses
+            for data in analysis['molecular_data']
+        ], self._molecular_key)
+        if progress is not None:
+            progress.update(1)
+        
+        # Calculate confidence scores
+        confidence_scores = {
+            "variants": sum(v["confidence"] for v in variants) / len(variants) if variants else 0.0,
+            "clinical": sum(e["confidence"] for e in clinical_evidence) / len(clinical_evidence) if clinical_evidence else 0.0,
+            "molecular": sum(m["confidence"] for m in molecular_data) / len(molecular_data) if molecular_data else 0.0
+        }
+        confidence_scores["overall"] = sum(confidence_scores.values()) / len(confidence_scores)
+        
+        # Create extraction object
+        return CivicExtraction(
+            variants=variants,
+            clinical_evidence=clinical_evidence,
+            molecular_data=molecular_data,
+            raw_text=raw_text,
+            metadata={
+                "timestamp": str(datetime.now()),
+                "source": "claude-3-opus-20240229",
+                "text_length": text_length,
+                "processing_time": (datetime.now() - start_time).total_seconds(),
+                "validation_status": "processed",
+                "confidence_scores": confidence_scores,
+                "num_chunks": num_chunks,
+                "failed_chunks": failed_chunks
+            }
+        )
+
+    def _failed_extraction(self, text_length: int) -> CivicExtraction:
+        """Empty extraction returned when processing fails"""
+        return CivicExtraction(
+            metadata={
+                "timestamp": str(datetime.now()),
+                "source": "claude-3-opus-20240229",
+                "text_length": text_length,
+                "processing_time": 0.0,
+                "validation_status": "failed",
+                # Set only here; validation may rewrite ``validation_status``
+                "extraction_failed": True,
+                "confidence_scores": {"overall": 0.0}
+            }
+        )
+
     async def extract_civic_data(self, text: str) -> CivicExtraction:
         """Extract CIVIC data with improved structure and validation"""
         try:
@@ -95,57 +315,78 @@ class CivicExtractor:
             # Initialize progress bar
             progress = tqdm(total=5, desc="Extracting CIVIC data")
             
-            # Get analysis from LLM
-            self.logger.info("🤖 Sending text to LLM for analysis")
-            analysis = await self.llm_processor.analyze_text(
-                text=text,
-                prompt=self.llm_processor.prompt_templates.VARIANT_ANALYSIS
-            )
+            # Map: split into token-budgeted chunks and analyze them concurrently
+            chunks = self.chunker.split(text)
+            self.logger.info(f"🤖 Sending {len(chunks)} chunk(s) to LLM for analysis")
+            analyses = await self._analyze_chunks(chunks)
             progress.update(1)
             
-            # Process variants with better structure
-            variants = [
-                self._clean_variant_data(variant) 
-                for variant in analysis.get('variants', [])
-            ]
+            extraction = self._build_extraction(
+                analyses,
+                num_chunks=len(chunks),
+                text_length=len(text),
+                start_time=start_time,
+                raw_text=text if self.keep_raw_text else None,
+                progress=progress
+            )
             progress.update(1)
             
-            # Process clinical evidence
-            clinical_evidence = [
-                self._clean_clinical_evidence(evidence) 
-                for evidence in analysis.get('clinical_evidence', [])
-            ]
-            progress.update(1)
+            self.logger.info(f"✅ Extraction completed successfully")
+            progress.close()
             
-            # Process molecular data
-            molecular_data = [
-                self._clean_molecular_data(data) 
-                for data in analysis.get('molecular_data', [])
-            ]
-            progress.update(1)
+            return extraction
+
+        except Exception as e:
+            self.logger.error(f"❌ Extraction failed: {str(e)}", exc_info=True)
+            if 'progress' in locals():
+                progress.close()
+            return self._failed_extraction(len(text))
+
+    async def extract_civic_data_incremental(self, pages: AsyncIterable[str]) -> CivicExtraction:
+        """Extract CIVIC data from a page stream, starting LLM work before parsing ends.
+
+        Chunks are dispatched as soon as they fill up. Page consumption pauses
+        while ``max_concurrent_chunks`` requests are in flight, so memory stays
+        bounded by the chunk budget rather than the document size. The full
+        text is never assembled, so ``raw_text`` is left empty. Errors raised
+        by the page source (e.g. an unreadable PDF) propagate to the caller.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_chunks)
+        tasks: List[asyncio.Task] = []
+        text_length = 0
+        
+        async def analyze(chunk: TextChunk) -> Dict[str, Any]:
+            try:
+                return await self._analyze_chunk(chunk)
+            finally:
+                semaphore.release()
+        
+        async def dispatch(chunks: List[TextChunk]):
+            for chunk in chunks:
+                await semaphore.acquire()
+                tasks.append(asyncio.create_task(analyze(chunk)))
+        
+        try:
+            start_time = datetime.now()
+            self.logger.info("🔍 Starting incremental CIVIC data extraction")
+            progress = tqdm(total=5, desc="Extracting CIVIC data")
             
-            # Calculate confidence scores
-            confidence_scores = {
-                "variants": sum(v["confidence"] for v in variants) / len(variants) if variants else 0.0,
-                "clinical": sum(e["confidence"] for e in clinical_evidence) / len(clinical_evidence) if clinical_evidence else 0.0,
-                "molecular": sum(m["confidence"] for m in molecular_data) / len(molecular_data) if molecular_data else 0.0
-            }
-            confidence_scores["overall"] = sum(confidence_scores.values()) / len(confidence_scores)
+            stream = self.chunker.stream()
+            async for page in pages:
+                text_length += len(page)
+                await dispatch(stream.feed(page))
+            await dispatch(stream.finish())
+            
+            self.logger.info(f"🤖 Dispatched {len(tasks)} chunk(s) to LLM for analysis")
+            analyses = await asyncio.gather(*tasks)
+            progress.update(1)
             
-            # Create extraction object
-            extraction = CivicExtraction(
-                variants=variants,
-                clinical_evidence=clinical_evidence,
-                molecular_data=molecular_data,
-                raw_text=text,
-                metadata={
-                    "timestamp": str(datetime.now()),
-                    "source": "claude-3-opus-20240229",
-                    "text_length": len(text),
-                    "processing_time": (datetime.now() - start_time).total_seconds(),
-                    "validation_status": "processed",
-                    "confidence_scores": confidence_scores
-                }
+            extraction = self._build_extraction(
+                analyses,
+                num_chunks=len(tasks),
+                text_length=text_length,
+                start_time=start_time,
+                progress=progress
             )
             progress.update(1)
             
@@ -154,17 +395,10 @@ class CivicExtractor:
             
             return extraction
 
-        except Exception as e:
+        except BaseException as e:
             self.logger.error(f"❌ Extraction failed: {str(e)}", exc_info=True)
+            for task in tasks:
+                task.cancel()
             if 'progress' in locals():
                 progress.close()
-            return CivicExtraction(
-                metadata={
-                    "timestamp": str(datetime.now()),
-                    "source": "claude-3-opus-20240229",
-                    "text_length": len(text),
-                    "processing_time": 0.0,
-                    "validation_status": "failed",
-                    "confidence_scores": {"overall": 0.0}
-                }
-            )
\ No newline at end of file
+            raise
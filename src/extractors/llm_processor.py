@@ -1,42 +1,115 @@
 from anthropic import Anthropic
 import asyncio
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, AsyncIterator, Optional, Tuple
 import logging
 import os
 import json
-import re
 from tqdm import tqdm
 from ..utils.logger import setup_logger
+from ..utils.cache import ResponseCache
+from ..utils.rate_limiter import RateLimiter
+from ..utils.token_budget import RequestPlanner, record_usage
+from ..utils.json_parsing import IncrementalItemParser, extract_json_object
 from ..prompts.prompt_templates import PromptTemplates
 
+try:
+    from anthropic import AsyncAnthropic
+except ImportError:  # Older SDKs only ship the synchronous client
+    AsyncAnthropic = None
+
 class LLMProcessor:
-    def __init__(self):
-        self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        use_async_client: bool = True,
+        executor_workers: int = 32,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        planner: Optional[RequestPlanner] = None,
+        keep_raw_text: bool = True
+    ):
+        client_kwargs = {"api_key": api_key or os.getenv("ANTHROPIC_API_KEY")}
+        if base_url:
+            client_kwargs["base_url"] = base_url
+        
+        self.client = Anthropic(**client_kwargs)
         self.model = "claude-3-opus-20240229"
+        self.planner = planner or RequestPlanner(self.model)
         self.prompt_templates = PromptTemplates()
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        # Keep the model's unparsed reply under ``raw_text`` in text fallbacks
+        self.keep_raw_text = keep_raw_text
         self.logger = setup_logger(__name__)
         self.logger.info("🤖 Initializing LLM Processor")
         
+        # Prefer the SDK's native async client; otherwise run the blocking
+        # client in a dedicated thread pool so requests still overlap
+        if use_async_client and AsyncAnthropic is not None:
+            self.async_client = AsyncAnthropic(**client_kwargs)
+            self._executor = None
+        else:
+            self.async_client = None
+            self._executor = ThreadPoolExecutor(
+                max_workers=executor_workers,
+                thread_name_prefix="llm-request"
+            )
+            self.logger.info(f"Using executor-backed transport ({executor_workers} workers)")
+        
         # Configure retry parameters
         self.max_retries = 3
         self.base_delay = 1  # Base delay in seconds
 
+    async def _create_message(self, **kwargs) -> Any:
+        """Send a messages request without blocking the event loop"""
+        if self.async_client is not None:
+            return await self.async_client.messages.create(**kwargs)
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            partial(self.client.messages.create, **kwargs)
+        )
+
     async def analyze_text(
         self,
         text: str,
         prompt: str,
-        max_tokens: int = 4000
+        max_tokens: int = 4000,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """Analyze text using Claude with robust response handling and retries"""
+        # Oversize requests can never succeed, so they are not retried
+        plan = self.planner.plan(prompt, text, max_tokens)
+        if not plan.fits:
+            return self._reject_oversize(plan)
+        
+        # Keyed by the output limit actually sent, not the one requested
+        cache_key = None
+        if self.cache is not None and use_cache and not self.cache.bypass:
+            cache_key = ResponseCache.make_key(self.model, prompt, plan.max_tokens, text)
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                self.logger.info("💾 Using cached Claude response")
+                return await self._process_content(cached)
+        
         for attempt in range(self.max_retries):
             try:
                 self.logger.info(f"📤 Sending request to Claude (attempt {attempt + 1})")
                 self.logger.debug(f"Text length: {len(text)} characters")
                 self.logger.debug(f"Prompt preview: {prompt[:100]}...")
 
-                response = self.client.messages.create(
+                # Reserve quota for the input plus the largest possible output
+                estimated_tokens = plan.input_tokens + plan.max_tokens
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire(estimated_tokens)
+
+                response = await self._create_message(
                     model=self.model,
-                    max_tokens=max_tokens,
+                    max_tokens=plan.max_tokens,
                     messages=[{
                         "role": "user",
                         "content": f"{prompt}\n\nText to analyze:\n{text}"
@@ -44,6 +117,18 @@ class LLMProcessor:
                 )
                 
                 self.logger.info("📥 Received response from Claude")
+                usage = getattr(response, "usage", None)
+                record_usage(self.planner, plan, None if usage is None else {
+                    "input_tokens": usage.input_tokens,
+                    "output_tokens": usage.output_tokens
+                })
+                if self.rate_limiter is not None and usage is not None:
+                    self.rate_limiter.reconcile(
+                        estimated_tokens,
+                        usage.input_tokens + usage.output_tokens
+                    )
+                if cache_key is not None and self._is_complete(getattr(response, "stop_reason", None)):
+                    await self._store_in_cache(cache_key, response.content[0].text)
                 return await self._process_response(response)
                 
             except Exception as e:
@@ -58,50 +143,208 @@ class LLMProcessor:
                     self.logger.error("❌ All retry attempts failed")
                     return self._create_fallback_response()
 
+    @staticmethod
+    def _is_complete(stop_reason: Optional[str]) -> bool:
+        """False for responses cut off by the output limit, which must not be cached"""
+        return stop_reason != "max_tokens"
+
+    async def _stream_text(self, usage: Dict[str, Any], **kwargs) -> AsyncIterator[str]:
+        """Yield response text deltas as they arrive, recording token usage and the stop reason"""
+        if self.async_client is None:
+            # The executor transport cannot stream; deliver the whole text at once
+            response = await self._create_message(**kwargs)
+            if getattr(response, "usage", None) is not None:
+                usage["input_tokens"] = response.usage.input_tokens
+                usage["output_tokens"] = response.usage.output_tokens
+            usage["stop_reason"] = getattr(response, "stop_reason", None)
+            yield response.content[0].text
+            return
+
+        stream = await self.async_client.messages.create(stream=True, **kwargs)
+        async for event in stream:
+            if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                yield event.delta.text
+            elif event.type == "message_start":
+                usage["input_tokens"] = event.message.usage.input_tokens
+            elif event.type == "message_delta":
+                if getattr(event, "usage", None) is not None:
+                    usage["output_tokens"] = event.usage.output_tokens
+                if getattr(event, "delta", None) is not None:
+                    usage["stop_reason"] = getattr(event.delta, "stop_reason", None)
+
+    async def stream_analysis(
+        self,
+        text: str,
+        prompt: str,
+        max_tokens: int = 4000,
+        use_cache: bool = True,
+        status: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Stream an analysis, yielding ``(section, item)`` as each array element completes.
+
+        Attempts are retried only while nothing has been yielded. Once items
+        have reached the caller, an interrupted stream raises so the caller
+        can keep the partial results instead of receiving duplicates. A
+        request too large for the model yields nothing and, like the
+        fallback of ``analyze_text``, sets ``status["error"]``.
+        """
+        sections = ("variants", "clinical_evidence", "molecular_data")
+        plan = self.planner.plan(prompt, text, max_tokens)
+        if not plan.fits:
+            rejected = self._reject_oversize(plan)
+            if status is not None:
+                status["error"] = rejected["error"]
+            return
+        
+        cache_key = None
+        if self.cache is not None and use_cache and not self.cache.bypass:
+            cache_key = ResponseCache.make_key(self.model, prompt, plan.max_tokens, text)
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                self.logger.info("💾 Using cached Claude response")
+                parser = IncrementalItemParser(sections)
+                emitted = 0
+                for item in parser.feed(cached):
+                    emitted += 1
+                    yield item
+                if not emitted:
+                    async for item in self._fallback_items(cached, sections):
+                        yield item
+                return
+        
+        for attempt in range(self.max_retries):
+            parser = IncrementalItemParser(sections)
+            emitted = 0
+            try:
+                self.logger.info(f"📤 Streaming request to Claude (attempt {attempt + 1})")
+                
+                # Reserve quota for the input plus the largest possible output
+                estimated_tokens = plan.input_tokens + plan.max_tokens
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire(estimated_tokens)
+                
+                usage = {"input_tokens": 0, "output_tokens": 0}
+                async for delta in self._stream_text(
+                    usage,
+                    model=self.model,
+                    max_tokens=plan.max_tokens,
+                    messages=[{
+                        "role": "user",
+                        "content": f"{prompt}\n\nText to analyze:\n{text}"
+                    }]
+                ):
+                    for item in parser.feed(delta):
+                        emitted += 1
+                        yield item
+                
+                self.logger.info(f"📥 Stream finished with {emitted} items")
+                record_usage(self.planner, plan, usage if usage["input_tokens"] else None)
+                if self.rate_limiter is not None and usage["input_tokens"]:
+                    self.rate_limiter.reconcile(
+                        estimated_tokens,
+                        usage["input_tokens"] + usage["output_tokens"]
+                    )
+                content = parser.text
+                if cache_key is not None and self._is_complete(usage.get("stop_reason")):
+                    await self._store_in_cache(cache_key, content)
+                
+                # Responses the parser got nothing out of (no JSON, other keys,
+                # malformed items) go through the regular text fallback
+                if not emitted:
+                    async for item in self._fallback_items(content, sections):
+                        yield item
+                return
+                
+            except Exception as e:
+                if emitted:
+                    self.logger.error(f"❌ Stream interrupted after {emitted} items: {str(e)}")
+                    raise
+                delay = self.base_delay * (2 ** attempt)  # Exponential backoff
+                self.logger.warning(
+                    f"⚠️ Attempt {attempt + 1} failed: {str(e)}. "
+                    f"Retrying in {delay} seconds..."
+                )
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(delay)
+                else:
+                    self.logger.error("❌ All retry attempts failed")
+                    raise
+
+    async def _fallback_items(
+        self, content: str, sections: Tuple[str, ...]
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Items of a response parsed the non-streaming way"""
+        structured = self.resolve_react_contexts(await self._process_content(content))
+        for section in sections:
+            for item in structured.get(section, []):
+                yield section, item
+
+    async def _store_in_cache(self, key: str, content: str):
+        """Cache a response; a cache failure must never cost another API call"""
+        try:
+            await asyncio.to_thread(self.cache.put, key, content)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Failed to cache response: {str(e)}")
+
     async def _process_response(self, response: Any) -> Dict[str, Any]:
         """Process Claude response with enhanced validation"""
+        return await self._process_content(response.content[0].text)
+
+    async def _process_content(self, content: str) -> Dict[str, Any]:
+        """Parse the text of a Claude response into structured data"""
         try:
             self.logger.info("🔍 Processing Claude response")
-            content = response.content[0].text
             self.logger.debug(f"Raw response preview: {content[:200]}...")
             
-            # Try to extract JSON from the response
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            if json_match:
-                self.logger.info("Found JSON structure in response")
-                try:
-                    return json.loads(json_match.group())
-                except json.JSONDecodeError:
-                    self.logger.warning("JSON parsing failed, falling back to text processing")
-                    return await self._clean_and_structure_response(content)
-            else:
+            # Find the answer object in a single bracket-balanced pass
+            candidate = extract_json_object(content)
+            if candidate is None:
                 self.logger.info("No JSON found, processing as text")
                 return await self._clean_and_structure_response(content)
+            
+            self.logger.info("Found JSON structure in response")
+            if candidate.repaired:
+                self.logger.warning("⚠️ Response was truncated; recovered the complete items")
+                candidate.value["truncated"] = True
+            return candidate.value
                 
         except Exception as e:
             self.logger.error(f"❌ Error processing response: {str(e)}", exc_info=True)
             return await self._clean_and_structure_response(content)
 
     async def _clean_and_structure_response(self, text: str) -> Dict[str, Any]:
-        """Convert text response into structured format with validation"""
+        """Convert text response into structured format with validation.
+
+        Lines are parsed in one pass with a small state machine over the
+        ReACT blocks. Block lines are stored once under ``react_blocks``;
+        each item records in ``react_context`` how many lines of every block
+        existed when it was seen, so no block text is copied per item. Use
+        ``resolve_react_context`` to materialize an item's blocks.
+        """
         self.logger.info("📝 Structuring text response")
         
         # Remove markdown formatting
         cleaned_text = text.replace("```json", "").replace("```", "").strip()
         
         # Initialize sections
+        react_blocks = {"reasoning": [], "action": [], "conclusion": []}
         structured_data = {
             "variants": [],
             "clinical_evidence": [],
             "molecular_data": [],
-            "raw_text": cleaned_text
+            "react_blocks": react_blocks
         }
+        if self.keep_raw_text:
+            structured_data["raw_text"] = cleaned_text
         
         # Parse text using ReACT approach
-        current_section = None
-        reasoning_block = []
-        action_block = []
-        conclusion_block = []
+        current_block = None
+        reasoning = react_blocks["reasoning"]
+        action = react_blocks["action"]
+        conclusion = react_blocks["conclusion"]
+        variants = structured_data["variants"]
+        clinical_evidence = structured_data["clinical_evidence"]
+        molecular_data = structured_data["molecular_data"]
         
         self.logger.debug("Parsing text sections using ReACT methodology")
         for line in cleaned_text.split('\n'):
@@ -111,42 +354,33 @@ class LLMProcessor:
                 
             # Identify ReACT blocks
             if "REASON" in line:
-                current_section = "reasoning"
+                current_block = reasoning
             elif "ACTION" in line:
-                current_section = "action"
+                current_block = action
             elif "CONCLUDE" in line:
-                current_section = "conclusion"
-            elif current_section:
-                # Add content to appropriate block
-                if current_section == "reasoning":
-                    reasoning_block.append(line)
-                elif current_section == "action":
-                    action_block.append(line)
-                elif current_section == "conclusion":
-                    conclusion_block.append(line)
+                current_block = conclusion
+            elif current_block is not None:
+                current_block.append(line)
             
-            # Identify and categorize content
-            if "variant" in line.lower() or "mutation" in line.lower():
-                structured_data["variants"].append({
-                    "description": line,
-                    "reasoning": "\n".join(reasoning_block),
-                    "action": "\n".join(action_block),
-                    "conclusion": "\n".join(conclusion_block)
-                })
-            elif "clinical" in line.lower() or "evidence" in line.lower():
-                structured_data["clinical_evidence"].append({
-                    "description": line,
-                    "reasoning": "\n".join(reasoning_block),
-                    "action": "\n".join(action_block),
-                    "conclusion": "\n".join(conclusion_block)
-                })
-            elif "molecular" in line.lower() or "pathway" in line.lower():
-                structured_data["molecular_data"].append({
-                    "description": line,
-                    "reasoning": "\n".join(reasoning_block),
-                    "action": "\n".join(action_block),
-                    "conclusion": "\n".join(conclusion_block)
-                })
+            # Identify and categorize content (lower-case each line once)
+            lowered = line.lower()
+            if "variant" in lowered or "mutation" in lowered:
+                target = variants
+            elif "clinical" in lowered or "evidence" in lowered:
+                target = clinical_evidence
+            elif "molecular" in lowered or "pathway" in lowered:
+                target = molecular_data
+            else:
+                continue
+            
+            target.append({
+                "description": line,
+                "react_context": {
+                    "reasoning": len(reasoning),
+                    "action": len(action),
+                    "conclusion": len(conclusion)
+                }
+            })
 
         self.logger.info(
             f"✅ Structured response created with "
@@ -157,6 +391,41 @@ class LLMProcessor:
 
         return structured_data
 
+    @staticmethod
+    def resolve_react_context(structured_data: Dict[str, Any], item: Dict[str, Any]) -> Dict[str, str]:
+        """Return the reasoning/action/conclusion text an item was seen with"""
+        blocks = structured_data.get("react_blocks", {})
+        context = item.get("react_context", {})
+        return {
+            name: "\n".join(blocks.get(name, [])[:context.get(name, 0)])
+            for name in ("reasoning", "action", "conclusion")
+        }
+
+    @classmethod
+    def resolve_react_contexts(cls, structured_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace every item's ``react_context`` indices with its block text, in place.
+
+        Needed before items of several responses are merged, since the
+        indices point into each response's own ``react_blocks``.
+        """
+        if "react_blocks" not in structured_data:
+            return structured_data
+        for section in ("variants", "clinical_evidence", "molecular_data"):
+            for item in structured_data.get(section, []):
+                if isinstance(item, dict) and "react_context" in item:
+                    item["react_context"] = cls.resolve_react_context(structured_data, item)
+        return structured_data
+
+    def _reject_oversize(self, plan) -> Dict[str, Any]:
+        """Fallback for a request that cannot fit the model context"""
+        self.logger.error(
+            f"❌ Request of ~{plan.input_tokens} tokens leaves no room for output in the "
+            f"{self.planner.limits.context_window}-token context of {self.model}; not sending"
+        )
+        response = self._create_fallback_response()
+        response["error"] = "Request exceeds model context window"
+        return response
+
     def _create_fallback_response(self) -> Dict[str, Any]:
         """Create a fallback response when analysis fails"""
         self.logger.warning("⚠️ Creating fallback response")
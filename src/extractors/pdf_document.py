@@ -0,0 +1,187 @@
+from PyPDF2 import PdfReader
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, TYPE_CHECKING
+from ..models.data_models import SourceReference
+from ..utils.cache import PDFTextCache
+
+if TYPE_CHECKING:
+    from .pdf_processor import PDFProcessor
+
+class PDFDocument:
+    """A PDF opened once; text, pages and metadata are computed lazily.
+
+    The underlying ``PdfReader`` is created on first use and shared by every
+    accessor, so asking for both text and metadata parses the file once.
+    Page text honours the owning processor's text cache and worker pool.
+    """
+
+    METADATA_FIELDS = {
+        "title": "/Title",
+        "author": "/Author",
+        "subject": "/Subject",
+        "keywords": "/Keywords",
+        "creator": "/Creator",
+        "producer": "/Producer",
+        "creation_date": "/CreationDate"
+    }
+
+    def __init__(self, pdf_path: str, processor: "PDFProcessor"):
+        self.path = str(pdf_path)
+        self.processor = processor
+        self.logger = processor.logger
+        self._reader: Optional[PdfReader] = None
+        self._content_hash: Optional[str] = None
+        self._pages: Optional[List[str]] = None
+        self._metadata: Optional[Dict[str, Any]] = None
+        # Lengths of the pages yielded so far by iter_pages
+        self._page_lengths: List[int] = []
+
+    @property
+    def reader(self) -> PdfReader:
+        if self._reader is None:
+            self._reader = PdfReader(self.path)
+        return self._reader
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of the file contents"""
+        if self._content_hash is None:
+            self._content_hash = PDFTextCache.hash_file(self.path)
+        return self._content_hash
+
+    @property
+    def page_count(self) -> int:
+        return len(self.reader.pages)
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Document information dictionary, empty if it cannot be read"""
+        if self._metadata is None:
+            try:
+                info = self.reader.metadata or {}
+                self._metadata = {
+                    field: info.get(key, "") for field, key in self.METADATA_FIELDS.items()
+                }
+            except Exception as e:
+                self.logger.error(f"Error extracting metadata: {str(e)}")
+                self._metadata = {}
+        return self._metadata
+
+    @property
+    def pages(self) -> List[str]:
+        """Per-page text, reusing cached text for identical files"""
+        if self._pages is None:
+            try:
+                cache = self.processor.text_cache
+                version = self.processor.extractor_version
+                pages = None
+                if cache is not None:
+                    pages = cache.get(self.content_hash, version)
+                    if pages is not None:
+                        self.logger.info(f"Using cached text for {self.path}")
+                if pages is None:
+                    pages = self.processor._parse_pages(self.path, self.reader)
+                    if cache is not None:
+                        cache.put(self.content_hash, version, pages)
+
+                self.logger.info(f"Successfully extracted text from {self.path}")
+                self._pages = pages
+            except Exception as e:
+                self.logger.error(f"Error extracting text from PDF: {str(e)}")
+                raise
+        return self._pages
+
+    @property
+    def text(self) -> str:
+        return "".join(self.pages)
+
+    def source_reference(self) -> SourceReference:
+        """Hash, path and page spans of the text read so far, without the text"""
+        lengths = [len(page) for page in self._pages] if self._pages is not None else self._page_lengths
+        return SourceReference.from_page_lengths(self.path, self.content_hash, lengths)
+
+    def iter_pages(self) -> Iterator[str]:
+        """Yield page texts one at a time without materializing the document"""
+        self._page_lengths = []
+        for page in self._iter_page_texts():
+            self._page_lengths.append(len(page))
+            yield page
+
+    def _iter_page_texts(self) -> Iterator[str]:
+        if self._pages is not None:
+            yield from self._pages
+            return
+
+        cache = self.processor.text_cache
+        if cache is None:
+            yield from self.processor._iter_parsed_pages(self.path, self.reader)
+            return
+
+        version = self.processor.extractor_version
+        cached = cache.get(self.content_hash, version)
+        if cached is not None:
+            self.logger.info(f"Using cached text for {self.path}")
+            yield from cached
+            return
+
+        # Fill the cache as we go so a full pass leaves a reusable entry
+        writer = cache.writer(self.content_hash, version)
+        try:
+            for text in self.processor._iter_parsed_pages(self.path, self.reader):
+                writer.add(text)
+                yield text
+        except BaseException:
+            writer.abort()
+            raise
+        writer.commit()
+
+    async def aiter_pages(self, max_buffered: int = 8) -> AsyncIterator[str]:
+        """Async page iterator; parsing runs in a thread, at most ``max_buffered`` pages ahead.
+
+        The producer gets a thread of its own rather than one from the
+        default executor: it blocks while the queue is full, and must not
+        starve the ``asyncio.to_thread`` calls the consumers depend on.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered)
+        stop = threading.Event()
+        done = object()
+        finished = loop.create_future()
+
+        def produce():
+            pages = self.iter_pages()
+            try:
+                for page in pages:
+                    if stop.is_set():
+                        return
+                    asyncio.run_coroutine_threadsafe(queue.put(page), loop).result()
+                item = done
+            except BaseException as e:
+                item = e
+            finally:
+                pages.close()
+            if not stop.is_set():
+                asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def run():
+            try:
+                produce()
+            finally:
+                loop.call_soon_threadsafe(finished.set_result, None)
+
+        threading.Thread(target=run, name="pdf-pages", daemon=True).start()
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            # Unblock the producer if it is waiting on a full queue
+            while not queue.empty():
+                queue.get_nowait()
+            await finished
@@ -1,40 +1,126 @@
 from PyPDF2 import PdfReader
+import PyPDF2
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 import logging
-from typing import Optional
+import os
+import threading
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from ..utils.cache import PDFTextCache
+from .pdf_document import PDFDocument
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[str]:
+    """Extract text for pages ``start`` to ``end`` (worker process entry point)"""
+    reader = PdfReader(pdf_path)
+    return [reader.pages[i].extract_text() for i in range(start, end)]
 
 class PDFProcessor:
-    def __init__(self):
+    # Bump whenever page text extraction changes so cached text is invalidated
+    EXTRACTOR_VERSION = "1"
+
+    # Documents with fewer pages per worker than this are parsed serially
+    MIN_PAGES_PER_WORKER = 8
+
+    def __init__(self, text_cache: Optional[PDFTextCache] = None, workers: int = 1):
         self.logger = logging.getLogger(__name__)
+        self.text_cache = text_cache
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Lazily start the worker pool shared by all documents"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def close(self):
+        """Shut down the page extraction worker pool"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def _page_ranges(self, page_count: int) -> List[Tuple[int, int]]:
+        """Split pages into contiguous ranges, a few per worker for load balancing"""
+        num_ranges = min(self.workers * 4, max(1, page_count // self.MIN_PAGES_PER_WORKER))
+        size, remainder = divmod(page_count, num_ranges)
+        ranges = []
+        start = 0
+        for i in range(num_ranges):
+            end = start + size + (1 if i < remainder else 0)
+            ranges.append((start, end))
+            start = end
+        return ranges
+
+    @property
+    def extractor_version(self) -> str:
+        """Version tag covering both our extraction logic and the PDF library"""
+        return f"{self.EXTRACTOR_VERSION}+PyPDF2-{PyPDF2.__version__}"
+
+    def _parse_pages(self, pdf_path: str, reader: Optional[PdfReader] = None) -> List[str]:
+        """Extract the text of every page with PyPDF2, in parallel for large documents"""
+        return list(self._iter_parsed_pages(pdf_path, reader))
+
+    def _iter_parsed_pages(self, pdf_path: str, reader: Optional[PdfReader] = None) -> Iterator[str]:
+        """Yield the text of every page in order, extracting page ranges in parallel for large documents.
+
+        At most two ranges per worker are in flight, so a slow consumer holds
+        extraction back instead of buffering the whole document.
+        """
+        reader = reader or PdfReader(pdf_path)
+        page_count = len(reader.pages)
+        if self.workers <= 1 or page_count < 2 * self.MIN_PAGES_PER_WORKER:
+            for page in reader.pages:
+                yield page.extract_text()
+            return
+
+        ranges = self._page_ranges(page_count)
+        self.logger.info(
+            f"Extracting {page_count} pages from {pdf_path} "
+            f"with {self.workers} workers ({len(ranges)} ranges)"
+        )
+        pool = self._get_pool()
+        remaining = iter(ranges)
+        futures = deque(
+            pool.submit(_extract_page_range, pdf_path, start, end)
+            for start, end in islice(remaining, 2 * self.workers)
+        )
+        try:
+            # Results come back in page order
+            while futures:
+                pages = futures.popleft().result()
+                next_range = next(remaining, None)
+                if next_range is not None:
+                    futures.append(pool.submit(_extract_page_range, pdf_path, *next_range))
+                yield from pages
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def open(self, pdf_path: str) -> PDFDocument:
+        """Open a PDF once for lazy access to its text, pages and metadata"""
+        return PDFDocument(pdf_path, self)
+
+    def extract_pages(self, pdf_path: str) -> List[str]:
+        """Extract per-page text, reusing cached text for identical files"""
+        return self.open(pdf_path).pages
+
+    def iter_pages(self, pdf_path: str) -> Iterator[str]:
+        """Yield page texts one at a time without materializing the document"""
+        return self.open(pdf_path).iter_pages()
+
+    def aiter_pages(self, pdf_path: str, max_buffered: int = 8) -> AsyncIterator[str]:
+        """Async page iterator; parsing runs in a thread, at most ``max_buffered`` pages ahead"""
+        return self.open(pdf_path).aiter_pages(max_buffered)
 
     def extract_text(self, pdf_path: str) -> str:
         """Extract text from PDF file"""
-        try:
-            reader = PdfReader(pdf_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text()
-            
-            self.logger.info(f"Successfully extracted text from {pdf_path}")
-            return text
-        except Exception as e:
-            self.logger.error(f"Error extracting text from PDF: {str(e)}")
-            raise
+        return self.open(pdf_path).text
 
     def extract_metadata(self, pdf_path: str) -> dict:
         """Extract PDF metadata"""
-        try:
-            reader = PdfReader(pdf_path)
-            metadata = reader.metadata
-            return {
-                "title": metadata.get("/Title", ""),
-                "author": metadata.get("/Author", ""),
-                "subject": metadata.get("/Subject", ""),
-                "keywords": metadata.get("/Keywords", ""),
-                "creator": metadata.get("/Creator", ""),
-                "producer": metadata.get("/Producer", ""),
-                "creation_date": metadata.get("/CreationDate", "")
-            }
-        except Exception as e:
-            self.logger.error(f"Error extracting metadata: {str(e)}")
-            return {}
\ No newline at end of file
+        return self.open(pdf_path).metadata
@@ -1,17 +1,38 @@
 from typing import Dict, Any, List, Optional
+import asyncio
+import json
 from ..models.data_models import ValidationResult, CivicExtraction
 from ..utils.logger import setup_logger
 import logging
 
 class ReactValidator:
     """ReACT-based validation for CIVIC extractions"""
-    
-    def __init__(self, llm_processor):
+
+    SECTIONS = ("variants", "clinical_evidence", "molecular_data")
+
+    def __init__(self, llm_processor, max_concurrency: int = 8, batch_size: int = 10):
         self.llm_processor = llm_processor
+        self.max_concurrency = max(1, max_concurrency)
+        self.batch_size = max(1, batch_size)
         self.logger = setup_logger(__name__)
 
+    @staticmethod
+    def _failed_result(validation_type: str, reason: str) -> ValidationResult:
+        return ValidationResult(
+            is_valid=False,
+            confidence_score=0.0,
+            reasoning=reason,
+            suggestions=["Retry validation"],
+            validation_type=validation_type
+        )
+
+    @staticmethod
+    def _item_payload(item: Dict[str, Any]) -> Dict[str, Any]:
+        """Item as sent to the model, without any previous verdict"""
+        return {key: value for key, value in item.items() if key != "validation"}
+
     async def validate_extraction(
-        self, 
+        self,
         extraction: Dict[str, Any],
         validation_type: str = "extraction"
     ) -> ValidationResult:
@@ -22,13 +43,13 @@ class ReactValidator:
                 prompt = self.llm_processor.prompt_templates.VALIDATION_PROMPT
             else:
                 prompt = self.llm_processor.prompt_templates.POST_PROCESSING_PROMPT
-            
+
             # Get validation from LLM
             validation_response = await self.llm_processor.analyze_text(
-                text=str(extraction),
+                text=json.dumps(extraction, default=str),
                 prompt=prompt
             )
-            
+
             # Parse validation response
             validation_result = ValidationResult(
                 is_valid=validation_response.get('is_valid', False),
@@ -37,62 +58,139 @@ class ReactValidator:
                 suggestions=validation_response.get('suggestions', []),
                 validation_type=validation_type
             )
-            
+
             self.logger.info(
                 f"✅ {validation_type.title()} validation completed "
                 f"(confidence: {validation_result.confidence_score:.2f})"
             )
-            
+
             return validation_result
-            
+
         except Exception as e:
             self.logger.error(f"❌ Validation failed: {str(e)}", exc_info=True)
-            return ValidationResult(
-                is_valid=False,
-                confidence_score=0.0,
-                reasoning=f"Validation failed: {str(e)}",
-                suggestions=["Retry validation"],
-                validation_type=validation_type
+            return self._failed_result(validation_type, f"Validation failed: {str(e)}")
+
+    async def validate_batch(self, items: List[Dict[str, Any]]) -> List[ValidationResult]:
+        """Validate many items with a single prompt and map verdicts back by index"""
+        try:
+            payload = [
+                {"index": index, "item": self._item_payload(item)}
+                for index, item in enumerate(items)
+            ]
+            response = await self.llm_processor.analyze_text(
+                text=json.dumps(payload, default=str),
+                prompt=self.llm_processor.prompt_templates.BATCH_VALIDATION_PROMPT
             )
 
+            verdicts = {}
+            for verdict in response.get("results", []):
+                if isinstance(verdict, dict) and isinstance(verdict.get("index"), int):
+                    verdicts[verdict["index"]] = verdict
+
+            results = []
+            for index in range(len(items)):
+                verdict = verdicts.get(index)
+                if verdict is None:
+                    results.append(self._failed_result("extraction", "No verdict returned for item"))
+                    continue
+                results.append(ValidationResult(
+                    is_valid=verdict.get("is_valid", False),
+                    confidence_score=verdict.get("confidence_score", 0.0),
+                    reasoning=verdict.get("reasoning", ""),
+                    suggestions=verdict.get("suggestions", []),
+                    validation_type="extraction"
+                ))
+
+            self.logger.info(f"✅ Batch validation completed ({len(verdicts)}/{len(items)} verdicts)")
+            return results
+
+        except Exception as e:
+            self.logger.error(f"❌ Batch validation failed: {str(e)}", exc_info=True)
+            return [
+                self._failed_result("extraction", f"Validation failed: {str(e)}")
+                for _ in items
+            ]
+
+    async def validate_items(
+        self,
+        items: List[Dict[str, Any]],
+        batched: bool = False
+    ) -> List[ValidationResult]:
+        """Validate items concurrently, one prompt per item or per batch"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def limited(coro):
+            async with semaphore:
+                return await coro
+
+        if not batched:
+            return await asyncio.gather(*(
+                limited(self.validate_extraction(self._item_payload(item), "extraction"))
+                for item in items
+            ))
+
+        batches = [
+            items[start:start + self.batch_size]
+            for start in range(0, len(items), self.batch_size)
+        ]
+        batch_results = await asyncio.gather(*(
+            limited(self.validate_batch(batch)) for batch in batches
+        ))
+        return [result for results in batch_results for result in results]
+
+    def count_llm_calls(self, num_items: int, batched: bool = False) -> int:
+        """Number of item validation requests needed for ``num_items`` items"""
+        return -(-num_items // self.batch_size) if batched else num_items
+
     async def validate_full_extraction(
         self,
-        extraction: CivicExtraction
+        extraction: CivicExtraction,
+        batched: bool = False,
+        items: Optional[List[Dict[str, Any]]] = None
     ) -> CivicExtraction:
-        """Perform both extraction and post-processing validation"""
+        """Perform both extraction and post-processing validation.
+
+        Item validations and the whole-extraction review run concurrently.
+        With ``batched`` the items are packed ``batch_size`` to a prompt, so
+        the number of LLM calls scales with batches rather than items.
+        ``items`` restricts item validation to a subset of the extraction.
+        A failed extraction is returned unchanged.
+        """
+        if extraction.metadata.get("validation_status") == "failed":
+            self.logger.warning("⚠️ Extraction failed; skipping validation")
+            return extraction
         try:
-            # Validate each component
-            for variant in extraction.variants:
-                variant.validation = await self.validate_extraction(
-                    variant.dict(),
-                    "extraction"
-                )
-                
-            for evidence in extraction.clinical_evidence:
-                evidence.validation = await self.validate_extraction(
-                    evidence.dict(),
-                    "extraction"
-                )
-                
-            for data in extraction.molecular_data:
-                data.validation = await self.validate_extraction(
-                    data.dict(),
-                    "extraction"
-                )
-            
-            # Perform post-processing validation
-            post_validation = await self.validate_extraction(
-                extraction.dict(),
-                "post-processing"
+            if items is None:
+                items = [
+                    item
+                    for section in self.SECTIONS
+                    for item in getattr(extraction, section)
+                ]
+
+            # The review sees the extracted data, not the full paper text
+            snapshot = extraction.model_dump(exclude={"raw_text"})
+            item_results, post_validation = await asyncio.gather(
+                self.validate_items(items, batched=batched),
+                self.validate_extraction(snapshot, "post-processing")
             )
-            
+
+            for item, result in zip(items, item_results):
+                item["validation"] = result.model_dump()
+
             # Update metadata
-            extraction.metadata.validation_status = (
+            llm_calls = self.count_llm_calls(len(items), batched) + 1
+            extraction.metadata["validation_status"] = (
                 "valid" if post_validation.is_valid else "invalid"
             )
-            
+            extraction.metadata["validation"] = {
+                "mode": "batched" if batched else "per_item",
+                "items_validated": len(items),
+                "llm_calls": llm_calls,
+                "post_processing": post_validation.model_dump()
+            }
+
             return extraction
-            
+
         except Exception as e:
             self.logger.error(f"❌ Full validation failed: {str(e)}", exc_info=True)
-            return extraction
\ No newline at end of file
+            return extraction
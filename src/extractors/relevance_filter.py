@@ -0,0 +1,261 @@
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, NamedTuple, Optional
+import re
+import time
+from ..utils.logger import setup_logger
+from .text_chunker import TextChunker
+
+# Core lexicon; extend through ``prefilter.extra_terms`` in config.yaml
+GENES = [
+    "ABL1", "AKT1", "ALK", "APC", "ARID1A", "ATM", "BCL2", "BCL6", "BCMA", "BRAF",
+    "BRCA1", "BRCA2", "CCND1", "CCND2", "CCND3", "CD38", "CDK4", "CDK6", "CDKN2A",
+    "CDKN2C", "CRBN", "CTNNB1", "CYLD", "DIS3", "DNMT3A", "EGFR", "EP300", "ERBB2",
+    "ESR1", "EZH2", "FAM46C", "FGFR1", "FGFR2", "FGFR3", "FLT3", "GPRC5D", "HER2",
+    "HRAS", "IDH1", "IDH2", "IKZF1", "IKZF3", "IRF4", "JAK2", "KDM6A", "KIT",
+    "KMT2A", "KMT2C", "KRAS", "MAF", "MAFB", "MAP2K1", "MCL1", "MDM2", "MET",
+    "MMSET", "MYC", "NF1", "NFKBIA", "NOTCH1", "NPM1", "NRAS", "NSD2", "NTRK1",
+    "PDGFRA", "PIK3CA", "PRDM1", "PTEN", "RB1", "RET", "ROS1", "RUNX1", "SF3B1",
+    "SMAD4", "STK11", "TENT5C", "TET2", "TNFRSF17", "TP53", "TRAF3", "TSC2", "VHL",
+    "WT1", "XBP1", "XPO1",
+]
+
+DRUGS = [
+    "belantamab", "bortezomib", "carfilzomib", "cetuximab", "ciltacabtagene",
+    "crizotinib", "dabrafenib", "daratumumab", "dexamethasone", "elotuzumab",
+    "erlotinib", "gefitinib", "ibrutinib", "idecabtagene", "imatinib", "isatuximab",
+    "ixazomib", "lenalidomide", "melphalan", "osimertinib", "panobinostat",
+    "pembrolizumab", "pomalidomide", "selinexor", "talquetamab", "teclistamab",
+    "thalidomide", "trametinib", "trastuzumab", "vemurafenib", "venetoclax",
+]
+
+TERMS = [
+    "amplification", "biomarker", "copy number", "deletion", "del(17p)", "driver",
+    "fusion", "gain(1q)", "genotype", "germline", "hyperdiploid", "insertion",
+    "knockdown", "loss of function", "missense", "mutant", "mutation", "mutations",
+    "nonsense", "polymorphism", "rearrangement", "resistance", "sensitivity",
+    "somatic", "splice", "translocation", "variant", "variants", "wild-type",
+]
+
+# Words before figure and table panel labels ("Figure S12A"), which look like
+# protein changes written without ``p.``
+PANEL_LABEL_PREFIXES = ("Fig. ", "Figs. ", "Fig ", "Figure ", "Figures ", "Table ", "Tables ")
+
+# HGVS-like and cytogenetic notation. Bare protein changes need two or more
+# digits so that single-digit panel labels ("S1A") are not counted, and end
+# in a lookahead rather than ``\b``, which never matches after a stop "*".
+VARIANT_PATTERNS = [
+    r"\bp\.\(?(?:[A-Z][a-z]{2}|[A-Z])\d+(?:[A-Z][a-z]{2}|[A-Z*]|fs|del|dup|ins)\w*\)?",
+    r"\bc\.[-*]?\d+(?:[+-]\d+)?(?:_\d+(?:[+-]\d+)?)?(?:[ACGT]>[ACGT]|del|dup|ins)\w*",
+    "".join(f"(?<!{re.escape(prefix)})" for prefix in PANEL_LABEL_PREFIXES)
+    + r"\b[ACDEFGHIKLMNPQRSTVWY]\d{2,4}[ACDEFGHIKLMNPQRSTVWY*](?![A-Za-z0-9])",
+    r"\bt\(\d{1,2};\d{1,2}\)",
+    r"\brs\d{3,}\b",
+    r"\bCOSM\d+\b",
+]
+
+# Weight of one hit of each kind when scoring a passage
+WEIGHTS = {"variant": 3, "gene": 2, "drug": 1, "term": 1}
+
+class FilterResult(NamedTuple):
+    """Relevant passages of a text and what filtering them saved"""
+    text: str
+    stats: Dict[str, Any]
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation built from a character trie of ``words``.
+
+    Shared prefixes are matched once, so a single ``finditer`` pass over the
+    text behaves like an Aho-Corasick scan without a Python-level loop per
+    character.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            pattern = "(?:" + pattern + ")?"
+        return pattern
+
+    return build(trie)
+
+class RelevanceFilter:
+    """Keep only passages that mention genes, variants or drugs before prompting"""
+
+    # Passages longer than this are windowed on line breaks
+    MAX_PASSAGE_CHARS = 1500
+    # Leading irrelevant pages held back for the whole-paper fallback; beyond
+    # this they are passed on unfiltered rather than buffered without bound
+    MAX_HELD_PAGES = 16
+
+    def __init__(
+        self,
+        genes: Iterable[str] = GENES,
+        drugs: Iterable[str] = DRUGS,
+        terms: Iterable[str] = TERMS,
+        min_score: int = 3,
+        context_passages: int = 1
+    ):
+        self.min_score = min_score
+        self.context_passages = max(0, context_passages)
+        boundary_start, boundary_end = r"(?<![A-Za-z0-9])", r"(?![A-Za-z0-9])"
+        # Gene symbols are case-sensitive ("MET" is not "met"); drugs and terms are not
+        self._pattern = re.compile(
+            f"(?P<variant>{'|'.join(VARIANT_PATTERNS)})"
+            f"|{boundary_start}(?:"
+            f"(?P<gene>{_trie_pattern(set(genes))})"
+            f"|(?P<drug>(?i:{_trie_pattern({d.lower() for d in drugs})}))"
+            f"|(?P<term>(?i:{_trie_pattern({t.lower() for t in terms})}))"
+            f"){boundary_end}"
+        )
+        self.logger = setup_logger(__name__)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["RelevanceFilter"]:
+        """Build the filter from the ``prefilter`` config section, or None when disabled"""
+        prefilter_config = config.get("prefilter", {})
+        if not prefilter_config.get("enabled", False):
+            return None
+        extra = prefilter_config.get("extra_terms", {}) or {}
+        return cls(
+            genes=GENES + list(extra.get("genes", [])),
+            drugs=DRUGS + list(extra.get("drugs", [])),
+            terms=TERMS + list(extra.get("terms", [])),
+            min_score=prefilter_config.get("min_score", 3),
+            context_passages=prefilter_config.get("context_passages", 1)
+        )
+
+    def split_passages(self, text: str) -> List[str]:
+        """Split text into paragraphs, windowing paragraphs that are too long"""
+        passages = []
+        for paragraph in re.split(r"\n\s*\n", text):
+            if len(paragraph) <= self.MAX_PASSAGE_CHARS:
+                if paragraph.strip():
+                    passages.append(paragraph)
+                continue
+            window = []
+            size = 0
+            for line in paragraph.split("\n"):
+                if window and size + len(line) > self.MAX_PASSAGE_CHARS:
+                    passages.append("\n".join(window))
+                    window, size = [], 0
+                window.append(line)
+                size += len(line) + 1
+            if window:
+                passages.append("\n".join(window))
+        return passages
+
+    def score(self, passage: str) -> int:
+        """Weighted count of lexicon and variant-notation hits"""
+        return sum(WEIGHTS[match.lastgroup] for match in self._pattern.finditer(passage))
+
+    def select(self, passages: List[str]) -> List[bool]:
+        """Mark relevant passages and up to ``context_passages`` on either side"""
+        keep = [False] * len(passages)
+        for index, passage in enumerate(passages):
+            if self.score(passage) >= self.min_score:
+                low = max(0, index - self.context_passages)
+                high = min(len(passages), index + self.context_passages + 1)
+                keep[low:high] = [True] * (high - low)
+        return keep
+
+    def filter(self, text: str) -> FilterResult:
+        """Return the relevant passages of ``text`` with token-savings stats.
+
+        Passages next to a relevant one are kept as context. If nothing in
+        the text looks relevant it is passed through unchanged, so a paper
+        is never silently dropped.
+        """
+        start_time = time.perf_counter()
+        passages = self.split_passages(text)
+        keep = self.select(passages)
+
+        fallback = not any(keep)
+        filtered = text if fallback else "\n\n".join(
+            passage for passage, kept in zip(passages, keep) if kept
+        )
+        stats = self._stats(
+            text, filtered, len(passages), len(passages) if fallback else sum(keep), start_time
+        )
+        stats["fallback"] = fallback
+        return FilterResult(filtered, stats)
+
+    async def filter_pages(
+        self,
+        pages: AsyncIterable[str],
+        stats: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """Filter streamed pages one at a time, accumulating totals into ``stats``.
+
+        Pages without any relevant passage are dropped. Leading irrelevant
+        pages are held back until the first relevant one arrives, so a paper
+        in which nothing matches is still passed through whole. At most
+        ``MAX_HELD_PAGES`` are held; when more pile up they are passed on
+        unfiltered, as the fallback would.
+        """
+        for key in ("passages", "kept_passages", "chars_in", "chars_out",
+                    "tokens_in", "tokens_out", "tokens_saved"):
+            stats.setdefault(key, 0)
+        stats.setdefault("elapsed_ms", 0.0)
+        stats["fallback"] = False
+
+        held: List[str] = []
+        relevant = False
+        async for page in pages:
+            start_time = time.perf_counter()
+            passages = self.split_passages(page)
+            keep = self.select(passages)
+            filtered = "\n\n".join(passage for passage, kept in zip(passages, keep) if kept)
+
+            page_stats = self._stats(page, filtered, len(passages), sum(keep), start_time)
+            for key, value in page_stats.items():
+                stats[key] += value
+            if filtered:
+                relevant = True
+                held.clear()
+                yield filtered + "\n\n"
+            elif not relevant:
+                if len(held) == self.MAX_HELD_PAGES:
+                    for held_page in held:
+                        self._count_unfiltered(stats, held_page)
+                        yield held_page
+                    held.clear()
+                held.append(page)
+
+        if not relevant and held:
+            stats["fallback"] = True
+            stats["kept_passages"] = stats["passages"]
+            stats["chars_out"] = stats["chars_in"]
+            stats["tokens_out"] = stats["tokens_in"]
+            stats["tokens_saved"] = 0
+            for page in held:
+                yield page
+
+    def _count_unfiltered(self, stats: Dict[str, Any], page: str):
+        """Count a page passed on whole as kept"""
+        tokens = TextChunker.estimate_tokens(page)
+        stats["kept_passages"] += len(self.split_passages(page))
+        stats["chars_out"] += len(page)
+        stats["tokens_out"] += tokens
+        stats["tokens_saved"] -= tokens
+
+    @staticmethod
+    def _stats(text: str, filtered: str, passages: int, kept: int, start_time: float) -> Dict[str, Any]:
+        tokens_in = TextChunker.estimate_tokens(text)
+        tokens_out = TextChunker.estimate_tokens(filtered)
+        return {
+            "passages": passages,
+            "kept_passages": kept,
+            "chars_in": len(text),
+            "chars_out": len(filtered),
+            "tokens_in": tokens_in,
+            "tokens_out": tokens_out,
+            "tokens_saved": tokens_in - tokens_out,
+            "elapsed_ms": (time.perf_counter() - start_time) * 1000
+        }
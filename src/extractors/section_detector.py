@@ -0,0 +1,167 @@
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, NamedTuple, Optional
+import re
+from ..utils.logger import setup_logger
+from .text_chunker import TextChunker
+
+# Canonical section name for each recognised heading (lower case)
+HEADINGS = {
+    "abstract": "abstract",
+    "summary": "abstract",
+    "introduction": "introduction",
+    "background": "introduction",
+    "methods": "methods",
+    "materials and methods": "methods",
+    "patients and methods": "methods",
+    "methods and materials": "methods",
+    "experimental procedures": "methods",
+    "study design": "methods",
+    "results": "results",
+    "results and discussion": "results",
+    "discussion": "discussion",
+    "conclusion": "conclusion",
+    "conclusions": "conclusion",
+    "references": "references",
+    "bibliography": "references",
+    "literature cited": "references",
+    "acknowledgements": "acknowledgements",
+    "acknowledgments": "acknowledgements",
+    "acknowledgement": "acknowledgements",
+    "acknowledgment": "acknowledgements",
+    "funding": "funding",
+    "funding sources": "funding",
+    "financial support": "funding",
+    "role of the funding source": "funding",
+    "author contributions": "author_contributions",
+    "contributors": "author_contributions",
+    "declaration of interests": "competing_interests",
+    "competing interests": "competing_interests",
+    "conflict of interest": "competing_interests",
+    "conflicts of interest": "competing_interests",
+    "disclosures": "competing_interests",
+    "supplementary material": "supplementary",
+    "supplementary data": "supplementary",
+    "appendix": "supplementary",
+}
+
+# Back matter that cannot contain extractable variant evidence
+DEFAULT_EXCLUDE = (
+    "references", "acknowledgements", "funding", "author_contributions", "competing_interests"
+)
+
+# A heading on its own line (optionally numbered, optionally ending in ":" or "."),
+# or a heading followed by ":" and running text ("Funding: This work was ...")
+_HEADING = re.compile(
+    r"^[ \t]*(?:(?:\d+(?:\.\d+)*|[IVX]+)\.?[ \t]+)?"
+    r"(?P<heading>" + "|".join(
+        re.escape(heading).replace(r"\ ", r"[ \t]+")
+        for heading in sorted(HEADINGS, key=len, reverse=True)
+    ) + r")"
+    r"(?:[ \t]*[:.]?[ \t]*$|[ \t]*:[ \t]+)",
+    re.IGNORECASE | re.MULTILINE
+)
+
+class Section(NamedTuple):
+    """A detected section and its character offsets in the source text"""
+    name: str
+    heading: str
+    start: int
+    end: int
+
+class SectionedText(NamedTuple):
+    """Text with excluded sections removed, plus every detected section"""
+    text: str
+    sections: List[Section]
+    stats: Dict[str, Any]
+
+class SectionDetector:
+    """Split paper text into sections by recognising common headings"""
+
+    FRONT_MATTER = "front_matter"
+
+    def __init__(self, exclude: Iterable[str] = DEFAULT_EXCLUDE):
+        self.exclude = set(exclude)
+        self.logger = setup_logger(__name__)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["SectionDetector"]:
+        """Build the detector from the ``sections`` config section, or None when disabled"""
+        sections_config = config.get("sections", {})
+        if not sections_config.get("enabled", False):
+            return None
+        return cls(exclude=sections_config.get("exclude", DEFAULT_EXCLUDE))
+
+    def detect(self, text: str, initial: str = FRONT_MATTER, offset: int = 0) -> List[Section]:
+        """Return the sections of ``text`` in order, covering it without gaps.
+
+        Text before the first heading belongs to ``initial`` (the section a
+        previous page ended in when detecting page by page). ``offset`` is
+        added to every position.
+        """
+        sections = []
+        name, heading, start = initial, "", 0
+        for match in _HEADING.finditer(text):
+            sections.append(Section(name, heading, offset + start, offset + match.start()))
+            name = HEADINGS[" ".join(match.group("heading").lower().split())]
+            heading, start = match.group("heading"), match.start()
+        sections.append(Section(name, heading, offset + start, offset + len(text)))
+        return [section for section in sections if section.end > section.start]
+
+    def _keep(self, text: str, sections: List[Section], offset: int = 0) -> str:
+        return "".join(
+            text[section.start - offset:section.end - offset]
+            for section in sections
+            if section.name not in self.exclude
+        )
+
+    @staticmethod
+    def _stats(chars_in: int, chars_out: int) -> Dict[str, Any]:
+        return {
+            "chars_in": chars_in,
+            "chars_out": chars_out,
+            "tokens_saved": (chars_in - chars_out) // TextChunker.CHARS_PER_TOKEN
+        }
+
+    def strip(self, text: str) -> SectionedText:
+        """Remove excluded sections from ``text``"""
+        sections = self.detect(text)
+        kept = self._keep(text, sections)
+        stats = self._stats(len(text), len(kept))
+        stats["excluded"] = sorted({s.name for s in sections if s.name in self.exclude})
+        return SectionedText(kept, sections, stats)
+
+    async def strip_pages(
+        self,
+        pages: AsyncIterable[str],
+        stats: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """Remove excluded sections from streamed pages.
+
+        The current section carries over page boundaries, so back matter
+        spanning several pages is dropped entirely. Detected sections (with
+        offsets into the concatenated page text) and totals are written into
+        ``stats``.
+        """
+        sections: List[Section] = []
+        chars_in = chars_out = 0
+        current = self.FRONT_MATTER
+
+        async for page in pages:
+            page_sections = self.detect(page, initial=current, offset=chars_in)
+            kept = self._keep(page, page_sections, chars_in)
+            if page_sections:
+                current = page_sections[-1].name
+                # A section continuing from the previous page extends it
+                first = page_sections[0]
+                if sections and not first.heading and sections[-1].name == first.name:
+                    sections[-1] = sections[-1]._replace(end=first.end)
+                    page_sections = page_sections[1:]
+                sections.extend(page_sections)
+
+            chars_in += len(page)
+            chars_out += len(kept)
+            if kept:
+                yield kept
+
+        stats.update(self._stats(chars_in, chars_out))
+        stats["sections"] = sections
+        stats["excluded"] = sorted({s.name for s in sections if s.name in self.exclude})
@@ -0,0 +1,119 @@
+from typing import Iterable, Iterator, List, NamedTuple
+import math
+from ..utils.logger import setup_logger
+from ..utils.token_budget import estimate_tokens
+
+class TextChunk(NamedTuple):
+    """Segment of a document with its character offsets in the source text"""
+    index: int
+    text: str
+    start: int
+    end: int
+
+class TextChunker:
+    """Split long text into overlapping, token-budgeted segments"""
+
+    # Rough characters-per-token ratio for English scientific prose
+    CHARS_PER_TOKEN = 4
+
+    # Preferred break points, best first
+    BREAK_PATTERNS = ["\n\n", "\n", ". ", " "]
+
+    def __init__(self, max_tokens: int = 12000, overlap_tokens: int = 500):
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        if not 0 <= overlap_tokens < max_tokens:
+            raise ValueError("overlap_tokens must be non-negative and smaller than max_tokens")
+
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.logger = setup_logger(__name__)
+
+    @classmethod
+    def estimate_tokens(cls, text: str) -> int:
+        """Cheap local token estimate based on character count"""
+        return math.ceil(len(text) / cls.CHARS_PER_TOKEN)
+
+    def _find_break(self, text: str, start: int, end: int) -> int:
+        """Find the best break position in the second half of ``text[start:end]``"""
+        floor = start + (end - start) // 2
+        for pattern in self.BREAK_PATTERNS:
+            position = text.rfind(pattern, floor, end)
+            if position != -1:
+                return position + len(pattern)
+        return end
+
+    def stream(self) -> "ChunkStream":
+        """Start an incremental chunking session for text that arrives in pieces"""
+        return ChunkStream(self)
+
+    def iter_chunks(self, pieces: Iterable[str]) -> Iterator[TextChunk]:
+        """Yield chunks as soon as enough text has arrived from ``pieces``"""
+        stream = self.stream()
+        for piece in pieces:
+            yield from stream.feed(piece)
+        yield from stream.finish()
+
+    def split(self, text: str) -> List[TextChunk]:
+        """Split text into chunks of at most ``max_tokens`` with ``overlap_tokens`` of overlap"""
+        chunks = list(self.iter_chunks([text]))
+        self.logger.debug(
+            f"Split {len(text)} characters into {len(chunks)} chunks "
+            f"(~{self.max_tokens} tokens each, {self.overlap_tokens} overlap)"
+        )
+        return chunks
+
+class ChunkStream:
+    """Incremental chunker state; only the unconsumed tail of the text is kept"""
+
+    def __init__(self, chunker: TextChunker):
+        self.chunker = chunker
+        self.budget = chunker.max_tokens * chunker.CHARS_PER_TOKEN
+        self.overlap = chunker.overlap_tokens * chunker.CHARS_PER_TOKEN
+        self.buffer = ""
+        self.offset = 0  # Position of buffer[0] in the full text
+        self.count = 0
+
+    def _emit(self, end: int) -> TextChunk:
+        chunk = TextChunk(self.count, self.buffer[:end], self.offset, self.offset + end)
+        self.count += 1
+        return chunk
+
+    def _fits(self, end: int) -> bool:
+        """Whether ``buffer[:end]`` is within the budget by the request planner's estimate"""
+        # Every estimated token covers at least one character
+        max_tokens = self.chunker.max_tokens
+        return end <= max_tokens or estimate_tokens(self.buffer[:end]) <= max_tokens
+
+    def _chunk_end(self) -> int:
+        """Break within the character budget, moved back until the token estimate fits"""
+        end = self.chunker._find_break(self.buffer, 0, min(self.budget, len(self.buffer)))
+        while not self._fits(end):
+            tokens = estimate_tokens(self.buffer[:end])
+            limit = max(1, min(end - 1, end * self.chunker.max_tokens // tokens))
+            end = self.chunker._find_break(self.buffer, 0, limit)
+        return end
+
+    def feed(self, piece: str) -> List[TextChunk]:
+        """Add text and return every chunk that is now complete"""
+        self.buffer += piece
+        chunks = []
+        while len(self.buffer) > self.budget or not self._fits(len(self.buffer)):
+            end = self._chunk_end()
+            chunks.append(self._emit(end))
+
+            # Step back by the overlap, then forward to a word boundary
+            next_start = max(end - self.overlap, 1)
+            boundary = self.buffer.find(" ", next_start, end)
+            start = boundary + 1 if boundary != -1 else next_start
+            self.buffer = self.buffer[start:]
+            self.offset += start
+        return chunks
+
+    def finish(self) -> List[TextChunk]:
+        """Return the final chunk holding whatever text remains"""
+        if not self.buffer and self.count:
+            return []
+        chunk = self._emit(len(self.buffer))
+        self.buffer = ""
+        return [chunk]
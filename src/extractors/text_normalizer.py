@@ -0,0 +1,209 @@
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import math
+import re
+from collections import Counter
+from ..utils.logger import setup_logger
+from .text_chunker import TextChunker
+
+# Typographic ligatures and invisible characters PyPDF2 passes through
+_TRANSLATION = str.maketrans({
+    "\ufb00": "ff", "\ufb01": "fi", "\ufb02": "fl", "\ufb03": "ffi", "\ufb04": "ffl",
+    "\ufb05": "st", "\ufb06": "st",
+    "\u00a0": " ", "\u2009": " ", "\u202f": " ",
+    "\u00ad": None, "\u200b": None, "\u200c": None, "\u200d": None, "\ufeff": None,
+})
+
+_SPACES = re.compile(r"[ \t\f\v]+")
+_DIGITS = re.compile(r"\d+")
+_PAGE_NUMBER = re.compile(r"^(?:page )?#(?: ?(?:of|/) ?#)?$")
+_HYPHENATED = re.compile(r"([a-z])-\n([a-z])")
+_TRAILING_FRAGMENT = re.compile(r"(\S*[a-z])-\n*$")
+_BLANK_RUNS = re.compile(r"\n{3,}")
+
+class NormalizedText(NamedTuple):
+    """Cleaned page texts and what cleaning them saved"""
+    pages: List[str]
+    stats: Dict[str, Any]
+
+    @property
+    def text(self) -> str:
+        return "".join(self.pages)
+
+class PageNormalizer:
+    """Strip running headers/footers and repair line-break artefacts in PDF page text"""
+
+    def __init__(
+        self,
+        repeat_fraction: float = 0.5,
+        edge_lines: int = 3,
+        window: int = 4,
+        min_pages: int = 3
+    ):
+        if not 0 < repeat_fraction <= 1:
+            raise ValueError("repeat_fraction must be in (0, 1]")
+        self.repeat_fraction = repeat_fraction
+        self.edge_lines = max(0, edge_lines)
+        self.window = max(1, window)
+        self.min_pages = max(2, min_pages)
+        self.logger = setup_logger(__name__)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["PageNormalizer"]:
+        """Build the normalizer from the ``normalization`` config section, or None when disabled"""
+        normalization_config = config.get("normalization", {})
+        if not normalization_config.get("enabled", False):
+            return None
+        return cls(
+            repeat_fraction=normalization_config.get("repeat_fraction", 0.5),
+            edge_lines=normalization_config.get("edge_lines", 3),
+            window=normalization_config.get("window", 4)
+        )
+
+    @staticmethod
+    def line_key(line: str) -> str:
+        """Key under which near-identical header lines match ("Page 3" ~ "Page 4")"""
+        return _DIGITS.sub("#", line.lower())
+
+    def session(self) -> "NormalizationSession":
+        """Start normalizing a page stream"""
+        return NormalizationSession(self)
+
+    def normalize(self, pages: Iterable[str]) -> NormalizedText:
+        """Normalize all pages of a document"""
+        session = self.session()
+        cleaned = []
+        for page in pages:
+            cleaned.extend(session.feed(page))
+        cleaned.extend(session.finish())
+        return NormalizedText(cleaned, session.stats)
+
+    async def normalize_pages(
+        self,
+        pages: AsyncIterable[str],
+        stats: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """Normalize streamed pages, holding back at most ``window`` pages; totals go into ``stats``"""
+        session = self.session()
+        async for page in pages:
+            for cleaned in session.feed(page):
+                yield cleaned
+        for cleaned in session.finish():
+            yield cleaned
+        stats.update(session.stats)
+
+class NormalizationSession:
+    """One pass over a document's pages.
+
+    Each page is split into cleaned lines once. The keys of its top and
+    bottom ``edge_lines`` lines are counted per page; a key seen on at least
+    ``repeat_fraction`` of the pages so far, or of the odd or even pages so
+    far (headers alternating between facing pages), is a running header or
+    footer. The first ``window`` pages are held until there are enough pages
+    to judge; later pages are emitted as soon as they arrive.
+    """
+
+    def __init__(self, normalizer: PageNormalizer):
+        self.normalizer = normalizer
+        self.key_pages: Counter = Counter()
+        # The same counts split by page parity: even (0) and odd (1) page indexes
+        self.parity_key_pages = (Counter(), Counter())
+        self.pages_seen = 0
+        self.pending: List[Tuple[int, List[str]]] = []
+        self.carry = ""  # Start of a word hyphenated across a page break
+        self.stats: Dict[str, Any] = {
+            "pages": 0,
+            "chars_in": 0,
+            "chars_out": 0,
+            "repeated_lines_removed": 0,
+            "page_numbers_removed": 0,
+            "hyphenations_joined": 0
+        }
+
+    def _edge_keys(self, lines: List[str]) -> set:
+        edge = self.normalizer.edge_lines
+        candidates = lines[:edge] + lines[-edge:] if edge else []
+        return {self.normalizer.line_key(line) for line in candidates if line}
+
+    def feed(self, page: str) -> List[str]:
+        """Add a page and return the pages that can now be emitted"""
+        self.stats["pages"] += 1
+        self.stats["chars_in"] += len(page)
+        lines = [_SPACES.sub(" ", line).strip() for line in page.translate(_TRANSLATION).split("\n")]
+        parity = self.pages_seen % 2
+        self.pages_seen += 1
+        keys = self._edge_keys(lines)
+        self.key_pages.update(keys)
+        self.parity_key_pages[parity].update(keys)
+        self.pending.append((parity, lines))
+
+        if self.pages_seen < self.normalizer.window:
+            return []
+        return self._flush()
+
+    def finish(self) -> List[str]:
+        """Emit the held pages and any dangling hyphenated fragment"""
+        cleaned = self._flush()
+        if self.carry:
+            cleaned.append(self.carry + "-\n")
+            self.stats["chars_out"] += len(self.carry) + 2
+            self.carry = ""
+        self.stats.update(self._token_stats())
+        return cleaned
+
+    def _is_repeated(self, key: str, parity: int) -> bool:
+        if self.pages_seen < self.normalizer.min_pages:
+            return False
+        fraction = self.normalizer.repeat_fraction
+        if self.key_pages[key] >= max(2, math.ceil(fraction * self.pages_seen)):
+            return True
+        parity_pages = (self.pages_seen + 1 - parity) // 2
+        return self.parity_key_pages[parity][key] >= max(2, math.ceil(fraction * parity_pages))
+
+    def _flush(self) -> List[str]:
+        cleaned = []
+        for parity, lines in self.pending:
+            cleaned.append(self._clean(lines, parity))
+        self.pending = []
+        return [page for page in cleaned if page]
+
+    def _clean(self, lines: List[str], parity: int) -> str:
+        edge = self.normalizer.edge_lines
+        kept = []
+        for index, line in enumerate(lines):
+            if line and (index < edge or index >= len(lines) - edge):
+                key = self.normalizer.line_key(line)
+                if _PAGE_NUMBER.match(key):
+                    self.stats["page_numbers_removed"] += 1
+                    continue
+                if self._is_repeated(key, parity):
+                    self.stats["repeated_lines_removed"] += 1
+                    continue
+            kept.append(line)
+
+        text = "\n".join(kept).strip("\n")
+        if not text:
+            return ""
+        text, joined = _HYPHENATED.subn(r"\1\2", text)
+        self.stats["hyphenations_joined"] += joined
+        text = _BLANK_RUNS.sub("\n\n", text) + "\n"
+
+        # Rejoin a word split across the page break
+        if self.carry:
+            if text[0].islower():
+                text = self.carry + text
+                self.stats["hyphenations_joined"] += 1
+            else:
+                text = self.carry + "-\n" + text
+            self.carry = ""
+        fragment = _TRAILING_FRAGMENT.search(text)
+        if fragment:
+            self.carry = fragment.group(1)
+            text = text[:fragment.start()]
+
+        self.stats["chars_out"] += len(text)
+        return text
+
+    def _token_stats(self) -> Dict[str, int]:
+        tokens_in = math.ceil(self.stats["chars_in"] / TextChunker.CHARS_PER_TOKEN)
+        tokens_out = math.ceil(self.stats["chars_out"] / TextChunker.CHARS_PER_TOKEN)
+        return {"tokens_in": tokens_in, "tokens_out": tokens_out, "tokens_saved": tokens_in - tokens_out}
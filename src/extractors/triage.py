@@ -0,0 +1,141 @@
+from typing import Dict, Any, List, Optional, Tuple
+from ..models.confidence import ConfidenceCalculator, ConfidenceMetrics
+from ..models.data_models import CivicExtraction, ValidationResult
+from ..utils.validators import DataValidator
+from ..utils.logger import setup_logger
+from .react_validator import ReactValidator
+
+# Cleaned items keep no ReACT trace, so the ReACT metrics carry no signal
+# here; triage scores on the remaining metrics, reweighted to sum to 1
+_REACT_METRICS = ("reasoning_confidence", "action_confidence", "conclusion_confidence")
+_LOCAL_WEIGHTS = {
+    name: weight for name, weight in ConfidenceCalculator.WEIGHTS.items() if name not in _REACT_METRICS
+}
+TRIAGE_WEIGHTS = {name: weight / sum(_LOCAL_WEIGHTS.values()) for name, weight in _LOCAL_WEIGHTS.items()}
+
+class ValidationTriage:
+    """Run cheap local checks first and send only doubtful items to the LLM validator"""
+
+    def __init__(
+        self,
+        react_validator: ReactValidator,
+        data_validator: Optional[DataValidator] = None,
+        min_confidence_score: float = 0.6,
+        batched: bool = True
+    ):
+        self.react_validator = react_validator
+        self.data_validator = data_validator or DataValidator()
+        self.min_confidence_score = min_confidence_score
+        self.batched = batched
+        self.logger = setup_logger(__name__)
+
+    @classmethod
+    def from_config(cls, react_validator: ReactValidator, config: Dict[str, Any]) -> "ValidationTriage":
+        """Build a triage stage from the ``validation`` config section"""
+        validation_config = config.get("validation", {})
+        return cls(
+            react_validator,
+            min_confidence_score=validation_config.get("min_confidence_score", 0.6),
+            batched=validation_config.get("batched", True)
+        )
+
+    @staticmethod
+    def _as_score(value: Any) -> float:
+        try:
+            return max(0.0, min(1.0, float(value)))
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _item_metrics(self, section: str, item: Dict[str, Any]) -> Tuple[Dict[str, float], bool, List[str]]:
+        """Local confidence metrics of an item plus its rule check outcome"""
+        is_valid, messages = self.data_validator.validate_item(section, item)
+
+        rules = {
+            "variants": self.data_validator.variant_rules,
+            "clinical_evidence": self.data_validator.clinical_rules,
+            "molecular_data": self.data_validator.molecular_rules
+        }[section]
+        required = rules["required_fields"]
+        completeness = sum(1 for field in required if item.get(field)) / len(required)
+        type_errors = sum(1 for message in messages if message.startswith("Invalid type"))
+
+        metrics = {
+            **ConfidenceCalculator.evaluate_evidence_metrics(item),
+            "data_completeness": completeness,
+            "data_consistency": 0.0 if type_errors else 1.0,
+            **ConfidenceCalculator.evaluate_validation_metrics({
+                "confidence_score": self._as_score(item.get("confidence")),
+                "is_valid": is_valid
+            }),
+            # Unweighted in TRIAGE_WEIGHTS
+            **{name: 0.0 for name in _REACT_METRICS}
+        }
+        return metrics, is_valid, messages
+
+    def score_item(self, section: str, item: Dict[str, Any]) -> Tuple[float, bool, List[str]]:
+        """Score an item locally; returns ``(score, passed_rules, messages)``"""
+        metrics, is_valid, messages = self._item_metrics(section, item)
+        score = ConfidenceCalculator.calculate_scores([ConfidenceMetrics(**metrics)], TRIAGE_WEIGHTS)[0]
+        return float(score), is_valid, messages
+
+    def triage(self, extraction: CivicExtraction) -> List[Dict[str, Any]]:
+        """Accept confident items locally and return the ones that need the LLM"""
+        items = [
+            (section, item)
+            for section in ReactValidator.SECTIONS
+            for item in getattr(extraction, section)
+        ]
+        checked = [self._item_metrics(section, item) for section, item in items]
+        scores = ConfidenceCalculator.calculate_scores([metrics for metrics, _, _ in checked], TRIAGE_WEIGHTS)
+
+        doubtful = []
+        for (section, item), (_, is_valid, _), score in zip(items, checked, scores):
+            if is_valid and score >= self.min_confidence_score:
+                item["validation"] = ValidationResult(
+                    is_valid=True,
+                    confidence_score=float(score),
+                    reasoning="Passed local rule checks",
+                    validation_type="local_triage"
+                ).model_dump()
+            else:
+                doubtful.append(item)
+        return doubtful
+
+    async def validate(self, extraction: CivicExtraction) -> CivicExtraction:
+        """Validate an extraction, calling the LLM only for low-confidence items"""
+        if extraction.metadata.get("validation_status") == "failed":
+            self.logger.warning("⚠️ Extraction failed; skipping validation")
+            return extraction
+        total = sum(len(getattr(extraction, section)) for section in ReactValidator.SECTIONS)
+        doubtful = self.triage(extraction)
+
+        calls_saved = self.react_validator.count_llm_calls(total, self.batched) - \
+            self.react_validator.count_llm_calls(len(doubtful), self.batched)
+        if doubtful:
+            extraction = await self.react_validator.validate_full_extraction(
+                extraction,
+                batched=self.batched,
+                items=doubtful
+            )
+        else:
+            # Every item passed locally; the post-processing review is skipped too
+            calls_saved += 1
+            if total:
+                extraction.metadata["validation_status"] = "valid"
+            extraction.metadata["validation"] = {
+                "mode": "batched" if self.batched else "per_item",
+                "items_validated": 0,
+                "llm_calls": 0
+            }
+        extraction.metadata.setdefault("validation", {})["triage"] = {
+            "items": total,
+            "accepted_locally": total - len(doubtful),
+            "sent_to_llm": len(doubtful),
+            "threshold": self.min_confidence_score,
+            "llm_calls_saved": calls_saved
+        }
+        self.logger.info(
+            f"🩺 Triage accepted {total - len(doubtful)}/{total} items locally "
+            f"({calls_saved} LLM calls saved)"
+        )
+        return extraction
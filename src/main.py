@@ -1,61 +1,298 @@
 import asyncio
+import argparse
+import glob
+import hashlib
 from pathlib import Path
 import logging
+from typing import Dict, Any, Iterable, List, Optional, Union
 from dotenv import load_dotenv
 import os
-import json
 from datetime import datetime
 from tqdm import tqdm
 from .extractors.pdf_processor import PDFProcessor
 from .extractors.llm_processor import LLMProcessor
 from .extractors.civic_extractor import CivicExtractor
+from .extractors.text_chunker import TextChunker
+from .extractors.react_validator import ReactValidator
+from .extractors.relevance_filter import RelevanceFilter
+from .extractors.section_detector import SectionDetector
+from .extractors.text_normalizer import PageNormalizer
+from .extractors.triage import ValidationTriage
+from .utils.cache import ResponseCache, PDFTextCache
+from .utils.manifest import JobManifest, prompt_version
+from .utils.config import load_config
+from .utils.rate_limiter import RateLimiter
+from .utils.token_budget import RequestPlanner, usage_scope
+from .utils import serialization
+from .utils.output_sinks import BatchedSink, OutputSink, OUTPUT_FORMATS, create_sink
 from .utils.logger import setup_logger
 
 class CivicExtractionPipeline:
-    def __init__(self):
+    # Default number of papers processed concurrently in corpus mode
+    DEFAULT_CONCURRENCY = 5
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, bypass_cache: bool = False):
         load_dotenv()
         self.logger = setup_logger(__name__)
         self.logger.info("🚀 Initializing CIVIC Extraction Pipeline")
+        self.config = load_config() if config is None else config
+        self.incremental = self.config.get("extraction", {}).get("incremental", True)
+        self.validation_enabled = self.config.get("validation", {}).get("enabled", False)
+        # Without raw text, results reference their PDF by hash, path and page spans
+        self.keep_raw_text = self.config.get("extraction", {}).get("keep_raw_text", True)
+        # Job manifest of the corpus run in progress, if any
+        self.manifest: Optional[JobManifest] = None
         
         # Initialize components with progress tracking
         with tqdm(total=3, desc="Initializing components") as pbar:
-            self.pdf_processor = PDFProcessor()
+            self.pdf_text_cache = self._create_pdf_text_cache()
+            self.pdf_processor = PDFProcessor(
+                text_cache=self.pdf_text_cache,
+                workers=self.config.get("pdf", {}).get("workers", 1)
+            )
             pbar.update(1)
             
-            self.llm_processor = LLMProcessor()
+            self.response_cache = self._create_response_cache(bypass_cache)
+            self.rate_limiter = RateLimiter.from_config(self.config)
+            self.llm_processor = LLMProcessor(
+                cache=self.response_cache,
+                rate_limiter=self.rate_limiter,
+                keep_raw_text=self.keep_raw_text
+            )
+            self.llm_processor.planner = RequestPlanner.from_config(self.config, self.llm_processor.model)
             pbar.update(1)
             
-            self.civic_extractor = CivicExtractor(self.llm_processor)
+            self.page_normalizer = PageNormalizer.from_config(self.config)
+            self.section_detector = SectionDetector.from_config(self.config)
+            self.relevance_filter = RelevanceFilter.from_config(self.config)
+            # Chunks leave room for the prompt and the output in the model context
+            chunk_tokens = self.llm_processor.planner.max_chunk_tokens(
+                self.llm_processor.prompt_templates.VARIANT_ANALYSIS,
+                preferred=self.config.get("extraction", {}).get("chunk_tokens", 12000)
+            )
+            self.civic_extractor = CivicExtractor(
+                self.llm_processor,
+                chunker=TextChunker(max_tokens=chunk_tokens, overlap_tokens=min(500, chunk_tokens // 4)),
+                stream_responses=self.config.get("extraction", {}).get("stream_responses", False),
+                keep_raw_text=self.keep_raw_text
+            )
+            self.validation_triage = ValidationTriage.from_config(
+                ReactValidator(
+                    self.llm_processor,
+                    max_concurrency=self.config.get("validation", {}).get("max_concurrency", 8)
+                ),
+                self.config
+            )
             pbar.update(1)
         
         self.logger.info("✅ Pipeline initialized successfully")
 
-    async def process_paper(self, pdf_path: str, output_path: str = None) -> dict:
-        """Process paper with enhanced progress tracking and validation"""
+    def close(self):
+        """Release worker processes held by the pipeline components"""
+        self.pdf_processor.close()
+
+    @staticmethod
+    def _incomplete_reason(result: Dict[str, Any]) -> Optional[str]:
+        """Why a paper's result cannot count as complete, or None.
+
+        Chunks whose LLM calls failed after all retries come back as empty
+        fallbacks, so such a result must not be checkpointed as done.
+        """
+        metadata = result.get("metadata", {})
+        if metadata.get("extraction_failed"):
+            return "Extraction failed"
+        failed = metadata.get("failed_chunks", 0)
+        if failed:
+            return f"{failed} of {metadata.get('num_chunks', failed)} chunks failed"
+        return None
+
+    def _attempt(self, pdf_path: str) -> Optional[int]:
+        """How often the job manifest has started a paper; None leaves numbering to the sink"""
+        row = self.manifest.get(pdf_path) if self.manifest is not None else None
+        return row["attempts"] if row is not None and row["attempts"] else None
+
+    def _record_stage(self, pdf_path: str, stage: str):
+        """Note in the job manifest how far a paper got"""
+        if self.manifest is not None:
+            self.manifest.set_stage(pdf_path, stage)
+
+    def create_sink(self, output_format: Optional[str] = None, output_dir: Optional[str] = None) -> Optional[OutputSink]:
+        """Build a batched corpus sink from the ``output`` config section.
+
+        Returns None for the default ``json`` format, which keeps writing one
+        file per paper.
+        """
+        output_config = self.config.get("output", {})
+        output_format = output_format or output_config.get("format", "json")
+        if output_format == "json":
+            return None
+        return create_sink(
+            output_format,
+            output_dir or output_config.get("directory", "corpus_output"),
+            batch_size=output_config.get("batch_size", 500),
+            flush_interval=output_config.get("flush_interval", 5.0)
+        )
+
+    def _create_pdf_text_cache(self) -> Optional[PDFTextCache]:
+        """Build the extracted PDF text cache from the ``cache`` config section"""
+        cache_config = self.config.get("cache", {})
+        if not (cache_config.get("enabled", False) and cache_config.get("pdf_text", True)):
+            return None
+        return PDFTextCache(Path(cache_config.get("directory", ".cache")) / "pdf_text")
+
+    def _create_response_cache(self, bypass: bool = False) -> Optional[ResponseCache]:
+        """Build the LLM response cache from the ``cache`` config section"""
+        cache_config = self.config.get("cache", {})
+        if not cache_config.get("enabled", False):
+            return None
+        
+        bypass = bypass or os.getenv("CIVIC_CACHE_BYPASS", "").lower() in ("1", "true", "yes")
+        cache = ResponseCache(
+            Path(cache_config.get("directory", ".cache")) / "llm_responses.sqlite",
+            max_size_mb=cache_config.get("max_size_mb", 1024),
+            max_age_days=cache_config.get("max_age_days", 30),
+            bypass=bypass
+        )
+        self.logger.info(f"💾 LLM response cache: {cache.path}{' (bypassed)' if bypass else ''}")
+        return cache
+
+    async def process_paper(
+        self,
+        pdf_path: str,
+        output_path: str = None,
+        show_progress: bool = True,
+        sink: Optional[OutputSink] = None,
+        paper_id: Optional[str] = None
+    ) -> dict:
+        """Process paper with enhanced progress tracking and validation.
+
+        Results go to ``sink`` when given, under ``paper_id`` (the file stem
+        by default), otherwise to a JSON file at ``output_path``
+        (``analysis_<name>.json`` by default).
+        """
+        # Requests made while processing this paper are priced into its stats
+        with usage_scope() as usage:
+            return await self._process_paper(pdf_path, output_path, show_progress, usage, sink, paper_id)
+
+    async def _process_paper(
+        self,
+        pdf_path: str,
+        output_path: Optional[str],
+        show_progress: bool,
+        usage: Dict[str, Any],
+        sink: Optional[OutputSink] = None,
+        paper_id: Optional[str] = None
+    ) -> dict:
         try:
             start_time = datetime.now()
             self.logger.info(f"📄 Processing PDF: {pdf_path}")
             
             # Create overall progress bar
-            overall_progress = tqdm(total=100, desc="Overall Progress", position=0)
+            overall_progress = tqdm(
+                total=100,
+                desc="Overall Progress",
+                position=0,
+                disable=not show_progress
+            )
             
-            # Extract text from PDF
-            self.logger.info("1️⃣ Extracting text from PDF")
-            text = self.pdf_processor.extract_text(pdf_path)
-            self.logger.info(f"📝 Extracted {len(text)} characters from PDF")
-            overall_progress.update(20)
+            # Parse the PDF once; text and metadata share the same reader
+            document = self.pdf_processor.open(pdf_path)
+            
+            if self.incremental:
+                # Stream pages into the extractor so LLM work overlaps parsing
+                self.logger.info("1️⃣ Streaming PDF pages into CIVIC extractor")
+                self._record_stage(pdf_path, "extracting")
+                pages = document.aiter_pages()
+                normalization_stats = section_stats = prefilter_stats = None
+                if self.page_normalizer is not None:
+                    normalization_stats = {}
+                    pages = self.page_normalizer.normalize_pages(pages, normalization_stats)
+                if self.section_detector is not None:
+                    section_stats = {}
+                    pages = self.section_detector.strip_pages(pages, section_stats)
+                if self.relevance_filter is not None:
+                    prefilter_stats = {}
+                    pages = self.relevance_filter.filter_pages(pages, prefilter_stats)
+                civic_data = await self.civic_extractor.extract_civic_data_incremental(pages)
+                # Report the length as parsed, before any stage removed text
+                text_length = next(
+                    (stats["chars_in"] for stats in (normalization_stats, section_stats, prefilter_stats)
+                     if stats is not None),
+                    civic_data.metadata.get("text_length", 0)
+                )
+                self.logger.info(f"📝 Streamed {text_length} characters from PDF")
+                overall_progress.update(80)
+            else:
+                # Extract text from PDF off the event loop so other papers keep running
+                self.logger.info("1️⃣ Extracting text from PDF")
+                self._record_stage(pdf_path, "parsing")
+                normalization_stats = section_stats = prefilter_stats = None
+                if self.page_normalizer is not None:
+                    pages = await asyncio.to_thread(lambda: document.pages)
+                    normalized = self.page_normalizer.normalize(pages)
+                    text, normalization_stats = normalized.text, normalized.stats
+                    text_length = normalization_stats["chars_in"]
+                else:
+                    text = await asyncio.to_thread(lambda: document.text)
+                    text_length = len(text)
+                self.logger.info(f"📝 Extracted {text_length} characters from PDF")
+                if self.section_detector is not None:
+                    text, sections, section_stats = self.section_detector.strip(text)
+                    section_stats["sections"] = sections
+                if self.relevance_filter is not None:
+                    text, prefilter_stats = self.relevance_filter.filter(text)
+                overall_progress.update(20)
+                
+                # Extract CIVIC data
+                self.logger.info("2️⃣ Analyzing text with CIVIC extractor")
+                self._record_stage(pdf_path, "extracting")
+                civic_data = await self.civic_extractor.extract_civic_data(text)
+                overall_progress.update(60)
+            
+            if normalization_stats is not None:
+                civic_data.metadata["normalization"] = normalization_stats
+                self.logger.info(
+                    f"🧹 Normalization removed {normalization_stats['repeated_lines_removed']} repeated lines, "
+                    f"saving ~{normalization_stats['tokens_saved']} prompt tokens"
+                )
+            
+            if section_stats is not None:
+                section_stats["sections"] = [
+                    section._asdict() for section in section_stats["sections"]
+                ]
+                civic_data.metadata["sections"] = section_stats
+                self.logger.info(
+                    f"📑 Excluded sections {section_stats['excluded']}, "
+                    f"saving ~{section_stats['tokens_saved']} prompt tokens"
+                )
             
-            # Extract CIVIC data
-            self.logger.info("2️⃣ Analyzing text with CIVIC extractor")
-            civic_data = await self.civic_extractor.extract_civic_data(text)
-            overall_progress.update(60)
+            if prefilter_stats is not None:
+                civic_data.metadata["prefilter"] = prefilter_stats
+                self.logger.info(
+                    f"🔎 Prefilter kept {prefilter_stats['kept_passages']}/{prefilter_stats['passages']} "
+                    f"passages, saving ~{prefilter_stats['tokens_saved']} prompt tokens "
+                    f"({prefilter_stats['elapsed_ms']:.1f} ms)"
+                )
+            
+            if self.validation_enabled:
+                self.logger.info("🩺 Validating extracted items")
+                self._record_stage(pdf_path, "validating")
+                civic_data = await self.validation_triage.validate(civic_data)
+            
+            civic_data.metadata["pdf"] = await asyncio.to_thread(
+                lambda: {**document.metadata, "page_count": document.page_count}
+            )
+            civic_data.source = await asyncio.to_thread(document.source_reference)
             
             # Generate output path if not provided
-            if output_path is None:
+            if sink is not None:
+                output_path = str(sink.directory)
+            elif output_path is None:
                 output_path = f"analysis_{Path(pdf_path).stem}.json"
             
             # Save results
             self.logger.info(f"3️⃣ Saving results to {output_path}")
+            self._record_stage(pdf_path, "writing")
             
             # Create results directory if it doesn't exist
             output_dir = Path(output_path).parent
@@ -70,12 +307,22 @@ class CivicExtractionPipeline:
             
             stats = {
                 "processing_time": processing_time,
-                "text_length": len(text),
+                "text_length": text_length,
                 "num_variants": len(civic_data.variants),
                 "num_clinical_evidence": len(civic_data.clinical_evidence),
                 "num_molecular_data": len(civic_data.molecular_data),
                 "overall_confidence": confidence_scores.get('overall', 0.0)
             }
+            if normalization_stats is not None:
+                stats["normalization_tokens_saved"] = normalization_stats["tokens_saved"]
+            if section_stats is not None:
+                stats["sections_tokens_saved"] = section_stats["tokens_saved"]
+            if prefilter_stats is not None:
+                stats["prefilter_tokens_saved"] = prefilter_stats["tokens_saved"]
+            stats.update(usage)
+            triage = civic_data.metadata.get("validation", {}).get("triage")
+            if triage is not None:
+                stats["validation_llm_calls_saved"] = triage["llm_calls_saved"]
             
             # Convert to dictionary for JSON serialization
             output_data = {
@@ -83,11 +330,14 @@ class CivicExtractionPipeline:
                 "clinical_evidence": civic_data.clinical_evidence,
                 "molecular_data": civic_data.molecular_data,
                 "metadata": civic_data.metadata,
+                "source": civic_data.source.model_dump(),
                 "stats": stats
             }
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, default=str)
+            if sink is not None:
+                await sink.awrite(paper_id or Path(pdf_path).stem, output_data, attempt=self._attempt(pdf_path))
+            else:
+                serialization.dump_file(output_data, output_path)
                 
             overall_progress.update(20)
             
@@ -104,6 +354,318 @@ class CivicExtractionPipeline:
                 overall_progress.close()
             raise
 
+    @staticmethod
+    def resolve_inputs(inputs: Union[str, Path, Iterable[Union[str, Path]]]) -> List[Path]:
+        """Expand PDF paths, directories and glob patterns into a sorted list of PDFs"""
+        if isinstance(inputs, (str, Path)):
+            inputs = [inputs]
+
+        resolved = []
+        seen = set()
+        for item in inputs:
+            path = Path(item)
+            if path.is_dir():
+                candidates = sorted(path.rglob("*.pdf"))
+            elif glob.has_magic(str(item)):
+                candidates = sorted(Path(p) for p in glob.glob(str(item), recursive=True))
+            else:
+                candidates = [path]
+
+            for candidate in candidates:
+                key = str(candidate.resolve())
+                if key not in seen:
+                    seen.add(key)
+                    resolved.append(candidate)
+
+        return resolved
+
+    @staticmethod
+    def paper_ids(pdf_paths: Iterable[Path]) -> Dict[Path, str]:
+        """Unique output name for every paper of a corpus.
+
+        The file stem, unless several PDFs in different directories share it;
+        those get a short hash of their resolved path appended.
+        """
+        pdf_paths = list(pdf_paths)
+        stem_counts: Dict[str, int] = {}
+        for path in pdf_paths:
+            stem_counts[path.stem] = stem_counts.get(path.stem, 0) + 1
+        return {
+            path: path.stem if stem_counts[path.stem] == 1 else
+            f"{path.stem}-{hashlib.sha256(str(path.resolve()).encode('utf-8')).hexdigest()[:8]}"
+            for path in pdf_paths
+        }
+
+    async def process_corpus(
+        self,
+        inputs: Union[str, Path, Iterable[Union[str, Path]]],
+        output_dir: Optional[str] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        output_format: Optional[str] = None,
+        resume: bool = True
+    ) -> Dict[str, Any]:
+        """Process many papers concurrently on one event loop.
+
+        ``inputs`` may be a single path, a directory (searched recursively for
+        PDFs), a glob pattern, or any iterable mixing those. At most
+        ``concurrency`` papers are in flight at once. A failing paper is
+        recorded in the summary and never aborts the rest of the batch.
+
+        With ``output_format`` ``jsonl`` or ``parquet`` (default: the
+        ``output.format`` config key) results are appended to corpus tables
+        in ``output_dir`` instead of one JSON file per paper.
+
+        When the ``manifest`` config section is enabled, every paper's
+        progress is checkpointed in a SQLite job manifest. With ``resume``,
+        papers already done with the same PDF, prompt version and model are
+        skipped; papers done under another prompt or model are reported as
+        stale and processed again.
+        """
+        pdf_paths = self.resolve_inputs(inputs)
+        paper_ids = self.paper_ids(pdf_paths)
+        concurrency = max(1, int(concurrency))
+        sink = self.create_sink(output_format, output_dir)
+        # Keep the manifest next to the outputs it tracks
+        manifest_dir = output_dir if output_dir is not None or sink is None else str(sink.directory)
+        self.manifest = manifest = JobManifest.from_config(self.config, manifest_dir)
+        version = prompt_version(self.llm_processor.prompt_templates.VARIANT_ANALYSIS)
+        model = self.llm_processor.model
+        stale = []
+        if manifest is not None:
+            manifest.register(pdf_paths)
+            stale = manifest.stale(version, model)
+            if stale:
+                self.logger.warning(
+                    f"⚠️ {len(stale)} finished papers are stale (prompt or model changed)"
+                )
+            if isinstance(sink, BatchedSink):
+                # Buffered papers only count as done once their rows are on disk
+                paths_by_id = {paper_id: path for path, paper_id in paper_ids.items()}
+
+                def finish_flushed(paper_ids: List[str]):
+                    for paper_id in paper_ids:
+                        manifest.flushed(paths_by_id[paper_id])
+
+                sink.on_flush = finish_flushed
+        self.logger.info(
+            f"📚 Processing corpus of {len(pdf_paths)} papers "
+            f"(concurrency: {concurrency})"
+        )
+
+        start_time = datetime.now()
+        semaphore = asyncio.Semaphore(concurrency)
+        progress = tqdm(total=len(pdf_paths), desc="Corpus Progress", unit="paper")
+
+        async def run_one(pdf_path: Path) -> Dict[str, Any]:
+            async with semaphore:
+                default_path = f"analysis_{paper_ids[pdf_path]}.json"
+                output_path = None
+                if sink is not None:
+                    output_path = str(sink.directory)
+                elif output_dir is not None:
+                    output_path = str(Path(output_dir) / default_path)
+
+                paper_start = datetime.now()
+                progress.set_postfix_str(pdf_path.name)
+                try:
+                    if manifest is not None:
+                        input_hash = await asyncio.to_thread(PDFTextCache.hash_file, pdf_path)
+                        done_path = output_path or default_path
+                        if resume and manifest.is_complete(pdf_path, input_hash, version, model) and \
+                                (sink is not None or Path(done_path).exists()):
+                            self.logger.info(f"⏭️ Skipping {pdf_path.name} (unchanged since last run)")
+                            return {
+                                "path": str(pdf_path),
+                                "status": "skipped",
+                                "output_path": done_path,
+                                "processing_time": 0.0
+                            }
+                        attempt = manifest.start(pdf_path, input_hash, version, model)
+                        if attempt > 1:
+                            self.logger.info(f"🔁 Retrying {pdf_path.name} (attempt {attempt})")
+                    result = await self.process_paper(
+                        str(pdf_path),
+                        output_path=output_path or default_path,
+                        show_progress=False,
+                        sink=sink,
+                        paper_id=paper_ids[pdf_path]
+                    )
+                    status = {
+                        "path": str(pdf_path),
+                        "status": "success",
+                        "output_path": output_path or default_path,
+                        "stats": result.get("stats", {})
+                    }
+                    incomplete = self._incomplete_reason(result)
+                    if incomplete is not None:
+                        # Written, but redone on resume rather than trusted
+                        status["incomplete"] = incomplete
+                        self.logger.warning(f"⚠️ {pdf_path.name} is incomplete: {incomplete}")
+                    if manifest is not None:
+                        if incomplete is not None:
+                            manifest.fail(pdf_path, incomplete)
+                        elif isinstance(sink, BatchedSink):
+                            manifest.written(pdf_path, status["output_path"])
+                        else:
+                            manifest.finish(pdf_path, status["output_path"])
+                    self.logger.info(f"✅ Finished {pdf_path.name}")
+                except Exception as e:
+                    status = {
+                        "path": str(pdf_path),
+                        "status": "failed",
+                        "error": f"{type(e).__name__}: {e}"
+                    }
+                    self.logger.error(f"❌ Failed {pdf_path.name}: {e}")
+                    if manifest is not None:
+                        manifest.fail(pdf_path, status["error"])
+                finally:
+                    progress.update(1)
+
+                status["processing_time"] = (datetime.now() - paper_start).total_seconds()
+                return status
+
+        try:
+            papers = await asyncio.gather(*(run_one(path) for path in pdf_paths))
+        finally:
+            progress.close()
+            if sink is not None:
+                await sink.aclose()
+            self.manifest = None
+
+        succeeded = sum(1 for paper in papers if paper["status"] == "success")
+        skipped = sum(1 for paper in papers if paper["status"] == "skipped")
+        summary = {
+            "papers": papers,
+            "total": len(papers),
+            "succeeded": succeeded,
+            "failed": len(papers) - succeeded - skipped,
+            "concurrency": concurrency,
+            "processing_time": (datetime.now() - start_time).total_seconds()
+        }
+        if manifest is not None:
+            summary["skipped"] = skipped
+            summary["manifest"] = {
+                "path": str(manifest.path),
+                "prompt_version": version,
+                "model": model,
+                "states": manifest.stats(),
+                "stale": stale
+            }
+            manifest.close()
+        if sink is not None:
+            summary["output"] = {"format": sink.format, "directory": str(sink.directory)}
+        summary["estimated_cost_usd"] = round(sum(
+            paper.get("stats", {}).get("estimated_cost_usd", 0.0) for paper in papers
+        ), 6)
+        if self.page_normalizer is not None:
+            summary["normalization_tokens_saved"] = sum(
+                paper.get("stats", {}).get("normalization_tokens_saved", 0) for paper in papers
+            )
+        if self.section_detector is not None:
+            summary["sections_tokens_saved"] = sum(
+                paper.get("stats", {}).get("sections_tokens_saved", 0) for paper in papers
+            )
+        if self.relevance_filter is not None:
+            summary["prefilter_tokens_saved"] = sum(
+                paper.get("stats", {}).get("prefilter_tokens_saved", 0) for paper in papers
+            )
+        if self.validation_enabled:
+            summary["validation_llm_calls_saved"] = sum(
+                paper.get("stats", {}).get("validation_llm_calls_saved", 0) for paper in papers
+            )
+        if self.response_cache is not None:
+            summary["cache"] = self.response_cache.stats()
+        if self.pdf_text_cache is not None:
+            summary["pdf_text_cache"] = self.pdf_text_cache.stats()
+        if self.rate_limiter is not None:
+            summary["rate_limiter"] = self.rate_limiter.stats()
+
+        self.logger.info(
+            f"📊 Corpus finished: {summary['succeeded']} succeeded, "
+            f"{summary['failed']} failed in {summary['processing_time']:.1f}s"
+        )
+        return summary
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="CIVIC Extraction Pipeline")
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        help="PDF files, directories or glob patterns (defaults to $PDF_PATH or paper.pdf)"
+    )
+    parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=CivicExtractionPipeline.DEFAULT_CONCURRENCY,
+        help="Maximum number of papers processed concurrently in corpus mode"
+    )
+    parser.add_argument(
+        "-o", "--output-dir",
+        default=None,
+        help="Directory for analysis_<name>.json outputs (defaults to the working directory)"
+    )
+    parser.add_argument(
+        "-f", "--output-format",
+        choices=OUTPUT_FORMATS,
+        default=None,
+        help="json: one file per paper; jsonl/parquet: batched corpus tables (defaults to output.format)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the LLM response cache for this run"
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Reprocess papers the job manifest records as done"
+    )
+    return parser.parse_args(argv)
+
+def print_corpus_summary(summary: Dict[str, Any]):
+    """Print per-paper outcome of a corpus run"""
+    print("\n📚 Corpus Results:")
+    print("="*60)
+    for paper in summary["papers"]:
+        if paper["status"] == "success":
+            stats = paper.get("stats", {})
+            print(
+                f"✅ {paper['path']}: {stats.get('num_variants', 0)} variants, "
+                f"{stats.get('num_clinical_evidence', 0)} clinical items "
+                f"({paper['processing_time']:.1f}s)"
+                + (f" - incomplete: {paper['incomplete']}" if paper.get("incomplete") else "")
+            )
+        elif paper["status"] == "skipped":
+            print(f"⏭️ {paper['path']}: unchanged since last run")
+        else:
+            print(f"❌ {paper['path']}: {paper['error']}")
+    if summary.get("manifest"):
+        manifest = summary["manifest"]
+        print(f"\nManifest: {manifest['path']} ({summary['skipped']} papers skipped as complete)")
+        if manifest["stale"]:
+            print(f"Stale (prompt or model changed): {len(manifest['stale'])} papers")
+    if summary.get("output"):
+        print(f"\nResults: {summary['output']['format']} tables in {summary['output']['directory']}")
+    if "estimated_cost_usd" in summary:
+        print(f"\nEstimated LLM cost: ${summary['estimated_cost_usd']:.2f}")
+    if summary.get("cache"):
+        cache = summary["cache"]
+        print(f"\nCache: {cache['hits']} hits, {cache['misses']} misses")
+    if "normalization_tokens_saved" in summary:
+        print(f"Normalization: ~{summary['normalization_tokens_saved']} prompt tokens saved")
+    if "sections_tokens_saved" in summary:
+        print(f"Sections: ~{summary['sections_tokens_saved']} prompt tokens saved by dropping back matter")
+    if "prefilter_tokens_saved" in summary:
+        print(f"Prefilter: ~{summary['prefilter_tokens_saved']} prompt tokens saved")
+    if "validation_llm_calls_saved" in summary:
+        print(f"Validation: {summary['validation_llm_calls_saved']} LLM calls saved by local triage")
+    print(
+        f"\nTotal: {summary['total']}  Succeeded: {summary['succeeded']}  "
+        f"Failed: {summary['failed']}  Time: {summary['processing_time']:.1f}s"
+    )
+    print("="*60)
+
 async def main():
     """Enhanced main function with better error handling and progress display"""
     try:
@@ -112,16 +674,52 @@ async def main():
         print("🧬 CIVIC Extraction Pipeline 🧬".center(60))
         print("="*60 + "\n")
         
+        args = parse_args()
+        
+        # Several inputs, a directory or a glob pattern switch to corpus mode
+        inputs = args.inputs or [os.getenv("PDF_PATH", "paper.pdf")]
+        if len(inputs) > 1 or os.path.isdir(inputs[0]) or glob.has_magic(inputs[0]):
+            pdf_paths = CivicExtractionPipeline.resolve_inputs(inputs)
+            if not pdf_paths:
+                raise FileNotFoundError(f"No PDF files found for: {' '.join(inputs)}")
+            
+            print(f"📚 Processing {len(pdf_paths)} papers (concurrency: {args.concurrency})\n")
+            
+            pipeline = CivicExtractionPipeline(bypass_cache=args.no_cache)
+            try:
+                summary = await pipeline.process_corpus(
+                    pdf_paths,
+                    output_dir=args.output_dir,
+                    concurrency=args.concurrency,
+                    output_format=args.output_format,
+                    resume=not args.no_resume
+                )
+            finally:
+                pipeline.close()
+            print_corpus_summary(summary)
+            return
+        
         # Get PDF path from command line or environment
-        pdf_path = os.sys.argv[1] if len(os.sys.argv) > 1 else os.getenv("PDF_PATH", "paper.pdf")
+        pdf_path = inputs[0]
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
         
         print(f"📄 Processing: {pdf_path}\n")
         
         # Initialize and run pipeline
-        pipeline = CivicExtractionPipeline()
-        result = await pipeline.process_paper(pdf_path)
+        pipeline = CivicExtractionPipeline(bypass_cache=args.no_cache)
+        output_path = None
+        if args.output_dir is not None:
+            output_path = str(Path(args.output_dir) / f"analysis_{Path(pdf_path).stem}.json")
+        try:
+            sink = pipeline.create_sink(args.output_format, args.output_dir)
+            try:
+                result = await pipeline.process_paper(pdf_path, output_path=output_path, sink=sink)
+            finally:
+                if sink is not None:
+                    await sink.aclose()
+        finally:
+            pipeline.close()
         
         # Print results
         print("\n📊 Extraction Results:")
@@ -1,4 +1,12 @@
 from .data_models import (
     CivicExtraction,
-    ProcessingMetadata
-)
\ No newline at end of file
+    ProcessingMetadata,
+    SourceReference,
+    ValidationResult
+)
+from .records import (
+    ClinicalEvidenceRecord,
+    ExtractedRecord,
+    MolecularRecord,
+    VariantRecord
+)
@@ -1,5 +1,6 @@
+import numpy as np
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Mapping, Optional, Sequence, Union
 from datetime import datetime
 from enum import Enum
 
@@ -23,38 +24,117 @@ class ConfidenceMetrics(BaseModel):
     action_confidence: float = Field(..., ge=0.0, le=1.0)
     conclusion_confidence: float = Field(..., ge=0.0, le=1.0)
 
+MetricRecord = Union[ConfidenceMetrics, Dict[str, float]]
+
 class ConfidenceCalculator:
     """Enhanced confidence calculator with ReACT integration"""
-    
-    @staticmethod
-    def calculate_score(metrics: ConfidenceMetrics) -> float:
-        """Calculate weighted confidence score"""
-        weights = {
-            # Evidence weights
-            'evidence_strength': 0.2,
-            'evidence_consistency': 0.1,
-            'evidence_quality': 0.1,
-            
-            # Data quality weights
-            'data_completeness': 0.1,
-            'data_consistency': 0.1,
-            
-            # Validation weights
-            'extraction_confidence': 0.1,
-            'validation_score': 0.1,
-            
-            # ReACT weights
-            'reasoning_confidence': 0.1,
-            'action_confidence': 0.1,
-            'conclusion_confidence': 0.1
-        }
+
+    # Column order of metric matrices and weight vectors
+    METRIC_NAMES = tuple(ConfidenceMetrics.model_fields)
+
+    WEIGHTS = {
+        # Evidence weights
+        'evidence_strength': 0.2,
+        'evidence_consistency': 0.1,
+        'evidence_quality': 0.1,
+        
+        # Data quality weights
+        'data_completeness': 0.1,
+        'data_consistency': 0.1,
         
-        score = sum(
-            getattr(metrics, metric) * weight 
-            for metric, weight in weights.items()
-        )
+        # Validation weights
+        'extraction_confidence': 0.1,
+        'validation_score': 0.1,
         
-        return round(score, 3)
+        # ReACT weights
+        'reasoning_confidence': 0.1,
+        'action_confidence': 0.1,
+        'conclusion_confidence': 0.1
+    }
+
+    # Variant scoring: fields counted for completeness and evidence level weights
+    VARIANT_FIELDS = (
+        "name", "type", "significance", "evidence_level",
+        "molecular_effect", "clinical_relevance"
+    )
+    EVIDENCE_LEVEL_WEIGHTS = {
+        "A": 1.0,  # Multiple high-quality trials
+        "B": 0.8,  # Single high-quality trial
+        "C": 0.6,  # Multiple lower-quality studies
+        "D": 0.4   # Case reports or expert opinion
+    }
+
+    @classmethod
+    def weight_vector(cls, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Weights as a vector in ``METRIC_NAMES`` order; missing metrics weigh 0"""
+        weights = cls.WEIGHTS if weights is None else weights
+        return np.array([weights.get(name, 0.0) for name in cls.METRIC_NAMES], dtype=float)
+
+    @classmethod
+    def metric_matrix(
+        cls,
+        metrics: Union[np.ndarray, Mapping[str, Sequence[float]], Sequence[MetricRecord]]
+    ) -> np.ndarray:
+        """Stack metrics into an ``(n, len(METRIC_NAMES))`` float matrix.
+
+        Accepts a ready matrix, a mapping of metric name to column, or a
+        sequence of ``ConfidenceMetrics``/dict records.
+        """
+        if isinstance(metrics, np.ndarray):
+            matrix = metrics.astype(float, copy=False)
+        elif isinstance(metrics, Mapping):
+            matrix = np.column_stack([
+                np.asarray(metrics[name], dtype=float) for name in cls.METRIC_NAMES
+            ])
+        else:
+            matrix = np.array([
+                [getattr(record, name) if isinstance(record, ConfidenceMetrics) else record[name]
+                 for name in cls.METRIC_NAMES]
+                for record in metrics
+            ], dtype=float).reshape(-1, len(cls.METRIC_NAMES))
+
+        if matrix.ndim != 2 or matrix.shape[1] != len(cls.METRIC_NAMES):
+            raise ValueError(f"Expected {len(cls.METRIC_NAMES)} metric columns, got shape {matrix.shape}")
+        if np.any((matrix < 0.0) | (matrix > 1.0)):
+            raise ValueError("Metric values must be between 0.0 and 1.0")
+        return matrix
+
+    @classmethod
+    def calculate_scores(
+        cls,
+        metrics: Union[np.ndarray, Mapping[str, Sequence[float]], Sequence[MetricRecord]],
+        weights: Optional[Union[Dict[str, float], np.ndarray]] = None
+    ) -> np.ndarray:
+        """Calculate weighted confidence scores for many metric records at once"""
+        if not isinstance(weights, np.ndarray):
+            weights = cls.weight_vector(weights)
+        return np.round(cls.metric_matrix(metrics) @ weights, 3)
+
+    @classmethod
+    def calculate_score(cls, metrics: ConfidenceMetrics) -> float:
+        """Calculate weighted confidence score"""
+        return float(cls.calculate_scores([metrics])[0])
+
+    @classmethod
+    def score_variants(cls, variants: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Score raw variant dicts by completeness, evidence level and supporting data"""
+        if not variants:
+            return np.zeros(0)
+
+        completeness = np.array([
+            sum(1 for field in cls.VARIANT_FIELDS if variant.get(field))
+            for variant in variants
+        ], dtype=float) / len(cls.VARIANT_FIELDS)
+        evidence_score = np.array([
+            cls.EVIDENCE_LEVEL_WEIGHTS.get(str(variant.get("evidence_level") or "").upper(), 0.2)
+            for variant in variants
+        ])
+        support_score = np.minimum(1.0, np.array([
+            len(variant.get("supporting_data") or []) for variant in variants
+        ], dtype=float) / 3)  # Normalize to max of 1.0
+
+        score = (completeness * 0.3) + (evidence_score * 0.5) + (support_score * 0.2)
+        return np.round(np.minimum(1.0, score), 2)
 
     @staticmethod
     def evaluate_evidence_metrics(evidence: Dict) -> Dict[str, float]:
@@ -1,6 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any, Union
+from typing import List, Dict, Optional, Any, Tuple, Union
 from datetime import datetime
+import bisect
+from ..utils import serialization
+from .records import ExtractedRecord, RECORD_TYPES, to_dicts, to_records
 
 class ProcessingMetadata(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
@@ -10,12 +13,64 @@ class ProcessingMetadata(BaseModel):
     validation_status: str = "pending"
     confidence_scores: Dict[str, float] = Field(default_factory=dict)
 
+class ValidationResult(BaseModel):
+    is_valid: bool = False
+    confidence_score: float = 0.0
+    reasoning: str = ""
+    suggestions: List[str] = Field(default_factory=list)
+    validation_type: str = "extraction"
+
+class SourceReference(BaseModel):
+    """Where an extraction's text came from, without holding the text.
+
+    ``page_spans`` are ``(start, end)`` character offsets of each page in
+    the document's extracted text (the pages joined, before any cleaning).
+    The text is re-read from ``path`` on demand and checked against
+    ``content_hash``.
+    """
+    path: str
+    content_hash: str
+    page_spans: List[Tuple[int, int]] = Field(default_factory=list)
+
+    @classmethod
+    def from_page_lengths(cls, path: str, content_hash: str, lengths: List[int]) -> 'SourceReference':
+        spans = []
+        start = 0
+        for length in lengths:
+            spans.append((start, start + length))
+            start += length
+        return cls(path=path, content_hash=content_hash, page_spans=spans)
+
+    @property
+    def text_length(self) -> int:
+        return self.page_spans[-1][1] if self.page_spans else 0
+
+    def page_of(self, offset: int) -> int:
+        """Index of the page containing character ``offset``"""
+        if not 0 <= offset < self.text_length:
+            raise IndexError(f"Offset {offset} outside text of length {self.text_length}")
+        return bisect.bisect_right([start for start, _ in self.page_spans], offset) - 1
+
+    def load_pages(self, pdf_processor=None) -> List[str]:
+        """Re-extract the page texts; raises ValueError if the file has changed"""
+        from ..extractors.pdf_processor import PDFProcessor
+        document = (pdf_processor or PDFProcessor()).open(self.path)
+        if document.content_hash != self.content_hash:
+            raise ValueError(f"{self.path} has changed since it was extracted")
+        return document.pages
+
+    def load_text(self, start: int = 0, end: Optional[int] = None, pdf_processor=None) -> str:
+        """Re-extract the text, or the ``start:end`` slice of it"""
+        return "".join(self.load_pages(pdf_processor))[start:end]
+
 class CivicExtraction(BaseModel):
     # Making fields more flexible to handle various response formats
     variants: List[Dict[str, Any]] = Field(default_factory=list)
     clinical_evidence: List[Dict[str, Any]] = Field(default_factory=list)
     molecular_data: List[Dict[str, Any]] = Field(default_factory=list)
     raw_text: Optional[str] = None
+    # Compact stand-in for raw_text; see SourceReference.load_text
+    source: Optional[SourceReference] = None
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
     class Config:
@@ -86,9 +141,66 @@ class CivicExtraction(BaseModel):
                     "text_length": text_length,
                     "processing_time": 0.0,
                     "validation_status": "failed",
+                    "extraction_failed": True,
                     "confidence_scores": {"overall": 0.0}
                 }
             )
 
+    def to_records(self) -> Dict[str, List[ExtractedRecord]]:
+        """Items of every section as compact slotted records"""
+        return {section: to_records(section, getattr(self, section)) for section in RECORD_TYPES}
+
+    @classmethod
+    def from_records(cls, records: Dict[str, List[ExtractedRecord]], **kwargs) -> 'CivicExtraction':
+        """Rebuild an extraction from records produced by ``to_records``"""
+        return cls(**{section: to_dicts(items) for section, items in records.items()}, **kwargs)
+
+    def to_json(
+        self,
+        include: Optional[Union[set, Dict[str, Any]]] = None,
+        exclude: Optional[Union[set, Dict[str, Any]]] = None,
+        exclude_none: bool = True,
+        indent: bool = False
+    ) -> bytes:
+        """Encode with the fast JSON path; ``include``/``exclude`` work as in ``model_dump``.
+
+        Field-name sets are applied without copying the item lists; nested
+        (dict) specifications go through ``model_dump``. Either way
+        ``exclude_none`` only drops top-level fields that are None; None
+        values inside items are kept.
+        """
+        if isinstance(include, dict) or isinstance(exclude, dict):
+            data = self.model_dump(include=include, exclude=exclude)
+        else:
+            fields = type(self).model_fields if include is None else include
+            data = {
+                name: getattr(self, name)
+                for name in fields
+                if not (exclude and name in exclude)
+            }
+        if exclude_none:
+            data = {name: value for name, value in data.items() if value is not None}
+        return serialization.dumps(data, indent=indent)
+
+    @classmethod
+    def from_json(cls, data: Union[bytes, str], validate: bool = True) -> 'CivicExtraction':
+        """Decode JSON produced by ``to_json`` or ``model_dump_json``.
+
+        ``validate=False`` skips pydantic validation for trusted input
+        written by this pipeline, which makes decoding several times faster.
+        """
+        fields = serialization.loads(data)
+        if validate:
+            return cls.model_validate(fields)
+        source = fields.get("source")
+        if source is not None:
+            fields["source"] = SourceReference.model_construct(
+                path=source["path"],
+                content_hash=source["content_hash"],
+                page_spans=[tuple(span) for span in source.get("page_spans", [])]
+            )
+        return cls.model_construct(**fields)
+
     def model_dump_json(self, **kwargs):
-        return super().model_dump_json(exclude_none=True)
\ No newline at end of file
+        kwargs.setdefault("exclude_none", True)
+        return super().model_dump_json(**kwargs)
\ No newline at end of file
@@ -0,0 +1,113 @@
+import sys
+from typing import Any, ClassVar, Dict, FrozenSet, Iterable, List, Optional, Tuple, Type
+
+class ExtractedRecord:
+    """Compact, slotted stand-in for one cleaned extraction item.
+
+    Known fields live in ``__slots__``; enum-like string fields are interned
+    so repeated values such as ``"missense"`` share one object, and list
+    fields are stored as tuples. Keys outside the schema (``validation``,
+    ``react_context``, ...) are kept in ``extra`` so that
+    ``from_dict(item).to_dict() == item`` for any item the extractor emits.
+    """
+
+    __slots__ = ("extra",)
+
+    FIELDS: ClassVar[Tuple[str, ...]] = ()
+    LIST_FIELDS: ClassVar[FrozenSet[str]] = frozenset()
+    INTERNED_FIELDS: ClassVar[FrozenSet[str]] = frozenset()
+    DEFAULTS: ClassVar[Dict[str, Any]] = {}
+
+    def __init__(self, extra: Optional[Dict[str, Any]] = None, **fields: Any):
+        for field in self.FIELDS:
+            value = fields.pop(field, self.DEFAULTS.get(field, ""))
+            object.__setattr__(self, field, self._compact(field, value))
+        if fields:
+            extra = {**(extra or {}), **fields}
+        self.extra = extra or None
+
+    def _compact(self, field: str, value: Any) -> Any:
+        if field in self.INTERNED_FIELDS and type(value) is str:
+            return sys.intern(value)
+        if field in self.LIST_FIELDS and type(value) is list:
+            return tuple(value)
+        return value
+
+    def __setattr__(self, name: str, value: Any):
+        object.__setattr__(self, name, self._compact(name, value))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExtractedRecord":
+        """Build a record from the item dict shape used in ``CivicExtraction``"""
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The item as a plain dict, in the field order the extractor produces"""
+        data = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            data[field] = list(value) if field in self.LIST_FIELDS and type(value) is tuple else value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """Dict-style read access for code written against item dicts"""
+        if field in self.FIELDS:
+            return getattr(self, field)
+        return (self.extra or {}).get(field, default)
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.FIELDS + ("extra",))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+class VariantRecord(ExtractedRecord):
+    FIELDS = (
+        "description", "variant_type", "significance", "frequency", "drugs",
+        "evidence_level", "molecular_effect", "clinical_relevance",
+        "resistance_mechanisms", "biomarker_status", "confidence", "citations"
+    )
+    __slots__ = FIELDS
+    LIST_FIELDS = frozenset({"drugs", "resistance_mechanisms", "citations"})
+    INTERNED_FIELDS = frozenset({"variant_type", "significance", "evidence_level", "biomarker_status"})
+    DEFAULTS = {"frequency": "unknown", "drugs": (), "resistance_mechanisms": (), "confidence": 0.0, "citations": ()}
+
+class ClinicalEvidenceRecord(ExtractedRecord):
+    FIELDS = (
+        "description", "evidence_type", "drugs", "trial_phase", "patient_population",
+        "line_of_therapy", "significance", "confidence", "supporting_data",
+        "biomarker_requirements"
+    )
+    __slots__ = FIELDS
+    LIST_FIELDS = frozenset({"drugs", "supporting_data", "biomarker_requirements"})
+    INTERNED_FIELDS = frozenset({"evidence_type", "trial_phase", "line_of_therapy", "significance"})
+    DEFAULTS = {"drugs": (), "confidence": 0.0, "supporting_data": (), "biomarker_requirements": ()}
+
+class MolecularRecord(ExtractedRecord):
+    FIELDS = (
+        "description", "pathway", "alterations", "interactions",
+        "therapeutic_implications", "confidence"
+    )
+    __slots__ = FIELDS
+    LIST_FIELDS = frozenset({"alterations", "interactions", "therapeutic_implications"})
+    INTERNED_FIELDS = frozenset({"pathway"})
+    DEFAULTS = {"alterations": (), "interactions": (), "therapeutic_implications": (), "confidence": 0.0}
+
+RECORD_TYPES: Dict[str, Type[ExtractedRecord]] = {
+    "variants": VariantRecord,
+    "clinical_evidence": ClinicalEvidenceRecord,
+    "molecular_data": MolecularRecord
+}
+
+def to_records(section: str, items: Iterable[Dict[str, Any]]) -> List[ExtractedRecord]:
+    """Convert the item dicts of one ``CivicExtraction`` section to records"""
+    record_type = RECORD_TYPES[section]
+    return [record_type.from_dict(item) for item in items]
+
+def to_dicts(records: Iterable[ExtractedRecord]) -> List[Dict[str, Any]]:
+    """Convert records back to the item dict shape"""
+    return [record.to_dict() for record in records]
@@ -48,4 +48,42 @@ class PromptTemplates:
   ]
 }
 
-Be comprehensive and include ALL relevant information from the text. Provide evidence levels and confidence scores for each entry.'''
\ No newline at end of file
+Be comprehensive and include ALL relevant information from the text. Provide evidence levels and confidence scores for each entry.'''
+
+    VALIDATION_PROMPT = '''Validate this extracted CIVIC item against the source-derived fields it contains. Use ReACT methodology:
+1. REASON about whether the variant, evidence and drug associations are internally consistent
+2. ACT by checking required fields, evidence level and clinical significance
+3. CONCLUDE with a verdict and confidence
+
+Respond with JSON only:
+{
+  "is_valid": true/false,
+  "confidence_score": 0-1 score,
+  "reasoning": "short justification",
+  "suggestions": ["concrete fixes, if any"]
+}'''
+
+    POST_PROCESSING_PROMPT = '''Review this complete CIVIC extraction as a whole. Check for duplicated or contradictory variants, evidence that references variants not listed, and missing clinical context. Use ReACT methodology to REASON, ACT and CONCLUDE.
+
+Respond with JSON only:
+{
+  "is_valid": true/false,
+  "confidence_score": 0-1 score,
+  "reasoning": "short justification",
+  "suggestions": ["concrete fixes, if any"]
+}'''
+
+    BATCH_VALIDATION_PROMPT = '''Validate each extracted CIVIC item in the list below. Items are given as {"index": n, "item": {...}}. Judge every item independently using ReACT methodology: REASON about internal consistency, ACT by checking required fields, evidence level and clinical significance, then CONCLUDE.
+
+Respond with JSON only, one result per input index:
+{
+  "results": [
+    {
+      "index": n,
+      "is_valid": true/false,
+      "confidence_score": 0-1 score,
+      "reasoning": "short justification",
+      "suggestions": ["concrete fixes, if any"]
+    }
+  ]
+}'''
@@ -0,0 +1,267 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+from .logger import setup_logger
+
+class ResponseCache:
+    """Disk-backed, content-addressed cache for LLM responses.
+
+    Entries live in a single SQLite database in WAL mode, so several worker
+    processes on one host can read and write it concurrently. Values are
+    zlib-compressed; the oldest entries are evicted once the cache exceeds
+    ``max_size_mb`` and anything older than ``max_age_days`` expires.
+    """
+
+    # Run size/age eviction after this many writes
+    EVICTION_INTERVAL = 100
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_size_mb: float = 1024,
+        max_age_days: float = 30,
+        bypass: bool = False
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.bypass = bypass
+        self.logger = setup_logger(__name__)
+
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+        self.evict()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection to the cache database"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(model: str, prompt: str, max_tokens: int, text: str) -> str:
+        """Hash every input that influences the model's response"""
+        digest = hashlib.sha256()
+        for part in (model, prompt, str(max_tokens), text):
+            encoded = part.encode("utf-8")
+            digest.update(len(encoded).to_bytes(8, "big"))
+            digest.update(encoded)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key`` or None"""
+        if self.bypass:
+            return None
+
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] <= self.max_age_seconds:
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            else:
+                row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, key: str, value: str):
+        """Store a response, evicting old entries periodically"""
+        if self.bypass:
+            return
+
+        blob = zlib.compress(value.encode("utf-8"))
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now)
+            )
+
+        with self._lock:
+            self._writes += 1
+            run_eviction = self._writes % self.EVICTION_INTERVAL == 0
+        if run_eviction:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones above the size limit"""
+        removed = 0
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM entries WHERE created_at < ?",
+                (time.time() - self.max_age_seconds,)
+            )
+            removed += cursor.rowcount
+
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_size_bytes:
+                excess = total - self.max_size_bytes
+                stale_keys = []
+                for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                    stale_keys.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                conn.executemany("DELETE FROM entries WHERE key = ?", stale_keys)
+                removed += len(stale_keys)
+
+        if removed:
+            self.logger.debug(f"Evicted {removed} cache entries")
+        return removed
+
+    def clear(self):
+        """Remove every entry"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus on-disk totals"""
+        with self._connect() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+            "bypass": self.bypass
+        }
+
+
+class PDFTextCache:
+    """Sharded on-disk cache of per-page PDF text.
+
+    Entries are keyed by the PDF's content hash and the extractor version, so
+    renamed or copied files still hit and a change to the extraction logic
+    invalidates old entries automatically. Each entry is a zlib-compressed
+    JSON list of page strings, written atomically via rename.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.logger = setup_logger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def hash_file(path: Union[str, Path], block_size: int = 1024 * 1024) -> str:
+        """SHA-256 of a file's contents, read in blocks"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _entry_path(self, content_hash: str, version: str) -> Path:
+        version_tag = hashlib.sha256(version.encode("utf-8")).hexdigest()[:12]
+        return self.directory / content_hash[:2] / f"{content_hash}-{version_tag}.json.z"
+
+    def get(self, content_hash: str, version: str) -> Optional[List[str]]:
+        """Return cached page texts or None"""
+        path = self._entry_path(content_hash, version)
+        try:
+            pages = json.loads(zlib.decompress(path.read_bytes()))
+        except (OSError, ValueError, zlib.error):
+            pages = None
+
+        with self._lock:
+            if pages is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return pages
+
+    def put(self, content_hash: str, version: str, pages: List[str]):
+        """Atomically store page texts"""
+        path = self._entry_path(content_hash, version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        blob = zlib.compress(json.dumps(pages).encode("utf-8"))
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def writer(self, content_hash: str, version: str) -> "PageCacheWriter":
+        """Open an incremental writer that stores pages as they are extracted"""
+        path = self._entry_path(content_hash, version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return PageCacheWriter(path)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process"""
+        return {"hits": self.hits, "misses": self.misses}
+
+class PageCacheWriter:
+    """Stream pages into a cache entry without holding the whole document.
+
+    Produces the same compressed JSON list as ``PDFTextCache.put``. The entry
+    only becomes visible on ``commit``; ``abort`` discards it.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        fd, self._tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        self._file = os.fdopen(fd, 'wb')
+        self._compressor = zlib.compressobj()
+        self._first = True
+        self._write("[")
+
+    def _write(self, text: str):
+        self._file.write(self._compressor.compress(text.encode("utf-8")))
+
+    def add(self, page: str):
+        """Append one page"""
+        self._write(("" if self._first else ",") + json.dumps(page))
+        self._first = False
+
+    def commit(self):
+        """Finish the entry and atomically move it into place"""
+        self._write("]")
+        self._file.write(self._compressor.flush())
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Discard a partially written entry"""
+        self._file.close()
+        Path(self._tmp_path).unlink(missing_ok=True)
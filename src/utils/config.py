@@ -0,0 +1,15 @@
+import os
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+import yaml
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parents[2] / "config" / "config.yaml"
+
+def load_config(path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """Load pipeline settings from YAML (``$CIVIC_CONFIG`` or config/config.yaml)"""
+    config_path = Path(path or os.getenv("CIVIC_CONFIG", DEFAULT_CONFIG_PATH))
+    if not config_path.exists():
+        return {}
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
@@ -0,0 +1,222 @@
+import json
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+class IncrementalItemParser:
+    """Emit elements of top-level JSON arrays as soon as they are complete.
+
+    Text is fed in arbitrary pieces (e.g. streamed model output). Parsing
+    starts at the first ``{``; leading prose and code fences are skipped.
+    Whenever an element of one of the watched ``sections`` arrays closes, it
+    is decoded and returned as ``(section, element)``. Each character is
+    scanned exactly once: only the unfinished element is kept for scanning.
+    The fed pieces are also kept as they are, so that ``text`` can return the
+    whole response for caching and fallback parsing.
+    """
+
+    def __init__(self, sections: Iterable[str] = ("variants", "clinical_evidence", "molecular_data")):
+        self.sections = set(sections)
+        self._pieces: List[str] = []
+        self._buffer = ""
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._pending_key: Optional[str] = None
+        self._active_section: Optional[str] = None
+        self._item_start: Optional[int] = None
+        self.started = False
+        self.finished = False
+
+    def feed(self, piece: str) -> List[Tuple[str, Any]]:
+        """Consume more text and return the elements completed by it"""
+        self._pieces.append(piece)
+        text = self._buffer + piece
+        scan_from = len(self._buffer)
+        items = []
+        for i in range(scan_from, len(text)):
+            if self.finished:
+                break
+            c = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_key = json.loads(text[self._string_start:i + 1])
+                continue
+
+            if not self.started:
+                if c == "{":
+                    self.started = True
+                    self._stack.append(c)
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == ":" and len(self._stack) == 1:
+                self._pending_key = self._last_key
+            elif c == ",":
+                if len(self._stack) == 1:
+                    self._pending_key = None
+            elif c in "{[":
+                if self._in_active_array():
+                    self._item_start = i
+                elif c == "[" and len(self._stack) == 1 and self._pending_key in self.sections:
+                    self._active_section = self._pending_key
+                self._stack.append(c)
+            elif c in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if self._in_active_array() and self._item_start is not None:
+                    try:
+                        items.append((self._active_section, json.loads(text[self._item_start:i + 1])))
+                    except json.JSONDecodeError:
+                        pass
+                    self._item_start = None
+                elif len(self._stack) == 1:
+                    self._active_section = None
+                elif not self._stack:
+                    self.finished = True
+
+        # Keep only the text of an unfinished element or string
+        keep_from = len(text)
+        if self._item_start is not None:
+            keep_from = self._item_start
+        if self._in_string:
+            keep_from = min(keep_from, self._string_start)
+        self._buffer = text[keep_from:]
+        if self._item_start is not None:
+            self._item_start -= keep_from
+        self._string_start -= keep_from
+        return items
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return "".join(self._pieces)
+
+    def _in_active_array(self) -> bool:
+        return self._active_section is not None and len(self._stack) == 2
+
+class JSONCandidate(NamedTuple):
+    """A JSON object found in free text"""
+    value: Dict[str, Any]
+    start: int
+    end: int
+    repaired: bool
+
+_DECODER = json.JSONDecoder()
+
+# A JSON string (group 1 is its closing quote, absent if truncated) or a structural character
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*(")?|[{}\[\],]')
+
+# Unbalanced spans tolerated before giving up on the rest of the text
+MAX_TRUNCATED_RETRIES = 3
+
+def _scan_object(text: str, start: int) -> Tuple[Optional[int], int, List[str]]:
+    """Find where the object opening at ``start`` ends.
+
+    Returns ``(end, cut, open_containers)``. ``end`` is None when the text
+    runs out first; ``cut`` is then the last position at which the text ends
+    on a complete value (-1 if none) and ``open_containers`` the brackets
+    still open there. Whole strings are skipped by the regex, so the loop
+    runs once per token rather than once per character.
+    """
+    stack: List[str] = []
+    cut = -1
+    cut_depth = 0
+    for match in _TOKEN.finditer(text, start):
+        token = match.group()
+        c = token[0]
+        if c == '"':
+            if match.group(1) is None:
+                break
+        elif c in "{[":
+            stack.append(c)
+        elif c in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return match.end(), -1, []
+            cut, cut_depth = match.end(), len(stack)
+        else:
+            cut, cut_depth = match.start(), len(stack)
+
+    # Between the cut and the end only containers were opened, so the
+    # containers open at the cut are a prefix of the final stack
+    return None, cut, stack[:cut_depth]
+
+def _repair_truncated(text: str, start: int, cut: int, open_containers: List[str]) -> Optional[Dict[str, Any]]:
+    """Close a truncated object at its last complete value"""
+    closers = "".join("}" if opener == "{" else "]" for opener in reversed(open_containers))
+    try:
+        value = json.loads(text[start:cut] + closers)
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+def find_json_objects(text: str) -> List[JSONCandidate]:
+    """Find every top-level JSON object in ``text`` in linear time.
+
+    Scanning starts at the first ```json fence when there is one. Each
+    ``{`` is first decoded with ``JSONDecoder.raw_decode``; if that fails,
+    a bracket-balanced scan skips the whole span (prose such as ``{sic}``
+    or malformed JSON) so no character is decoded twice. If the text ends
+    inside an object (truncated output), the object is cut back to its last
+    complete value, closed, and reported as ``repaired``.
+    """
+    fence = text.find("```json")
+    position = fence + len("```json") if fence != -1 else 0
+
+    candidates = []
+    retries = 0
+    start = text.find("{", position)
+    while start != -1:
+        try:
+            value, end = _DECODER.raw_decode(text, start)
+        except json.JSONDecodeError:
+            end, cut, open_containers = _scan_object(text, start)
+            if end is None:
+                value = _repair_truncated(text, start, cut, open_containers) if cut != -1 else None
+                if value is not None:
+                    candidates.append(JSONCandidate(value, start, len(text), True))
+                    break
+                # Probably an unbalanced brace in prose; try the next one
+                retries += 1
+                if retries > MAX_TRUNCATED_RETRIES:
+                    break
+                end = start + 1
+        else:
+            if isinstance(value, dict):
+                candidates.append(JSONCandidate(value, start, end, False))
+        start = text.find("{", end)
+
+    return candidates
+
+def extract_json_object(
+    text: str,
+    preferred_keys: Iterable[str] = ("variants", "clinical_evidence", "molecular_data")
+) -> Optional[JSONCandidate]:
+    """Pick the JSON object in ``text`` most likely to be the model's answer.
+
+    Complete objects containing any of ``preferred_keys`` win, then repaired
+    ones containing them, then any complete or repaired object.
+    """
+    candidates = find_json_objects(text)
+    if not candidates:
+        return None
+
+    preferred_keys = set(preferred_keys)
+
+    def rank(candidate: JSONCandidate) -> Tuple[int, int]:
+        has_keys = bool(preferred_keys.intersection(candidate.value))
+        return (0 if has_keys else 2) + (1 if candidate.repaired else 0), candidate.start
+
+    return min(candidates, key=rank)
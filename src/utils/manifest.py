@@ -0,0 +1,170 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from .logger import setup_logger
+
+def prompt_version(prompt: str) -> str:
+    """Short fingerprint of a prompt template"""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+class JobManifest:
+    """SQLite record of every paper in a corpus run, for checkpointing and resume.
+
+    Each paper (keyed by its resolved path) has a state, the pipeline stage
+    it last reached, an attempt count, and the input hash, prompt version
+    and model of its last attempt. A paper only becomes ``done`` once its
+    output has been durably written, so after a crash resume redoes exactly
+    the papers that are not ``done`` or whose inputs have since changed.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    # Output handed to a batching sink but not flushed yet
+    WRITTEN = "written"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = setup_logger(__name__)
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS papers ("
+                "path TEXT PRIMARY KEY, state TEXT NOT NULL, stage TEXT NOT NULL DEFAULT '', "
+                "attempts INTEGER NOT NULL DEFAULT 0, input_hash TEXT, prompt_version TEXT, "
+                "model TEXT, output_path TEXT, error TEXT, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_papers_state ON papers(state)")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], output_dir: Optional[str] = None) -> Optional["JobManifest"]:
+        """Open the manifest from the ``manifest`` config section, or None when disabled.
+
+        Without an explicit ``path`` it lives next to the outputs.
+        """
+        manifest_config = config.get("manifest", {})
+        if not manifest_config.get("enabled", False):
+            return None
+        path = manifest_config.get("path") or Path(output_dir or ".") / "manifest.sqlite"
+        return cls(path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection to the manifest database"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(path: Union[str, Path]) -> str:
+        return str(Path(path).resolve())
+
+    def get(self, path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        """The manifest row of a paper, or None if it was never started"""
+        row = self._connect().execute(
+            "SELECT * FROM papers WHERE path = ?", (self._key(path),)
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def is_complete(self, path: Union[str, Path], input_hash: str, prompt_version: str, model: str) -> bool:
+        """True if the paper is done with exactly these inputs"""
+        row = self.get(path)
+        return row is not None and row["state"] == self.DONE and \
+            (row["input_hash"], row["prompt_version"], row["model"]) == (input_hash, prompt_version, model)
+
+    def register(self, paths: List[Union[str, Path]]):
+        """Add papers not seen before as pending"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO papers (path, state, updated_at) VALUES (?, ?, ?)",
+                [(self._key(path), self.PENDING, now) for path in paths]
+            )
+
+    def start(self, path: Union[str, Path], input_hash: str, prompt_version: str, model: str) -> int:
+        """Mark a paper running and return its attempt number"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO papers (path, state, stage, attempts, input_hash, prompt_version, model, updated_at) "
+                "VALUES (?, ?, 'started', 1, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET state = excluded.state, stage = excluded.stage, "
+                "attempts = attempts + 1, input_hash = excluded.input_hash, "
+                "prompt_version = excluded.prompt_version, model = excluded.model, "
+                "output_path = NULL, error = NULL, updated_at = excluded.updated_at",
+                (self._key(path), self.RUNNING, input_hash, prompt_version, model, time.time())
+            )
+            return conn.execute(
+                "SELECT attempts FROM papers WHERE path = ?", (self._key(path),)
+            ).fetchone()[0]
+
+    def _update(self, path: Union[str, Path], **fields: Any):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE papers SET {assignments} WHERE path = ?",
+                (*fields.values(), self._key(path))
+            )
+
+    def set_stage(self, path: Union[str, Path], stage: str):
+        """Record the pipeline stage a running paper has reached"""
+        self._update(path, stage=stage)
+
+    def written(self, path: Union[str, Path], output_path: str):
+        """Output handed to a buffering sink; ``finish`` follows once it is flushed"""
+        with self._connect() as conn:
+            # A flush may already have finished the paper
+            conn.execute(
+                "UPDATE papers SET state = ?, stage = 'written', output_path = ?, updated_at = ? "
+                "WHERE path = ? AND state = ?",
+                (self.WRITTEN, output_path, time.time(), self._key(path), self.RUNNING)
+            )
+
+    def finish(self, path: Union[str, Path], output_path: Optional[str] = None):
+        """Mark a paper done; its output is durably stored"""
+        fields = {"state": self.DONE, "stage": "done"}
+        if output_path is not None:
+            fields["output_path"] = output_path
+        self._update(path, **fields)
+
+    def flushed(self, path: Union[str, Path]):
+        """A buffering sink has stored the paper's rows; finish it unless it failed meanwhile"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE papers SET state = ?, stage = 'done', updated_at = ? "
+                "WHERE path = ? AND state IN (?, ?)",
+                (self.DONE, time.time(), self._key(path), self.RUNNING, self.WRITTEN)
+            )
+
+    def fail(self, path: Union[str, Path], error: str):
+        self._update(path, state=self.FAILED, error=error)
+
+    def stale(self, prompt_version: str, model: str) -> List[str]:
+        """Done papers whose results came from another prompt version or model"""
+        rows = self._connect().execute(
+            "SELECT path FROM papers WHERE state = ? AND (prompt_version IS NOT ? OR model IS NOT ?) "
+            "ORDER BY path",
+            (self.DONE, prompt_version, model)
+        ).fetchall()
+        return [row["path"] for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """Number of papers in each state"""
+        rows = self._connect().execute("SELECT state, COUNT(*) FROM papers GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
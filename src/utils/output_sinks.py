@@ -0,0 +1,384 @@
+import asyncio
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from . import serialization
+from .logger import setup_logger
+
+# Item tables written by the batched sinks; every row carries its paper_id and
+# the attempt that produced it, since reprocessed papers are appended again
+ITEM_TABLES = ("variants", "clinical_evidence", "molecular_data")
+# One row per paper with its metadata, source reference and processing stats
+PAPERS_TABLE = "papers"
+TABLES = ITEM_TABLES + (PAPERS_TABLE,)
+
+OUTPUT_FORMATS = ("json", "jsonl", "parquet")
+
+def table_rows(paper_id: str, output_data: Dict[str, Any], attempt: int = 1) -> Dict[str, List[Dict[str, Any]]]:
+    """Split one paper's output into rows of the corpus tables"""
+    rows = {
+        table: [{"paper_id": paper_id, "attempt": attempt, **item} for item in output_data.get(table, [])]
+        for table in ITEM_TABLES
+    }
+    rows[PAPERS_TABLE] = [{
+        "paper_id": paper_id,
+        "attempt": attempt,
+        "metadata": output_data.get("metadata", {}),
+        "source": output_data.get("source"),
+        "stats": output_data.get("stats", {})
+    }]
+    return rows
+
+class OutputSink:
+    """Destination for per-paper extraction results"""
+
+    format = ""
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.logger = setup_logger(__name__)
+
+    def write(self, paper_id: str, output_data: Dict[str, Any], attempt: Optional[int] = None) -> str:
+        """Store a paper's results and return where they went.
+
+        ``attempt`` numbers the times a paper has been processed, so that
+        appending sinks can tell the latest results apart. Appending sinks
+        never reuse an attempt already in their tables; without one they
+        take the next after the paper's latest.
+        """
+        raise NotImplementedError
+
+    async def awrite(self, paper_id: str, output_data: Dict[str, Any], attempt: Optional[int] = None) -> str:
+        """``write`` with its file I/O off the event loop"""
+        return await asyncio.to_thread(self.write, paper_id, output_data, attempt)
+
+    def flush(self):
+        """Persist anything buffered"""
+
+    async def aflush(self):
+        await asyncio.to_thread(self.flush)
+
+    def close(self):
+        self.flush()
+
+    async def aclose(self):
+        await self.aflush()
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class JSONFileSink(OutputSink):
+    """One pretty-printed ``analysis_<paper_id>.json`` file per paper"""
+
+    format = "json"
+
+    def path_for(self, paper_id: str) -> Path:
+        return self.directory / f"analysis_{paper_id}.json"
+
+    def write(self, paper_id: str, output_data: Dict[str, Any], attempt: Optional[int] = None) -> str:
+        path = self.path_for(paper_id)
+        serialization.dump_file(output_data, path)
+        return str(path)
+
+class BatchedSink(OutputSink):
+    """Buffer table rows and write them out in batches.
+
+    Buffers are flushed once ``batch_size`` rows are pending or
+    ``flush_interval`` seconds have passed since the last flush, and
+    always on ``close``. ``awrite`` buffers on the event loop and writes
+    batches from a worker thread.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        batch_size: int = 500,
+        flush_interval: float = 5.0
+    ):
+        super().__init__(directory)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        # Called with the paper IDs whose rows a flush has just written
+        self.on_flush: Optional[Callable[[List[str]], None]] = None
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {table: [] for table in TABLES}
+        self._papers: List[str] = []
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self.rows_written = 0
+        # Latest attempt per paper, read from the tables on first write
+        self._attempts: Optional[Dict[str, int]] = None
+        # Batches taken off the buffers may be written from worker threads
+        self._write_lock = threading.Lock()
+
+    def _buffer(self, paper_id: str, output_data: Dict[str, Any], attempt: Optional[int]) -> bool:
+        """Add a paper's rows to the buffers and return whether a flush is due"""
+        if self._attempts is None:
+            self._attempts = self._read_attempts()
+        # A rerun without a job manifest must not append rows under an
+        # attempt that is already in the tables
+        attempt = max(attempt or 0, self._attempts.get(paper_id, 0) + 1)
+        self._attempts[paper_id] = attempt
+        for table, rows in table_rows(paper_id, output_data, attempt).items():
+            self._buffers[table].extend(rows)
+            self._pending += len(rows)
+        self._papers.append(paper_id)
+        return self._pending >= self.batch_size or \
+            time.monotonic() - self._last_flush >= self.flush_interval
+
+    def write(self, paper_id: str, output_data: Dict[str, Any], attempt: Optional[int] = None) -> str:
+        if self._buffer(paper_id, output_data, attempt):
+            self.flush()
+        return str(self.directory)
+
+    async def awrite(self, paper_id: str, output_data: Dict[str, Any], attempt: Optional[int] = None) -> str:
+        if self._buffer(paper_id, output_data, attempt):
+            await self.aflush()
+        return str(self.directory)
+
+    def _take_batch(self) -> Tuple[Dict[str, List[Dict[str, Any]]], List[str]]:
+        """Empty the buffers and return their rows and papers.
+
+        A batch whose write fails is dropped: its papers never count as
+        flushed, so a resumed run processes them again.
+        """
+        batch = (self._buffers, self._papers)
+        self._buffers = {table: [] for table in TABLES}
+        self._papers = []
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        return batch
+
+    def _write_batch(self, buffers: Dict[str, List[Dict[str, Any]]]):
+        with self._write_lock:
+            for table, rows in buffers.items():
+                if rows:
+                    self._write_rows(table, rows)
+                    self.rows_written += len(rows)
+
+    def flush(self):
+        buffers, papers = self._take_batch()
+        self._write_batch(buffers)
+        if papers and self.on_flush is not None:
+            self.on_flush(papers)
+
+    async def aflush(self):
+        buffers, papers = self._take_batch()
+        await asyncio.to_thread(self._write_batch, buffers)
+        # on_flush runs back on the event loop, like the rest of the caller's code
+        if papers and self.on_flush is not None:
+            self.on_flush(papers)
+
+    def _read_attempts(self) -> Dict[str, int]:
+        """Latest attempt per paper in the papers table already written"""
+        raise NotImplementedError
+
+    def _write_rows(self, table: str, rows: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+class JSONLSink(BatchedSink):
+    """Append-only ``<table>.jsonl`` files, one JSON object per row"""
+
+    format = "jsonl"
+
+    def __init__(self, directory: Union[str, Path], batch_size: int = 500, flush_interval: float = 5.0):
+        super().__init__(directory, batch_size=batch_size, flush_interval=flush_interval)
+        for table in TABLES:
+            self._repair(self.directory / f"{table}.jsonl")
+
+    def _repair(self, path: Path):
+        """Cut off a final line left partial by a crash, so appends start on a fresh line"""
+        if not path.exists() or path.stat().st_size == 0:
+            return
+        with open(path, "rb+") as f:
+            data = f.read()
+            if data.endswith(b"\n"):
+                return
+            keep = data.rfind(b"\n") + 1
+            self.logger.warning(f"⚠️ Dropping truncated last row of {path.name}")
+            f.truncate(keep)
+
+    def _read_attempts(self) -> Dict[str, int]:
+        rows = self.read(self.directory, PAPERS_TABLE)
+        return _latest_attempts([row["paper_id"] for row in rows], [row.get("attempt") for row in rows])
+
+    def _write_rows(self, table: str, rows: List[Dict[str, Any]]):
+        lines = b"".join(serialization.dumps(row) + b"\n" for row in rows)
+        with open(self.directory / f"{table}.jsonl", "ab") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def read(directory: Union[str, Path], table: str) -> List[Dict[str, Any]]:
+        """Rows of one table, skipping a final line left partial by a crash"""
+        path = Path(directory) / f"{table}.jsonl"
+        if not path.exists():
+            return []
+        with open(path, "rb") as f:
+            # Every complete row ends in a newline
+            return [serialization.loads(line) for line in f if line.endswith(b"\n") and line.strip()]
+
+class ParquetSink(BatchedSink):
+    """Parquet datasets, one directory per table and one part file per flush.
+
+    Fields whose values in a batch share one scalar type keep it as a
+    typed column. Nested fields, and fields LLM output gives different
+    types across rows, are stored as strings with non-string values
+    JSON-encoded; ``read`` casts a field to string when part files
+    disagree on its type. Requires ``pyarrow``.
+    """
+
+    format = "parquet"
+
+    def __init__(self, directory: Union[str, Path], batch_size: int = 500, flush_interval: float = 5.0):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow") from e
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        super().__init__(directory, batch_size=batch_size, flush_interval=flush_interval)
+        self._parts = {
+            table: len(list((self.directory / table).glob("part-*.parquet"))) for table in TABLES
+        }
+
+    SCALAR_TYPES = (str, bool, int, float)
+
+    def _read_attempts(self) -> Dict[str, int]:
+        papers = self.read(self.directory, PAPERS_TABLE)
+        attempts = papers.column("attempt").to_pylist() if "attempt" in papers.column_names \
+            else [None] * papers.num_rows
+        return _latest_attempts(papers.column("paper_id").to_pylist(), attempts)
+
+    @classmethod
+    def _columns(cls, rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """Rows as columns, JSON-encoding the columns that are nested or mixed"""
+        names = list(dict.fromkeys(key for row in rows for key in row))
+        columns = {}
+        for name in names:
+            values = [row.get(name) for row in rows]
+            kinds = {type(value) for value in values if value is not None}
+            if kinds <= {int, float} or (len(kinds) == 1 and kinds <= set(cls.SCALAR_TYPES)):
+                columns[name] = values
+            else:
+                columns[name] = [
+                    value if value is None or isinstance(value, str)
+                    else serialization.dumps(value).decode("utf-8")
+                    for value in values
+                ]
+        return columns
+
+    def _write_rows(self, table: str, rows: List[Dict[str, Any]]):
+        table_dir = self.directory / table
+        table_dir.mkdir(exist_ok=True)
+        arrow_table = self._pa.Table.from_pydict(self._columns(rows))
+        self._pq.write_table(arrow_table, table_dir / f"part-{self._parts[table]:05d}.parquet")
+        self._parts[table] += 1
+
+    @staticmethod
+    def read(directory: Union[str, Path], table: str):
+        """One ``pyarrow.Table`` with all part files of a table"""
+        import pyarrow
+        import pyarrow.parquet
+        parts = sorted((Path(directory) / table).glob("part-*.parquet"))
+        if not parts:
+            return pyarrow.table({"paper_id": pyarrow.array([], pyarrow.string())})
+        tables = [pyarrow.parquet.read_table(part) for part in parts]
+        # A field typed in one batch may be JSON text in another; numbers
+        # widen on their own, anything else falls back to strings
+        types: Dict[str, set] = {}
+        for table in tables:
+            for field in table.schema:
+                if not pyarrow.types.is_null(field.type):
+                    types.setdefault(field.name, set()).add(field.type)
+        mixed = {
+            name for name, kinds in types.items()
+            if len(kinds) > 1 and not all(
+                pyarrow.types.is_integer(kind) or pyarrow.types.is_floating(kind) for kind in kinds
+            )
+        }
+        if mixed:
+            tables = [
+                table.cast(pyarrow.schema([
+                    pyarrow.field(field.name, pyarrow.string()) if field.name in mixed else field
+                    for field in table.schema
+                ]))
+                for table in tables
+            ]
+        # Part files written from different batches may also differ in columns
+        return pyarrow.concat_tables(tables, promote_options="permissive")
+
+def create_sink(
+    output_format: str,
+    directory: Union[str, Path],
+    batch_size: int = 500,
+    flush_interval: float = 5.0
+) -> OutputSink:
+    """Build the sink for an output format"""
+    if output_format == "json":
+        return JSONFileSink(directory)
+    if output_format == "jsonl":
+        return JSONLSink(directory, batch_size=batch_size, flush_interval=flush_interval)
+    if output_format == "parquet":
+        return ParquetSink(directory, batch_size=batch_size, flush_interval=flush_interval)
+    raise ValueError(f"Unknown output format: {output_format} (expected one of {', '.join(OUTPUT_FORMATS)})")
+
+def _latest_attempts(paper_ids: List[str], attempts: List[Optional[int]]) -> Dict[str, int]:
+    """Latest attempt per paper, from the rows of the papers table"""
+    latest: Dict[str, int] = {}
+    for paper_id, attempt in zip(paper_ids, attempts):
+        latest[paper_id] = max(latest.get(paper_id, 0), attempt or 0)
+    return latest
+
+def load_corpus(directory: Union[str, Path], output_format: Optional[str] = None) -> Dict[str, Any]:
+    """Load every table of a corpus written by a batched sink.
+
+    Returns ``{table: rows}``: lists of dicts for JSONL output and
+    ``pyarrow.Table`` objects for Parquet output. The format is detected
+    from the directory contents when not given. Papers processed more than
+    once keep only the rows of their latest attempt in the papers table, so
+    rows of an interrupted later attempt never mix with complete ones.
+    """
+    directory = Path(directory)
+    if output_format is None:
+        output_format = "parquet" if (directory / PAPERS_TABLE).is_dir() else "jsonl"
+    if output_format == "jsonl":
+        tables = {table: JSONLSink.read(directory, table) for table in TABLES}
+        latest = _latest_attempts(
+            [row["paper_id"] for row in tables[PAPERS_TABLE]],
+            [row.get("attempt") for row in tables[PAPERS_TABLE]]
+        )
+        return {
+            table: [row for row in rows if latest.get(row["paper_id"]) == (row.get("attempt") or 0)]
+            for table, rows in tables.items()
+        }
+    if output_format == "parquet":
+        import pyarrow
+        import pyarrow.compute as pc
+        tables = {table: ParquetSink.read(directory, table) for table in TABLES}
+
+        def attempts(table):
+            if "attempt" not in table.column_names:
+                return pyarrow.array([0] * table.num_rows, pyarrow.int64())
+            return pc.fill_null(table.column("attempt"), 0)
+
+        papers = tables[PAPERS_TABLE]
+        latest = pyarrow.table({"paper_id": papers.column("paper_id"), "attempt": attempts(papers)}) \
+            .group_by("paper_id").aggregate([("attempt", "max")])
+        latest_ids = latest.column("paper_id").combine_chunks()
+
+        def latest_rows(table):
+            # Rows of papers missing from the papers table get a null latest
+            # attempt and are dropped by the filter
+            positions = pc.index_in(table.column("paper_id"), value_set=latest_ids)
+            return table.filter(pc.equal(attempts(table), pc.take(latest.column("attempt_max"), positions)))
+
+        return {table_name: latest_rows(table) for table_name, table in tables.items()}
+    raise ValueError(f"Cannot load corpus in format: {output_format}")
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+from .logger import setup_logger
+
+class RateLimiter:
+    """Shared async limiter for requests-per-minute and tokens-per-minute budgets.
+
+    Both budgets are token buckets that refill continuously and hold at most
+    one minute's worth of quota. Callers wait in FIFO order: the caller at
+    the head of the queue sleeps until both buckets can cover its request,
+    and everyone behind it waits their turn, so large requests are not
+    starved by a stream of small ones.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 50,
+        tokens_per_minute: float = 100000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if requests_per_minute <= 0 or tokens_per_minute <= 0:
+            raise ValueError("Rate limits must be positive")
+
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._request_budget = float(requests_per_minute)
+        self._token_budget = float(tokens_per_minute)
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+        self.logger = setup_logger(__name__)
+
+        # Totals for reporting
+        self.total_requests = 0
+        self.total_tokens = 0
+        self.total_wait = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["RateLimiter"]:
+        """Build a limiter from the ``rate_limits`` config section, if present"""
+        limits = config.get("rate_limits")
+        if not limits or not limits.get("enabled", True):
+            return None
+        return cls(
+            requests_per_minute=limits.get("requests_per_minute", 50),
+            tokens_per_minute=limits.get("tokens_per_minute", 100000)
+        )
+
+    def _refill(self):
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._request_budget = min(
+            self.requests_per_minute,
+            self._request_budget + elapsed * self.requests_per_minute / 60
+        )
+        self._token_budget = min(
+            self.tokens_per_minute,
+            self._token_budget + elapsed * self.tokens_per_minute / 60
+        )
+
+    def _wait_time(self, tokens: float) -> float:
+        """Seconds until both buckets can cover a request of ``tokens``"""
+        request_deficit = max(0.0, 1 - self._request_budget)
+        token_deficit = max(0.0, tokens - self._token_budget)
+        return max(
+            request_deficit * 60 / self.requests_per_minute,
+            token_deficit * 60 / self.tokens_per_minute
+        )
+
+    async def acquire(self, tokens: int):
+        """Wait until one request of ``tokens`` estimated tokens fits the budget"""
+        # A request larger than a minute's quota could never fit; cap it
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            self._refill()
+            wait = self._wait_time(tokens)
+            while wait > 0:
+                self.total_wait += wait
+                await asyncio.sleep(wait)
+                self._refill()
+                wait = self._wait_time(tokens)
+
+            self._request_budget -= 1
+            self._token_budget -= tokens
+            self.total_requests += 1
+            self.total_tokens += tokens
+
+    def reconcile(self, estimated: int, actual: int):
+        """Correct the token budget once the real usage of a request is known"""
+        estimated = min(estimated, self.tokens_per_minute)
+        self._token_budget += estimated - actual
+        self.total_tokens += actual - estimated
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.total_requests,
+            "tokens": self.total_tokens,
+            "wait_seconds": round(self.total_wait, 3)
+        }
@@ -0,0 +1,85 @@
+import json
+import math
+import os
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stdlib encoder produces the same JSON
+    orjson = None
+
+_ORJSON_OPTIONS = 0 if orjson is None else orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _default(value: Any) -> Any:
+    """Encode values JSON has no type for, the way orjson does where it can"""
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "tolist"):  # NumPy arrays and scalars
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+def _finite(value: Any) -> Any:
+    """Copy of ``value`` with NaN and infinite floats replaced by None, as orjson writes them"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Encode ``obj`` as UTF-8 JSON, with orjson when it is installed"""
+    if orjson is not None:
+        options = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, default=_default, option=options)
+        except TypeError:
+            # Integers beyond 64 bits and other values orjson rejects outright
+            pass
+
+    def encode(value: Any) -> str:
+        return json.dumps(
+            value, default=lambda v: _finite(_default(v)), ensure_ascii=False, allow_nan=False,
+            indent=2 if indent else None, separators=None if indent else (",", ":")
+        )
+
+    try:
+        return encode(obj).encode("utf-8")
+    except ValueError:
+        # NaN is not JSON; write null like orjson instead of a bare NaN token
+        return encode(_finite(obj)).encode("utf-8")
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON produced by ``dumps``"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dump_file(obj: Any, path: Union[str, Path], indent: bool = True):
+    """Atomically write ``obj`` as JSON to ``path``.
+
+    The file is written and synced under a temporary name, then renamed, so
+    ``path`` never holds a partial document.
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(dumps(obj, indent=indent))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+def load_file(path: Union[str, Path]) -> Any:
+    return loads(Path(path).read_bytes())
@@ -0,0 +1,128 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+import re
+
+# One match per likely BPE token: short letter runs, digit groups, punctuation pairs.
+# Long words split into several matches, much like a subword tokenizer.
+_TOKEN_PIECE = re.compile(r"[A-Za-z]{1,6}|\d{1,3}|[^\sA-Za-z\d]{1,2}")
+
+# Tokens added by the messages wrapper around the prompt and text
+MESSAGE_OVERHEAD_TOKENS = 16
+
+def estimate_tokens(text: str) -> int:
+    """Fast local token estimate, erring slightly high for scientific text"""
+    return len(_TOKEN_PIECE.findall(text))
+
+class ModelLimits(NamedTuple):
+    """Context size, output ceiling and list price (USD per million tokens) of a model"""
+    context_window: int
+    max_output_tokens: int
+    input_cost_per_mtok: float
+    output_cost_per_mtok: float
+
+MODEL_LIMITS = {
+    "claude-3-opus-20240229": ModelLimits(200000, 4096, 15.0, 75.0),
+    "claude-3-sonnet-20240229": ModelLimits(200000, 4096, 3.0, 15.0),
+    "claude-3-haiku-20240307": ModelLimits(200000, 4096, 0.25, 1.25),
+    "claude-3-5-sonnet-20240620": ModelLimits(200000, 8192, 3.0, 15.0),
+}
+
+class RequestPlan(NamedTuple):
+    """What a request will cost and whether it can be sent at all"""
+    input_tokens: int
+    max_tokens: int
+    fits: bool
+    estimated_cost: float
+
+class RequestPlanner:
+    """Size requests against a model's context window and price them before sending"""
+
+    def __init__(
+        self,
+        model: str,
+        limits: Optional[ModelLimits] = None,
+        safety_margin: float = 0.05,
+        min_output_tokens: int = 256
+    ):
+        self.model = model
+        self.limits = limits or MODEL_LIMITS.get(model, MODEL_LIMITS["claude-3-opus-20240229"])
+        self.safety_margin = safety_margin
+        self.min_output_tokens = min_output_tokens
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], model: str) -> "RequestPlanner":
+        """Build a planner, applying overrides from the ``models`` config section"""
+        models_config = config.get("models", {})
+        base = MODEL_LIMITS.get(model, MODEL_LIMITS["claude-3-opus-20240229"])
+        overrides = {
+            field: models_config[field]
+            for field in ModelLimits._fields
+            if models_config.get(field) is not None
+        }
+        return cls(model, limits=base._replace(**overrides))
+
+    @property
+    def usable_context(self) -> int:
+        """Context tokens available after the safety margin for estimation error"""
+        return int(self.limits.context_window * (1 - self.safety_margin))
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        """List price in USD of a request"""
+        return (
+            input_tokens * self.limits.input_cost_per_mtok +
+            output_tokens * self.limits.output_cost_per_mtok
+        ) / 1_000_000
+
+    def plan(self, prompt: str, text: str, max_tokens: int = 4000) -> RequestPlan:
+        """Estimate input tokens, clamp ``max_tokens`` and check the context fits"""
+        input_tokens = estimate_tokens(prompt) + estimate_tokens(text) + MESSAGE_OVERHEAD_TOKENS
+        room = self.usable_context - input_tokens
+        max_tokens = max(0, min(max_tokens, self.limits.max_output_tokens, room))
+        fits = max_tokens >= self.min_output_tokens
+        return RequestPlan(input_tokens, max_tokens, fits, self.cost(input_tokens, max_tokens))
+
+    def max_chunk_tokens(self, prompt: str, max_tokens: int = 4000, preferred: int = 12000) -> int:
+        """Largest text chunk (in tokens) that leaves room for the prompt and the output"""
+        room = self.usable_context - estimate_tokens(prompt) - MESSAGE_OVERHEAD_TOKENS - \
+            min(max_tokens, self.limits.max_output_tokens)
+        return max(1, min(preferred, room))
+
+# Usage of the requests made while processing one paper
+_current_usage: ContextVar[Optional[Dict[str, Any]]] = ContextVar("llm_usage", default=None)
+
+@contextmanager
+def usage_scope() -> Iterator[Dict[str, Any]]:
+    """Collect token usage and cost of every request made inside the block.
+
+    The ledger lives in a context variable, so tasks spawned inside the
+    block (chunk analyses, validations) report into it while concurrent
+    papers keep separate ledgers.
+    """
+    usage = {
+        "llm_requests": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "estimated_cost_usd": 0.0
+    }
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+def record_usage(planner: RequestPlanner, plan: RequestPlan, usage: Optional[Dict[str, int]] = None):
+    """Add one request to the current ledger; reported usage beats the estimate"""
+    ledger = _current_usage.get()
+    if ledger is None:
+        return
+    input_tokens = (usage or {}).get("input_tokens") or plan.input_tokens
+    output_tokens = (usage or {}).get("output_tokens")
+    if output_tokens is None:
+        output_tokens = plan.max_tokens
+    ledger["llm_requests"] += 1
+    ledger["input_tokens"] += input_tokens
+    ledger["output_tokens"] += output_tokens
+    ledger["estimated_cost_usd"] = round(
+        ledger["estimated_cost_usd"] + planner.cost(input_tokens, output_tokens), 6
+    )
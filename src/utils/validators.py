@@ -1,12 +1,58 @@
-from typing import Dict, Any, List, Optional
-from ..models.data_models import (
-    CivicExtraction, VariantData, ClinicalEvidence, 
-    MolecularData, ValidationResult
-)
+from typing import Dict, Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
+from ..models.data_models import CivicExtraction, ValidationResult
 from ..utils.logger import setup_logger
 
+class FieldFailure(NamedTuple):
+    """One rule violation of one record"""
+    section: str
+    index: int
+    field: str
+    reason: str  # "missing" or "invalid_type"
+    message: str
+
+RecordChecker = Callable[[Dict[str, Any], str, int], List[FieldFailure]]
+
+def compile_rules(rules: Dict[str, Any]) -> RecordChecker:
+    """Turn a ``*_rules`` table into a checker for dict records.
+
+    Field lists and type names are resolved once, so checking a record
+    costs one ``dict.get`` per rule and failures are only built on error.
+    """
+    required = tuple(rules.get("required_fields", ()))
+    typed = tuple(
+        (field, expected_type, getattr(expected_type, "__name__", None) or
+         " or ".join(t.__name__ for t in expected_type))
+        for field, expected_type in rules.get("field_types", {}).items()
+    )
+
+    def check(record: Dict[str, Any], section: str, index: int) -> List[FieldFailure]:
+        if not isinstance(record, dict):
+            return [FieldFailure(section, index, "", "invalid_type",
+                                 f"Invalid record type: expected dict, got {type(record).__name__}")]
+        get = record.get
+        failures = None
+        for field in required:
+            if not get(field):
+                failures = failures or []
+                failures.append(FieldFailure(
+                    section, index, field, "missing", f"Missing required field: {field}"
+                ))
+        for field, expected_type, expected_name in typed:
+            value = get(field)
+            if value is not None and not isinstance(value, expected_type):
+                failures = failures or []
+                failures.append(FieldFailure(
+                    section, index, field, "invalid_type",
+                    f"Invalid type for {field}: expected {expected_name}, got {type(value).__name__}"
+                ))
+        return failures or []
+
+    return check
+
 class DataValidator:
     """Enhanced validator with ReACT integration"""
+
+    SECTIONS = ("variants", "clinical_evidence", "molecular_data")
     
     def __init__(self):
         self.logger = setup_logger(__name__)
@@ -22,7 +68,7 @@ class DataValidator:
                 "description": str,
                 "variant_type": str,
                 "significance": str,
-                "confidence": float,
+                "confidence": (int, float),
                 "diseases": list,
                 "drugs": list
             }
@@ -38,7 +84,7 @@ class DataValidator:
                 "description": str,
                 "evidence_type": str,
                 "significance": str,
-                "confidence": float,
+                "confidence": (int, float),
                 "citations": list
             }
         }
@@ -53,49 +99,57 @@ class DataValidator:
                 "description": str,
                 "pathway": str,
                 "mechanism": str,
-                "confidence": float,
+                "confidence": (int, float),
                 "protein_changes": list,
                 "cellular_effects": list
             }
         }
 
+        # Compile the rule tables once into per-record checkers
+        self._checkers: Dict[str, RecordChecker] = {
+            "variants": compile_rules(self.variant_rules),
+            "clinical_evidence": compile_rules(self.clinical_rules),
+            "molecular_data": compile_rules(self.molecular_rules)
+        }
+
+    def validate_item(self, section: str, item: Dict[str, Any]) -> tuple[bool, List[str]]:
+        """Validate one item of the given extraction section"""
+        failures = self._checkers[section](item, section, 0)
+        return not failures, [failure.message for failure in failures]
+
+    def check_records(self, section: str, records: Iterable[Dict[str, Any]]) -> List[FieldFailure]:
+        """Check a list of records of one section and return every field failure"""
+        check = self._checkers[section]
+        failures = []
+        for index, record in enumerate(records):
+            record_failures = check(record, section, index)
+            if record_failures:
+                failures.extend(record_failures)
+        return failures
+
+    def check_extractions(self, extractions: Iterable[CivicExtraction]) -> List[List[FieldFailure]]:
+        """Check many extractions in one call; one failure list per extraction"""
+        return [
+            [
+                failure
+                for section in self.SECTIONS
+                for failure in self.check_records(section, getattr(extraction, section))
+            ]
+            for extraction in extractions
+        ]
+
+    def validate_extractions(self, extractions: Iterable[CivicExtraction]) -> List[ValidationResult]:
+        """Validate many extractions in one call"""
+        extractions = list(extractions)
+        return [
+            self._build_result(extraction, failures)
+            for extraction, failures in zip(extractions, self.check_extractions(extractions))
+        ]
+
     def validate_extraction(self, extraction: CivicExtraction) -> ValidationResult:
         """Validate complete extraction"""
         try:
-            # Initialize validation results
-            is_valid = True
-            validation_messages = []
-            
-            # Validate variants
-            for variant in extraction.variants:
-                variant_valid, messages = self._validate_variant(variant)
-                is_valid &= variant_valid
-                validation_messages.extend(messages)
-            
-            # Validate clinical evidence
-            for evidence in extraction.clinical_evidence:
-                evidence_valid, messages = self._validate_clinical(evidence)
-                is_valid &= evidence_valid
-                validation_messages.extend(messages)
-            
-            # Validate molecular data
-            for data in extraction.molecular_data:
-                data_valid, messages = self._validate_molecular(data)
-                is_valid &= data_valid
-                validation_messages.extend(messages)
-            
-            # Create validation result
-            result = ValidationResult(
-                is_valid=is_valid,
-                confidence_score=self._calculate_validation_confidence(
-                    extraction, validation_messages
-                ),
-                reasoning="\n".join(validation_messages),
-                suggestions=self._generate_suggestions(validation_messages),
-                validation_type="data_validation"
-            )
-            
-            return result
+            return self.validate_extractions([extraction])[0]
             
         except Exception as e:
             self.logger.error(f"❌ Validation failed: {str(e)}", exc_info=True)
@@ -107,74 +161,17 @@ class DataValidator:
                 validation_type="data_validation"
             )
 
-    def _validate_variant(self, variant: VariantData) -> tuple[bool, List[str]]:
-        """Validate variant data"""
-        is_valid = True
-        messages = []
-        
-        # Check required fields
-        for field in self.variant_rules["required_fields"]:
-            if not getattr(variant, field, None):
-                is_valid = False
-                messages.append(f"Missing required field: {field}")
-        
-        # Check field types
-        for field, expected_type in self.variant_rules["field_types"].items():
-            value = getattr(variant, field, None)
-            if value is not None and not isinstance(value, expected_type):
-                is_valid = False
-                messages.append(
-                    f"Invalid type for {field}: "
-                    f"expected {expected_type}, got {type(value)}"
-                )
-        
-        return is_valid, messages
-
-    def _validate_clinical(self, evidence: ClinicalEvidence) -> tuple[bool, List[str]]:
-        """Validate clinical evidence"""
-        is_valid = True
-        messages = []
-        
-        # Check required fields
-        for field in self.clinical_rules["required_fields"]:
-            if not getattr(evidence, field, None):
-                is_valid = False
-                messages.append(f"Missing required field: {field}")
-        
-        # Check field types
-        for field, expected_type in self.clinical_rules["field_types"].items():
-            value = getattr(evidence, field, None)
-            if value is not None and not isinstance(value, expected_type):
-                is_valid = False
-                messages.append(
-                    f"Invalid type for {field}: "
-                    f"expected {expected_type}, got {type(value)}"
-                )
-        
-        return is_valid, messages
-
-    def _validate_molecular(self, data: MolecularData) -> tuple[bool, List[str]]:
-        """Validate molecular data"""
-        is_valid = True
-        messages = []
-        
-        # Check required fields
-        for field in self.molecular_rules["required_fields"]:
-            if not getattr(data, field, None):
-                is_valid = False
-                messages.append(f"Missing required field: {field}")
-        
-        # Check field types
-        for field, expected_type in self.molecular_rules["field_types"].items():
-            value = getattr(data, field, None)
-            if value is not None and not isinstance(value, expected_type):
-                is_valid = False
-                messages.append(
-                    f"Invalid type for {field}: "
-                    f"expected {expected_type}, got {type(value)}"
-                )
-        
-        return is_valid, messages
+    def _build_result(self, extraction: CivicExtraction, failures: List[FieldFailure]) -> ValidationResult:
+        validation_messages = [failure.message for failure in failures]
+        return ValidationResult(
+            is_valid=not failures,
+            confidence_score=self._calculate_validation_confidence(
+                extraction, validation_messages
+            ),
+            reasoning="\n".join(validation_messages),
+            suggestions=self._generate_suggestions(validation_messages),
+            validation_type="data_validation"
+        )
 
     def _calculate_validation_confidence(
         self, 
@@ -194,8 +191,8 @@ class DataValidator:
                       len(self.molecular_rules["required_fields"])
                       
         filled_fields = sum(
-            1 for field in extraction.dict(exclude_none=True).keys()
-            if field != "raw_text" and field != "metadata"
+            1 for section in self.SECTIONS
+            if getattr(extraction, section) is not None
         )
         
         completeness = filled_fields / total_fields
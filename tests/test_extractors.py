@@ -1,9 +1,26 @@
 import unittest
+import json
+import tempfile
 from pathlib import Path
 import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+import PyPDF2
 from src.extractors.civic_extractor import CivicExtractor
 from src.extractors.pdf_processor import PDFProcessor
 from src.extractors.llm_processor import LLMProcessor
+from src.extractors.text_chunker import TextChunker
+from src.extractors.react_validator import ReactValidator
+from src.extractors.triage import ValidationTriage
+from src.extractors.relevance_filter import RelevanceFilter
+from src.extractors.section_detector import SectionDetector
+from src.extractors.text_normalizer import PageNormalizer
+from src.models.data_models import CivicExtraction
+from src.utils.cache import PDFTextCache, ResponseCache
+from src.utils.token_budget import ModelLimits, RequestPlanner
+from pdf_factory import make_pdf
 
 class TestExtractors(unittest.TestCase):
     def setUp(self):
@@ -28,5 +45,688 @@ class TestExtractors(unittest.TestCase):
         self.assertTrue(hasattr(result, 'variants'))
         self.assertTrue(hasattr(result, 'clinical_evidence'))
 
+class TestPDFTextCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.pdf_path = make_pdf(self.root / "paper.pdf", ["KRAS G12D", "NRAS Q61K"])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_cached_text_skips_parsing(self):
+        cache = PDFTextCache(self.root / "pdf_text")
+        processor = PDFProcessor(text_cache=cache)
+        text = processor.extract_text(str(self.pdf_path))
+
+        processor._parse_pages = lambda pdf_path: self.fail("PDF was parsed again")
+        copy_path = self.root / "copy.pdf"
+        copy_path.write_bytes(self.pdf_path.read_bytes())
+        self.assertEqual(processor.extract_text(str(copy_path)), text)
+        self.assertEqual(processor.extract_pages(str(self.pdf_path)), ["KRAS G12D", "NRAS Q61K"])
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 1})
+
+    def test_document_parses_once(self):
+        processor = PDFProcessor()
+        with mock.patch("src.extractors.pdf_document.PdfReader", wraps=PyPDF2.PdfReader) as reader_cls:
+            document = processor.open(str(self.pdf_path))
+            self.assertEqual(document.text, "KRAS G12DNRAS Q61K")
+            self.assertEqual(document.page_count, 2)
+            self.assertIn("title", document.metadata)
+        self.assertEqual(reader_cls.call_count, 1)
+
+    def test_extractor_version_invalidates_cache(self):
+        cache = PDFTextCache(self.root / "pdf_text")
+        PDFProcessor(text_cache=cache).extract_text(str(self.pdf_path))
+
+        class NewerProcessor(PDFProcessor):
+            EXTRACTOR_VERSION = PDFProcessor.EXTRACTOR_VERSION + ".1"
+
+        NewerProcessor(text_cache=cache).extract_text(str(self.pdf_path))
+        self.assertEqual(cache.misses, 2)
+
+    def test_source_reference_loads_text_lazily(self):
+        document = PDFProcessor().open(str(self.pdf_path))
+        list(document.iter_pages())
+        source = document.source_reference()
+
+        self.assertEqual(source.page_spans, [(0, 9), (9, 18)])
+        self.assertEqual(source.page_of(12), 1)
+        self.assertEqual(source.load_text(9), "NRAS Q61K")
+
+        make_pdf(self.pdf_path, ["KRAS G13D"])
+        with self.assertRaises(ValueError):
+            source.load_text()
+
+class TestParallelPDFExtraction(unittest.TestCase):
+    def test_parallel_matches_serial_page_order(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pages = [f"Page {i} reports TP53 loss\nin relapsed myeloma" for i in range(40)]
+            pdf_path = str(make_pdf(Path(tmp_dir) / "large.pdf", pages))
+
+            serial = PDFProcessor().extract_pages(pdf_path)
+            processor = PDFProcessor(workers=3)
+            try:
+                # The incremental path streams pages from the worker pool too
+                streamed = list(processor.iter_pages(pdf_path))
+                self.assertIsNotNone(processor._pool)
+                parallel = processor.extract_pages(pdf_path)
+            finally:
+                processor.close()
+
+            self.assertEqual(parallel, serial)
+            self.assertEqual(streamed, serial)
+            self.assertEqual(len(parallel), 40)
+            self.assertTrue(parallel[39].startswith("Page 39"))
+
+class FakeAsyncMessages:
+    """Async stand-in for ``client.messages`` that sleeps like a slow model"""
+    def __init__(self, text: str, latency: float = 0.05):
+        self.text = text
+        self.latency = latency
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(content=[SimpleNamespace(text=self.text)])
+
+class FakeStreamingMessages:
+    """Streams text deltas as SDK-style events, optionally failing midway"""
+    def __init__(self, text: str, fail_after: int = None, stop_reason: str = "end_turn"):
+        self.text = text
+        self.fail_after = fail_after
+        self.stop_reason = stop_reason
+        self.calls = 0
+
+    async def create(self, stream=False, **kwargs):
+        self.calls += 1
+
+        async def events():
+            yield SimpleNamespace(type="message_start", message=SimpleNamespace(
+                usage=SimpleNamespace(input_tokens=10)))
+            for i in range(0, len(self.text), 5):
+                if self.fail_after is not None and i >= self.fail_after:
+                    raise ConnectionError("stream dropped")
+                yield SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(text=self.text[i:i + 5]))
+            yield SimpleNamespace(type="message_delta", delta=SimpleNamespace(stop_reason=self.stop_reason),
+                                  usage=SimpleNamespace(output_tokens=len(self.text) // 4))
+        return events()
+
+class TestStreamingExtraction(unittest.IsolatedAsyncioTestCase):
+    RESPONSE = (
+        '{"variants": [{"name": "KRAS G12D", "type": "mutation"}, {"name": "NRAS Q61K", "type": "mutation"}],'
+        ' "clinical_evidence": [{"type": "predictive", "outcome": "resistance"}], "molecular_data": []}'
+    )
+
+    def make_extractor(self, fail_after=None):
+        processor = LLMProcessor(api_key="test")
+        processor.base_delay = 0
+        processor.async_client = SimpleNamespace(messages=FakeStreamingMessages(self.RESPONSE, fail_after))
+        return CivicExtractor(processor, stream_responses=True)
+
+    async def test_cleaned_items_stream_in_order(self):
+        extractor = self.make_extractor()
+        items = [item async for item in extractor.stream_civic_items("text")]
+        self.assertEqual([section for section, _ in items], ["variants", "variants", "clinical_evidence"])
+        self.assertEqual(items[0][1]["description"], "KRAS G12D")
+
+    async def test_partial_results_survive_interruption(self):
+        extractor = self.make_extractor(fail_after=self.RESPONSE.index("NRAS"))
+        result = await extractor.extract_civic_data("text")
+        self.assertEqual([v["description"] for v in result.variants], ["KRAS G12D"])
+        self.assertEqual(result.metadata["failed_chunks"], 1)
+
+    async def test_text_fallback_when_stream_yields_nothing(self):
+        # The parser locks onto the braces in the prose and never sees the answer
+        processor = LLMProcessor(api_key="test")
+        processor.async_client = SimpleNamespace(messages=FakeStreamingMessages(
+            'Found {2} variants.\n{"variants": [{"name": "KRAS G12D", "type": "mutation"}]}'
+        ))
+        items = [item async for item in processor.stream_analysis("text", prompt="prompt")]
+        self.assertEqual(items, [("variants", {"name": "KRAS G12D", "type": "mutation"})])
+
+class TestLLMTransport(unittest.IsolatedAsyncioTestCase):
+    async def test_requests_overlap_on_event_loop(self):
+        processor = LLMProcessor(api_key="test")
+        messages = FakeAsyncMessages('{"variants": [], "clinical_evidence": [], "molecular_data": []}')
+        processor.async_client = SimpleNamespace(messages=messages)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            processor.analyze_text(text=f"text {i}", prompt="prompt") for i in range(10)
+        ))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(messages.calls, 10)
+        self.assertTrue(all(result["variants"] == [] for result in results))
+        self.assertLess(elapsed, 0.3)
+
+    async def test_cached_response_skips_request(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = ResponseCache(Path(tmp_dir) / "responses.sqlite")
+            processor = LLMProcessor(api_key="test", cache=cache)
+            messages = FakeAsyncMessages('{"variants": [{"name": "NRAS Q61K"}]}', latency=0)
+            processor.async_client = SimpleNamespace(messages=messages)
+
+            first = await processor.analyze_text(text="text", prompt="prompt")
+            second = await processor.analyze_text(text="text", prompt="prompt")
+            await processor.analyze_text(text="text", prompt="prompt", use_cache=False)
+
+            self.assertEqual(first, second)
+            self.assertEqual(messages.calls, 2)
+            self.assertEqual(cache.hits, 1)
+
+    async def test_cache_key_uses_clamped_output_limit(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = ResponseCache(Path(tmp_dir) / "responses.sqlite")
+            processor = LLMProcessor(api_key="test", cache=cache)
+            messages = FakeAsyncMessages('{"variants": [{"name": "NRAS Q61K"}]}', latency=0)
+            processor.async_client = SimpleNamespace(messages=messages)
+            # Both limits exceed the model's output limit, so the same request is sent
+            await processor.analyze_text(text="text", prompt="prompt", max_tokens=10000)
+            await processor.analyze_text(text="text", prompt="prompt", max_tokens=20000)
+            self.assertEqual((messages.calls, cache.hits), (1, 1))
+
+            streaming = FakeStreamingMessages('{"variants": [{"name": "KRAS G12D"}]}')
+            processor.async_client = SimpleNamespace(messages=streaming)
+            for max_tokens in (10000, 20000):
+                [item async for item in processor.stream_analysis("more text", "prompt", max_tokens=max_tokens)]
+            self.assertEqual((streaming.calls, cache.hits), (1, 2))
+
+    async def test_truncated_responses_are_not_cached(self):
+
+        class TruncatedMessages(FakeAsyncMessages):
+            async def create(self, **kwargs):
+                response = await super().create(**kwargs)
+                response.stop_reason = "max_tokens"
+                return response
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = ResponseCache(Path(tmp_dir) / "responses.sqlite")
+            processor = LLMProcessor(api_key="test", cache=cache)
+            messages = TruncatedMessages('{"variants": [{"name": "NRAS Q61K"}', latency=0)
+            processor.async_client = SimpleNamespace(messages=messages)
+            await processor.analyze_text(text="text", prompt="prompt")
+            await processor.analyze_text(text="text", prompt="prompt")
+            self.assertEqual(messages.calls, 2)
+
+            streaming = FakeStreamingMessages('{"variants": [{"name": "KRAS G12D"}', stop_reason="max_tokens")
+            processor.async_client = SimpleNamespace(messages=streaming)
+            for _ in range(2):
+                [item async for item in processor.stream_analysis("more text", "prompt")]
+            self.assertEqual(streaming.calls, 2)
+            self.assertEqual(cache.hits, 0)
+
+            streaming.stop_reason = "end_turn"
+            for _ in range(2):
+                [item async for item in processor.stream_analysis("more text", "prompt")]
+            self.assertEqual((streaming.calls, cache.hits), (3, 1))
+
+class TestRequestPlanning(unittest.IsolatedAsyncioTestCase):
+    async def test_oversize_request_is_not_sent_or_retried(self):
+        processor = LLMProcessor(api_key="test")
+        processor.planner = RequestPlanner(processor.model, limits=ModelLimits(1000, 500, 15.0, 75.0))
+        messages = FakeAsyncMessages('{"variants": []}', latency=0)
+        processor.async_client = SimpleNamespace(messages=messages)
+
+        result = await processor.analyze_text("KRAS G12D " * 2000, prompt="Extract variants.")
+
+        self.assertEqual(messages.calls, 0)
+        self.assertEqual(result["error"], "Request exceeds model context window")
+
+    async def test_oversize_stream_yields_nothing(self):
+        processor = LLMProcessor(api_key="test")
+        processor.planner = RequestPlanner(processor.model, limits=ModelLimits(1000, 500, 15.0, 75.0))
+        processor.async_client = SimpleNamespace(messages=FakeStreamingMessages('{"variants": []}'))
+
+        status = {}
+        items = [item async for item in processor.stream_analysis("KRAS G12D " * 2000, "prompt", status=status)]
+        self.assertEqual(items, [])
+        self.assertEqual(status["error"], "Request exceeds model context window")
+
+        extractor = CivicExtractor(processor, chunker=TextChunker(max_tokens=5000), stream_responses=True)
+        result = await extractor.extract_civic_data("KRAS G12D " * 2000)
+        self.assertEqual(result.metadata["failed_chunks"], result.metadata["num_chunks"])
+
+class TestTextFallbackParsing(unittest.IsolatedAsyncioTestCase):
+    async def test_items_share_react_blocks(self):
+        processor = LLMProcessor(api_key="test")
+        text = "\n".join([
+            "REASONING:",
+            "The t(4;14) translocation drives FGFR3 expression",
+            "ACTION:",
+            "Found KRAS mutation in 20% of patients",
+            "CONCLUDE:",
+            "Clinical evidence supports bortezomib",
+        ])
+        result = await processor._clean_and_structure_response(text)
+
+        self.assertEqual(len(result["variants"]), 1)
+        self.assertEqual(len(result["clinical_evidence"]), 1)
+        self.assertEqual(result["react_blocks"]["action"], ["Found KRAS mutation in 20% of patients"])
+
+        context = LLMProcessor.resolve_react_context(result, result["variants"][0])
+        self.assertEqual(context["reasoning"], "The t(4;14) translocation drives FGFR3 expression")
+        self.assertEqual(context["action"], "Found KRAS mutation in 20% of patients")
+        self.assertEqual(context["conclusion"], "")
+
+    async def test_react_context_survives_chunk_merge(self):
+        processor = LLMProcessor(api_key="test")
+        responses = iter([
+            "REASONING:\nFGFR3 drives growth\nACTION:\nKRAS mutation found",
+            "REASONING:\nNRAS is activated\nACTION:\nNRAS mutation found"
+        ])
+
+        async def analyze_text(text, prompt, **kwargs):
+            return await processor._clean_and_structure_response(next(responses))
+
+        processor.analyze_text = analyze_text
+        extractor = CivicExtractor(processor, chunker=TextChunker(max_tokens=100, overlap_tokens=0))
+        result = await extractor.extract_civic_data("KRAS G12D drives growth. " * 20)
+
+        self.assertEqual(result.metadata["num_chunks"], 2)
+        self.assertEqual(
+            sorted((v["react_context"]["reasoning"], v["react_context"]["action"]) for v in result.variants),
+            [("FGFR3 drives growth", "KRAS mutation found"), ("NRAS is activated", "NRAS mutation found")]
+        )
+
+    async def test_raw_text_can_be_dropped(self):
+        processor = LLMProcessor(api_key="test", keep_raw_text=False)
+        result = await processor._clean_and_structure_response("KRAS mutation found\n" * 100)
+        self.assertNotIn("raw_text", result)
+        self.assertEqual(len(result["variants"]), 100)
+
+    async def test_large_fallback_response_is_linear(self):
+        processor = LLMProcessor(api_key="test")
+        lines = ["REASON:", "variant line", "ACTION:", "clinical line", "pathway line"] * 10000
+        start = time.perf_counter()
+        result = await processor._clean_and_structure_response("\n".join(lines))
+        self.assertLess(time.perf_counter() - start, 2.0)
+        self.assertEqual(len(result["variants"]), 10000)
+        self.assertEqual(result["variants"][-1]["react_context"]["reasoning"], 10000)
+
+class FakeValidationMessages:
+    """Answers batch prompts with one verdict per index, skipping ``missing``"""
+    def __init__(self, latency: float = 0.05, missing: int = None):
+        self.latency = latency
+        self.missing = missing
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+
+    async def create(self, messages, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.latency)
+        self.active -= 1
+
+        content = messages[0]["content"]
+        payload = json.loads(content.split("Text to analyze:\n", 1)[1])
+        if isinstance(payload, list):
+            results = [
+                {"index": entry["index"], "is_valid": True, "confidence_score": 0.9,
+                 "reasoning": entry["item"]["name"], "suggestions": []}
+                for entry in payload if entry["index"] != self.missing
+            ]
+            text = json.dumps({"results": results})
+        else:
+            text = json.dumps({"is_valid": True, "confidence_score": 0.8, "reasoning": "ok", "suggestions": []})
+        return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+class TestReactValidation(unittest.IsolatedAsyncioTestCase):
+    def _extraction(self, count: int) -> CivicExtraction:
+        return CivicExtraction(
+            variants=[{"name": f"KRAS G{i}D", "type": "mutation"} for i in range(count)],
+            clinical_evidence=[],
+            molecular_data=[],
+            raw_text="full paper text",
+            metadata={}
+        )
+
+    def _validator(self, messages, **kwargs) -> ReactValidator:
+        processor = LLMProcessor(api_key="test")
+        processor.async_client = SimpleNamespace(messages=messages)
+        return ReactValidator(processor, **kwargs)
+
+    async def test_batched_verdicts_map_back_by_index(self):
+        messages = FakeValidationMessages(latency=0, missing=3)
+        validator = self._validator(messages, batch_size=4)
+
+        extraction = await validator.validate_full_extraction(self._extraction(10), batched=True)
+
+        # Three batches plus the post-processing review
+        self.assertEqual(messages.calls, 4)
+        self.assertEqual(extraction.metadata["validation"]["llm_calls"], 4)
+        self.assertEqual(extraction.metadata["validation_status"], "valid")
+        for i, variant in enumerate(extraction.variants):
+            if i % 4 == 3:  # Indices are local to each batch
+                self.assertFalse(variant["validation"]["is_valid"])
+                self.assertEqual(variant["validation"]["suggestions"], ["Retry validation"])
+            else:
+                self.assertEqual(variant["validation"]["reasoning"], f"KRAS G{i}D")
+
+    async def test_per_item_validation_is_concurrent_and_bounded(self):
+        messages = FakeValidationMessages(latency=0.05)
+        validator = self._validator(messages, max_concurrency=4)
+
+        start = time.perf_counter()
+        extraction = await validator.validate_full_extraction(self._extraction(12))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(messages.calls, 13)
+        self.assertLessEqual(messages.peak, 5)
+        self.assertLess(elapsed, 12 * 0.05)
+        self.assertTrue(all(v["validation"]["is_valid"] for v in extraction.variants))
+
+    async def test_triage_skips_confident_items(self):
+        messages = FakeValidationMessages(latency=0)
+        validator = self._validator(messages)
+        triage = ValidationTriage(validator, min_confidence_score=0.6, batched=False)
+        extraction = self._extraction(3)
+        extraction.variants[0].update({
+            "description": "KRAS G12D", "variant_type": "mutation", "significance": "resistance",
+            "evidence_level": "A", "confidence": 0.9, "drugs": [], "citations": ["PMID:1"]
+        })
+
+        extraction = await triage.validate(extraction)
+
+        triage_stats = extraction.metadata["validation"]["triage"]
+        self.assertEqual(triage_stats["accepted_locally"], 1)
+        self.assertEqual(triage_stats["llm_calls_saved"], 1)
+        self.assertEqual(extraction.variants[0]["validation"]["validation_type"], "local_triage")
+        self.assertEqual(extraction.variants[1]["validation"]["validation_type"], "extraction")
+        # Two doubtful items plus the post-processing review
+        self.assertEqual(messages.calls, 3)
+
+    async def test_failed_extractions_stay_failed(self):
+        messages = FakeValidationMessages(latency=0)
+        validator = self._validator(messages)
+        extractor = CivicExtractor(validator.llm_processor)
+
+        extraction = await ValidationTriage(validator).validate(extractor._failed_extraction(100))
+        self.assertEqual(extraction.metadata["validation_status"], "failed")
+        extraction = await validator.validate_full_extraction(extractor._failed_extraction(100))
+        self.assertEqual(extraction.metadata["validation_status"], "failed")
+        self.assertEqual(messages.calls, 0)
+
+        # Nothing to check is not the same as checked and valid
+        extraction = await ValidationTriage(validator).validate(self._extraction(0))
+        self.assertNotIn("validation_status", extraction.metadata)
+
+    async def test_triage_without_escalations_makes_no_llm_calls(self):
+        messages = FakeValidationMessages(latency=0)
+        triage = ValidationTriage(self._validator(messages), min_confidence_score=0.6, batched=False)
+        extraction = self._extraction(1)
+        extraction.variants[0].update({
+            "description": "KRAS G12D", "variant_type": "mutation", "significance": "resistance",
+            "evidence_level": "A", "confidence": 0.9, "drugs": [], "citations": ["PMID:1"]
+        })
+
+        extraction = await triage.validate(extraction)
+
+        self.assertEqual(messages.calls, 0)
+        self.assertEqual(extraction.metadata["validation_status"], "valid")
+        self.assertEqual(extraction.metadata["validation"]["triage"]["llm_calls_saved"], 2)
+
+class TestRelevanceFilter(unittest.IsolatedAsyncioTestCase):
+    RELEVANT = "Patients with KRAS p.Gly12Asp mutations were resistant to bortezomib."
+    BOILERPLATE = "We thank the nursing staff. Funding was provided by the research council."
+
+    def setUp(self):
+        self.filter = RelevanceFilter(context_passages=0)
+
+    def test_keeps_relevant_passages(self):
+        text = "\n\n".join([self.BOILERPLATE] * 5 + [self.RELEVANT] + [self.BOILERPLATE] * 5)
+        result = self.filter.filter(text)
+
+        self.assertEqual(result.text, self.RELEVANT)
+        self.assertEqual(result.stats["kept_passages"], 1)
+        self.assertEqual(result.stats["passages"], 11)
+        self.assertGreater(result.stats["tokens_saved"], 0)
+        self.assertFalse(result.stats["fallback"])
+
+    def test_lexicon_matching(self):
+        self.assertGreaterEqual(self.filter.score("BRAF V600E and t(11;14) with Venetoclax"), 9)
+        # Gene symbols must match case and whole words
+        self.assertEqual(self.filter.score("The kit met the metformin criteria"), 0)
+        # Nonsense changes end in "*", after which there is no word boundary
+        self.assertEqual(self.filter.score("The R248* allele was seen"), 3)
+        self.assertEqual(self.filter.score("The R248*allele"), 0)
+
+    async def test_pages_fall_back_when_nothing_matches(self):
+        async def pages(texts):
+            for text in texts:
+                yield text
+
+        stats = {}
+        kept = [page async for page in self.filter.filter_pages(
+            pages([self.BOILERPLATE, self.RELEVANT, self.BOILERPLATE]), stats)]
+        self.assertEqual(kept, [self.RELEVANT + "\n\n"])
+        self.assertEqual(stats["kept_passages"], 1)
+
+        stats = {}
+        kept = [page async for page in self.filter.filter_pages(pages([self.BOILERPLATE] * 2), stats)]
+        self.assertEqual(kept, [self.BOILERPLATE] * 2)
+        self.assertTrue(stats["fallback"])
+        self.assertEqual(stats["tokens_saved"], 0)
+
+    async def test_held_pages_are_bounded(self):
+        self.filter.MAX_HELD_PAGES = 2
+        released = []
+
+        async def pages():
+            for _ in range(5):
+                yield self.BOILERPLATE
+            # Pages beyond the cap reached the consumer before the relevant one
+            released.append(len(kept))
+            yield self.RELEVANT
+
+        stats = {}
+        kept = []
+        async for page in self.filter.filter_pages(pages(), stats):
+            kept.append(page)
+        self.assertEqual(released, [4])
+        self.assertEqual(kept, [self.BOILERPLATE] * 4 + [self.RELEVANT + "\n\n"])
+        self.assertEqual(stats["kept_passages"], 5)
+        self.assertFalse(stats["fallback"])
+
+    def test_panel_labels_are_not_variants(self):
+        self.assertEqual(self.filter.score("as shown in Figure S12A and Figs. S1A-S1C"), 0)
+        self.assertEqual(self.filter.score("see Table S10B"), 0)
+        self.assertEqual(self.filter.score("G12D and V600E"), 6)
+
+class TestSectionDetector(unittest.IsolatedAsyncioTestCase):
+    PAPER = (
+        "Daratumumab in t(11;14) myeloma\n"
+        "Abstract\nKRAS G12D was enriched.\n"
+        "2. Results\nResults were striking.\n"
+        "Funding: National research council.\n"
+        "REFERENCES\n1. Smith J et al. Blood 2019.\n"
+    )
+
+    def test_sections_have_offsets(self):
+        sections = SectionDetector().detect(self.PAPER)
+
+        self.assertEqual(
+            [section.name for section in sections],
+            ["front_matter", "abstract", "results", "funding", "references"]
+        )
+        self.assertEqual(sections[0].start, 0)
+        self.assertEqual(sections[-1].end, len(self.PAPER))
+        for previous, current in zip(sections, sections[1:]):
+            self.assertEqual(previous.end, current.start)
+        self.assertTrue(self.PAPER[sections[2].start:sections[2].end].startswith("2. Results"))
+
+    def test_strip_excludes_back_matter(self):
+        result = SectionDetector().strip(self.PAPER)
+
+        self.assertTrue(result.text.endswith("Results were striking.\n"))
+        self.assertEqual(result.stats["excluded"], ["funding", "references"])
+        self.assertEqual(result.stats["chars_out"], len(result.text))
+
+    async def test_sections_carry_over_pages(self):
+        async def pages():
+            yield "Results\nNRAS Q61K observed.\nReferences\n1. Smith.\n"
+            yield "2. Jones.\n3. Lee.\n"
+            yield "Appendix\nTable S1 lists KRAS G13D.\n"
+
+        stats = {}
+        kept = [page async for page in SectionDetector().strip_pages(pages(), stats)]
+
+        self.assertEqual(kept, ["Results\nNRAS Q61K observed.\n", "Appendix\nTable S1 lists KRAS G13D.\n"])
+        self.assertEqual([s.name for s in stats["sections"]], ["results", "references", "supplementary"])
+        self.assertEqual(stats["sections"][1].end, stats["sections"][2].start)
+
+class TestPageNormalizer(unittest.IsolatedAsyncioTestCase):
+    WARDS = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta", "iota", "kappa"]
+
+    def make_pages(self, count: int):
+        return [
+            f"Blood Journal 2019 | Vol 133\nSmith et al.\n"
+            f"center trial in ward {self.WARDS[i]} enrolled patients.\n"
+            f"KRAS G12D was seen in ward {self.WARDS[i]}.\nResponses to bort-\nezomib were durable.\n"
+            f"Patients joined the ﬁrst multi-\n"
+            f"{i}\ndoi:10.1182/blood-2018-{i}\n"
+            for i in range(count)
+        ]
+
+    def test_strips_headers_and_joins_words(self):
+        result = PageNormalizer().normalize(self.make_pages(6))
+
+        self.assertNotIn("Blood Journal", result.text)
+        self.assertNotIn("doi:", result.text)
+        self.assertIn("bortezomib", result.text)
+        self.assertIn("the first multi", result.text)
+        self.assertIn("ward alpha", result.text)
+        self.assertIn("multicenter trial in ward beta", result.text)
+        self.assertEqual(result.stats["page_numbers_removed"], 6)
+        self.assertGreater(result.stats["tokens_saved"], 0)
+        self.assertEqual(result.stats["chars_out"], len(result.text))
+
+    def test_short_documents_keep_repeated_lines(self):
+        result = PageNormalizer().normalize(self.make_pages(2))
+        self.assertIn("Blood Journal", result.text)
+
+    async def test_alternating_headers_are_stripped(self):
+        # Facing pages: journal name on even pages, authors on odd ones
+        heads = ["Blood Journal 2019 | Vol 133", "Smith et al."]
+        pages = [
+            f"{heads[i % 2]}\nKRAS G12D was seen in ward {ward}.\nResponses in ward {ward} were durable.\n{i + 1}\n"
+            for i, ward in enumerate(self.WARDS[:7])
+        ]
+        expected = [
+            f"KRAS G12D was seen in ward {ward}.\nResponses in ward {ward} were durable.\n"
+            for ward in self.WARDS[:7]
+        ]
+
+        async def stream():
+            for page in pages:
+                yield page
+
+        stats = {}
+        normalizer = PageNormalizer(window=5)
+        streamed = [page async for page in normalizer.normalize_pages(stream(), stats)]
+        batch = normalizer.normalize(pages)
+
+        self.assertEqual(streamed, expected)
+        self.assertEqual(batch.pages, expected)
+        self.assertEqual(stats["repeated_lines_removed"], 7)
+        self.assertEqual(stats["page_numbers_removed"], 7)
+        self.assertEqual(stats["chars_out"], sum(len(page) for page in expected))
+        self.assertEqual(stats, batch.stats)
+
+class TestChunkedExtraction(unittest.IsolatedAsyncioTestCase):
+    def test_chunks_overlap_and_cover_text(self):
+        chunker = TextChunker(max_tokens=50, overlap_tokens=10)
+        text = "\n\n".join(f"Paragraph {i} mentions KRAS G12D in myeloma." for i in range(40))
+        chunks = chunker.split(text)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(chunks[0].start, 0)
+        self.assertEqual(chunks[-1].end, len(text))
+        for previous, current in zip(chunks, chunks[1:]):
+            self.assertLess(current.start, previous.end)
+            self.assertLessEqual(len(current.text), 50 * TextChunker.CHARS_PER_TOKEN)
+
+    def test_incremental_chunks_match_split(self):
+        chunker = TextChunker(max_tokens=50, overlap_tokens=10)
+        pages = [f"Page {i}: daratumumab response in t(11;14) myeloma.\n" * 3 for i in range(20)]
+        self.assertEqual(list(chunker.iter_chunks(pages)), chunker.split("".join(pages)))
+
+    async def test_incremental_extraction_from_pdf(self):
+        processor = LLMProcessor(api_key="test")
+        messages = FakeAsyncMessages('{"variants": [{"name": "TP53 R248Q", "type": "mutation"}]}', latency=0)
+        processor.async_client = SimpleNamespace(messages=messages)
+        extractor = CivicExtractor(processor, chunker=TextChunker(max_tokens=100, overlap_tokens=10))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pages = [f"Page {i} describes TP53 R248Q in relapsed disease." * 4 for i in range(12)]
+            pdf_path = str(make_pdf(Path(tmp_dir) / "paper.pdf", pages))
+            pdf_processor = PDFProcessor(text_cache=PDFTextCache(Path(tmp_dir) / "cache"))
+            self.assertEqual(list(pdf_processor.iter_pages(pdf_path)), PDFProcessor().extract_pages(pdf_path))
+
+            result = await extractor.extract_civic_data_incremental(pdf_processor.aiter_pages(pdf_path, max_buffered=2))
+
+        self.assertEqual(result.metadata["text_length"], sum(len(page) for page in pages))
+        self.assertEqual(result.metadata["num_chunks"], messages.calls)
+        self.assertGreater(messages.calls, 1)
+        self.assertEqual(len(result.variants), 1)
+        self.assertIsNone(result.raw_text)
+
+    async def test_page_producers_do_not_hold_executor_threads(self):
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1)
+        loop.set_default_executor(executor)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pdf_path = str(make_pdf(Path(tmp_dir) / "paper.pdf", [f"Page {i}" for i in range(20)]))
+            pages = PDFProcessor().aiter_pages(pdf_path, max_buffered=1)
+            try:
+                self.assertEqual(await pages.__anext__(), "Page 0")
+                # The producer now waits on a full queue; the pool must stay free
+                self.assertEqual(await asyncio.wait_for(asyncio.to_thread(lambda: "free"), 5), "free")
+            finally:
+                await pages.aclose()
+                executor.shutdown(wait=False)
+
+    async def test_chunk_results_are_merged(self):
+        processor = LLMProcessor(api_key="test")
+        processor.async_client = SimpleNamespace(messages=FakeAsyncMessages(
+            '{"variants": [{"name": "KRAS G12D", "type": "mutation", "drugs": ["bortezomib"]}],'
+            ' "clinical_evidence": [], "molecular_data": [{"pathway": "MAPK"}]}'
+        ))
+        extractor = CivicExtractor(processor, chunker=TextChunker(max_tokens=50, overlap_tokens=10))
+
+        result = await extractor.extract_civic_data("KRAS G12D in myeloma. " * 100)
+
+        self.assertGreater(result.metadata["num_chunks"], 1)
+        self.assertEqual(len(result.variants), 1)
+        self.assertEqual(result.variants[0]["drugs"], ["bortezomib"])
+        self.assertEqual(len(result.molecular_data), 1)
+
+    def test_unnamed_items_are_not_merged(self):
+        extractor = CivicExtractor(LLMProcessor(api_key="test"))
+        variants = [
+            {"description": "", "variant_type": "", "drugs": ["bortezomib"]},
+            {"description": "", "variant_type": "", "drugs": ["melphalan"]},
+            {"description": "KRAS G12D", "variant_type": "missense", "drugs": []},
+            {"description": "kras  g12d", "variant_type": "Missense", "drugs": ["venetoclax"]}
+        ]
+        merged = extractor._deduplicate(variants, extractor._variant_key)
+        self.assertEqual([v["drugs"] for v in merged], [["bortezomib"], ["melphalan"], ["venetoclax"]])
+
+        evidence = [extractor._clean_clinical_evidence(item) for item in [
+            {"drugs": ["bortezomib"]},
+            {"drugs": ["bortezomib"], "confidence": 0.4},
+            {"type": "Predictive", "outcome": "Resistance", "drugs": ["bortezomib"]},
+            {"type": "predictive", "outcome": "resistance", "drugs": ["Bortezomib"], "confidence": 0.9}
+        ]]
+        merged = extractor._deduplicate(evidence, extractor._evidence_key)
+        self.assertEqual([e["confidence"] for e in merged], [0.0, 0.4, 0.9])
+
+        molecular = [extractor._clean_molecular_data(item) for item in [{"alterations": ["a"]}, {"alterations": ["b"]}]]
+        self.assertEqual(len(extractor._deduplicate(molecular, extractor._molecular_key)), 2)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
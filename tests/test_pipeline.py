@@ -0,0 +1,236 @@
+import unittest
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from src.main import CivicExtractionPipeline
+from src.utils.cache import PDFTextCache
+from src.utils.output_sinks import JSONLSink, load_corpus
+from pdf_factory import make_pdf
+
+class TestCorpusProcessing(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        for name in ["a.pdf", "b.pdf", "bad.pdf"]:
+            (self.root / name).write_bytes(b"%PDF-1.4")
+        self.pipeline = CivicExtractionPipeline(config={})
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.processed = []
+
+        async def fake_process_paper(pdf_path, output_path=None, show_progress=True, sink=None, paper_id=None):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            if Path(pdf_path).stem == "bad":
+                raise ValueError("corrupt PDF")
+            if sink is not None:
+                sink.write(paper_id or Path(pdf_path).stem, {"stats": {"num_variants": 1}})
+            elif output_path is not None:
+                Path(output_path).write_text("{}")
+            self.processed.append(Path(pdf_path).name)
+            return {"stats": {"num_variants": 1}}
+
+        self.pipeline.process_paper = fake_process_paper
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_resolve_inputs(self):
+        from_dir = CivicExtractionPipeline.resolve_inputs(self.root)
+        from_glob = CivicExtractionPipeline.resolve_inputs(str(self.root / "*.pdf"))
+        self.assertEqual([p.name for p in from_dir], ["a.pdf", "b.pdf", "bad.pdf"])
+        self.assertEqual(from_dir, from_glob)
+
+    async def test_same_stem_papers_get_separate_outputs(self):
+        (self.root / "sub").mkdir()
+        (self.root / "sub" / "a.pdf").write_bytes(b"%PDF-1.4")
+        output_dir = self.root / "out"
+        output_dir.mkdir()
+        summary = await self.pipeline.process_corpus(self.root, output_dir=str(output_dir))
+        self.assertEqual(summary["succeeded"], 3)
+        outputs = {paper["output_path"] for paper in summary["papers"] if paper["status"] == "success"}
+        self.assertEqual(len(outputs), 3)
+        self.assertIn(str(output_dir / "analysis_b.json"), outputs)
+        self.assertEqual(len(list(output_dir.glob("analysis_a-*.json"))), 2)
+
+    async def test_same_stem_papers_finish_in_corpus_tables(self):
+        self.pipeline.config = {"manifest": {"enabled": True}}
+        (self.root / "sub").mkdir()
+        (self.root / "sub" / "a.pdf").write_bytes(b"%PDF-1.4")
+        output_dir = str(self.root / "out")
+        summary = await self.pipeline.process_corpus(self.root, output_dir=output_dir, output_format="jsonl")
+        self.assertEqual(summary["manifest"]["states"], {"done": 3, "failed": 1})
+        paper_ids = [row["paper_id"] for row in load_corpus(output_dir)["papers"]]
+        self.assertEqual(len(set(paper_ids)), 3)
+
+    async def test_manifest_defaults_to_sink_directory(self):
+        corpus_dir = self.root / "corpus"
+        self.pipeline.config = {"manifest": {"enabled": True}, "output": {"directory": str(corpus_dir)}}
+        await self.pipeline.process_corpus(self.root, output_format="jsonl")
+        self.assertTrue((corpus_dir / "manifest.sqlite").exists())
+        self.assertFalse(Path("manifest.sqlite").exists())
+
+    async def test_failures_do_not_abort_batch(self):
+        output_dir = self.root / "out"
+        output_dir.mkdir()
+        summary = await self.pipeline.process_corpus(self.root, output_dir=str(output_dir), concurrency=2)
+        self.assertEqual(summary["total"], 3)
+        self.assertEqual(summary["succeeded"], 2)
+        self.assertEqual(summary["failed"], 1)
+        failed = [p for p in summary["papers"] if p["status"] == "failed"]
+        self.assertIn("corrupt PDF", failed[0]["error"])
+        self.assertLessEqual(self.max_in_flight, 2)
+
+    async def test_resume_skips_finished_papers(self):
+        self.pipeline.config = {"manifest": {"enabled": True}}
+        output_dir = str(self.root / "out")
+        Path(output_dir).mkdir()
+        first = await self.pipeline.process_corpus(self.root, output_dir=output_dir)
+        self.assertEqual(sorted(self.processed), ["a.pdf", "b.pdf"])
+
+        self.processed.clear()
+        (self.root / "b.pdf").write_bytes(b"%PDF-1.4 changed")
+        second = await self.pipeline.process_corpus(self.root, output_dir=output_dir)
+        self.assertEqual(self.processed, ["b.pdf"])
+        self.assertEqual((second["skipped"], second["succeeded"], second["failed"]), (1, 1, 1))
+        self.assertEqual(second["manifest"]["states"], {"done": 2, "failed": 1})
+        self.assertEqual(first["manifest"]["stale"], [])
+
+        self.processed.clear()
+        self.pipeline.llm_processor.model = "claude-3-haiku-20240307"
+        third = await self.pipeline.process_corpus(self.root, output_dir=output_dir)
+        self.assertEqual(len(third["manifest"]["stale"]), 2)
+        self.assertEqual(sorted(self.processed), ["a.pdf", "b.pdf"])
+
+    async def test_papers_with_failed_chunks_are_retried(self):
+        self.pipeline.config = {"manifest": {"enabled": True}}
+        output_dir = str(self.root / "out")
+        Path(output_dir).mkdir()
+        process_paper = self.pipeline.process_paper
+
+        async def partly_failed(pdf_path, **kwargs):
+            result = await process_paper(pdf_path, **kwargs)
+            if Path(pdf_path).stem == "a":
+                result["metadata"] = {"num_chunks": 3, "failed_chunks": 1}
+            return result
+
+        self.pipeline.process_paper = partly_failed
+        first = await self.pipeline.process_corpus(self.root, output_dir=output_dir)
+        self.assertEqual(first["manifest"]["states"], {"done": 1, "failed": 2})
+        paper = next(p for p in first["papers"] if p["path"].endswith("a.pdf"))
+        self.assertEqual(paper["incomplete"], "1 of 3 chunks failed")
+
+        self.processed.clear()
+        self.pipeline.process_paper = process_paper
+        await self.pipeline.process_corpus(self.root, output_dir=output_dir)
+        self.assertEqual(self.processed, ["a.pdf"])
+
+class TestCorpusCheckpoints(unittest.IsolatedAsyncioTestCase):
+    async def test_failed_extraction_is_retried_with_validation_on(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            (root / "papers").mkdir()
+            make_pdf(root / "papers" / "paper.pdf", ["KRAS G12D confers resistance."])
+            pipeline = CivicExtractionPipeline(config={
+                "extraction": {"incremental": False},
+                "validation": {"enabled": True},
+                "manifest": {"enabled": True}
+            })
+            pipeline.llm_processor.async_client = SimpleNamespace(messages=FakeMessages('{"is_valid": true}'))
+
+            async def broken(chunks):
+                raise RuntimeError("LLM outage")
+
+            pipeline.civic_extractor._analyze_chunks = broken
+            output_dir = str(root / "out")
+            summary = await pipeline.process_corpus(root / "papers", output_dir=output_dir)
+            self.assertEqual(summary["papers"][0]["incomplete"], "Extraction failed")
+            self.assertEqual(summary["manifest"]["states"], {"failed": 1})
+            pipeline.close()
+
+class FakeMessages:
+    def __init__(self, text: str):
+        self.text = text
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(content=[SimpleNamespace(text=self.text)])
+
+class TestProcessPaper(unittest.IsolatedAsyncioTestCase):
+    async def test_incremental_paper_run_writes_output(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            pdf_path = make_pdf(root / "paper.pdf", ["KRAS G12D confers resistance.", "NRAS Q61K was observed."])
+            pipeline = CivicExtractionPipeline(config={"extraction": {"incremental": True}})
+            pipeline.llm_processor.async_client = SimpleNamespace(messages=FakeMessages(
+                '{"variants": [{"name": "KRAS G12D", "type": "mutation"}], '
+                '"clinical_evidence": [], "molecular_data": []}'
+            ))
+
+            output_path = root / "out" / "analysis_paper.json"
+            result = await pipeline.process_paper(str(pdf_path), output_path=str(output_path), show_progress=False)
+
+            self.assertEqual(result["stats"]["num_variants"], 1)
+            self.assertGreater(result["stats"]["text_length"], 0)
+            self.assertEqual(json.loads(output_path.read_text())["stats"]["num_variants"], 1)
+            self.assertEqual(result["metadata"]["pdf"]["page_count"], 2)
+            self.assertEqual(len(result["source"]["page_spans"]), 2)
+            self.assertEqual(result["source"]["content_hash"], PDFTextCache.hash_file(pdf_path))
+
+    async def test_results_go_to_corpus_tables(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            pdf_path = make_pdf(root / "paper.pdf", ["KRAS G12D confers resistance."])
+            pipeline = CivicExtractionPipeline(config={})
+            pipeline.llm_processor.async_client = SimpleNamespace(messages=FakeMessages(
+                '{"variants": [{"name": "KRAS G12D", "type": "mutation"}], '
+                '"clinical_evidence": [], "molecular_data": []}'
+            ))
+
+            with JSONLSink(root / "corpus", batch_size=100) as sink:
+                await pipeline.process_paper(str(pdf_path), show_progress=False, sink=sink)
+                await pipeline.process_paper(str(pdf_path), show_progress=False, sink=sink, paper_id="paper-2")
+                self.assertFalse((root / "corpus" / "variants.jsonl").exists())
+
+            corpus = load_corpus(root / "corpus")
+            self.assertEqual(
+                [(v["paper_id"], v["description"]) for v in corpus["variants"]],
+                [("paper", "KRAS G12D"), ("paper-2", "KRAS G12D")]
+            )
+            self.assertEqual(corpus["papers"][0]["stats"]["num_variants"], 1)
+            self.assertFalse((root / "analysis_paper.json").exists())
+
+    async def test_back_matter_and_irrelevant_pages_are_dropped(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            pages = ["KRAS G12D confers resistance to bortezomib."] + [f"We thank the nursing staff of ward {ward}." for ward in "ABCDE"] + \
+                ["References\n1. Smith J. KRAS G12D mutations. Blood 2019."]
+            pdf_path = make_pdf(root / "paper.pdf", pages)
+            pipeline = CivicExtractionPipeline(config={
+                "extraction": {"incremental": True},
+                "prefilter": {"enabled": True, "context_passages": 0},
+                "sections": {"enabled": True},
+                "normalization": {"enabled": True}
+            })
+            pipeline.llm_processor.async_client = SimpleNamespace(messages=FakeMessages(
+                '{"variants": [{"name": "KRAS G12D", "type": "mutation"}]}'
+            ))
+
+            result = await pipeline.process_paper(
+                str(pdf_path), output_path=str(root / "analysis_paper.json"), show_progress=False
+            )
+
+            prefilter = result["metadata"]["prefilter"]
+            self.assertEqual(prefilter["kept_passages"], 1)
+            self.assertEqual(result["stats"]["text_length"], result["metadata"]["normalization"]["chars_in"])
+            self.assertGreater(result["stats"]["prefilter_tokens_saved"], 0)
+            self.assertEqual(result["metadata"]["sections"]["excluded"], ["references"])
+            self.assertGreater(result["stats"]["sections_tokens_saved"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,549 @@
+import unittest
+import asyncio
+import json
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+import numpy as np
+from src.utils.cache import ResponseCache
+from src.utils.rate_limiter import RateLimiter
+from src.utils.json_parsing import IncrementalItemParser, extract_json_object
+from src.utils.validators import DataValidator, FieldFailure
+from src.models.data_models import CivicExtraction, SourceReference
+from src.utils import serialization
+from src.utils.manifest import JobManifest
+from src.models.records import VariantRecord, ClinicalEvidenceRecord
+from src.models.confidence import ConfidenceCalculator, ConfidenceMetrics
+from src.utils.output_sinks import JSONLSink, ParquetSink, create_sink, load_corpus
+from src.utils.token_budget import ModelLimits, RequestPlanner, estimate_tokens, record_usage, usage_scope
+from src.extractors.text_chunker import TextChunker
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = Path(self.tmp_dir.name) / "responses.sqlite"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_key_covers_all_inputs(self):
+        key = ResponseCache.make_key("model", "prompt", 4000, "text")
+        self.assertEqual(key, ResponseCache.make_key("model", "prompt", 4000, "text"))
+        self.assertNotEqual(key, ResponseCache.make_key("model", "prompt", 2000, "text"))
+        self.assertNotEqual(key, ResponseCache.make_key("model", "promp", 4000, "ttext"))
+
+    def test_hits_misses_and_bypass(self):
+        cache = ResponseCache(self.cache_path)
+        self.assertIsNone(cache.get("key"))
+        cache.put("key", '{"variants": []}')
+        self.assertEqual(cache.get("key"), '{"variants": []}')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # A second instance shares the same database
+        bypassed = ResponseCache(self.cache_path, bypass=True)
+        self.assertIsNone(bypassed.get("key"))
+        self.assertEqual(ResponseCache(self.cache_path).get("key"), '{"variants": []}')
+
+    def test_size_and_age_eviction(self):
+        cache = ResponseCache(self.cache_path, max_size_mb=0.001)
+        for i in range(20):
+            cache.put(f"key-{i}", "x" * 200 + str(i) * 400)
+            time.sleep(0.001)
+        cache.evict()
+        self.assertLessEqual(cache.stats()["size_bytes"], cache.max_size_bytes)
+        self.assertIsNotNone(cache.get("key-19"))
+
+        cache.max_age_seconds = 0
+        time.sleep(0.01)
+        cache.evict()
+        self.assertEqual(cache.stats()["entries"], 0)
+
+_real_sleep = asyncio.sleep
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.now += seconds
+        await _real_sleep(0)
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_token_budget_paces_requests_in_order(self):
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=50, tokens_per_minute=6000, clock=clock)
+        finished = []
+
+        async def request(i: int):
+            await limiter.acquire(3000)
+            finished.append((i, clock.now))
+
+        with mock.patch("src.utils.rate_limiter.asyncio.sleep", clock.sleep):
+            await asyncio.gather(*(request(i) for i in range(5)))
+
+        self.assertEqual([i for i, _ in finished], [0, 1, 2, 3, 4])
+        # Two requests fit the initial budget; each later one waits 30s of refill
+        self.assertEqual([round(t) for _, t in finished], [0, 0, 30, 60, 90])
+
+    async def test_request_budget_and_reconcile(self):
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=100000, clock=clock)
+        with mock.patch("src.utils.rate_limiter.asyncio.sleep", clock.sleep):
+            for _ in range(3):
+                await limiter.acquire(10)
+        self.assertAlmostEqual(clock.now, 30.0)
+
+        limiter.reconcile(estimated=10, actual=4)
+        self.assertEqual(limiter.stats()["tokens"], 24)
+
+    def test_from_config(self):
+        limiter = RateLimiter.from_config({"rate_limits": {"requests_per_minute": 10, "tokens_per_minute": 500}})
+        self.assertEqual((limiter.requests_per_minute, limiter.tokens_per_minute), (10, 500))
+        self.assertIsNone(RateLimiter.from_config({}))
+        self.assertIsNone(RateLimiter.from_config({"rate_limits": {"enabled": False}}))
+
+class TestIncrementalItemParser(unittest.TestCase):
+    RESPONSE = (
+        'Here is the analysis:\n```json\n'
+        '{"variants": [{"name": "KRAS {G12D}", "drugs": ["a\\"b"]}, {"name": "NRAS Q61K"}],'
+        ' "summary": "see [1]",'
+        ' "clinical_evidence": [{"type": "predictive", "supporting_data": [{"os": [1, 2]}]}],'
+        ' "molecular_data": []}\n```\nLet me know {if} you need more.'
+    )
+
+    def test_items_emitted_as_they_close(self):
+        parser = IncrementalItemParser()
+        first = parser.feed(self.RESPONSE[:self.RESPONSE.index(', {"name": "NRAS')])
+        self.assertEqual(first, [("variants", {"name": "KRAS {G12D}", "drugs": ['a"b']})])
+
+    def test_any_split_yields_same_items(self):
+        expected = IncrementalItemParser().feed(self.RESPONSE)
+        self.assertEqual([section for section, _ in expected], ["variants", "variants", "clinical_evidence"])
+        for step in (1, 2, 7, 31):
+            parser = IncrementalItemParser()
+            items = []
+            for i in range(0, len(self.RESPONSE), step):
+                items.extend(parser.feed(self.RESPONSE[i:i + step]))
+            self.assertEqual(items, expected)
+            self.assertTrue(parser.finished)
+            self.assertEqual(parser.text, self.RESPONSE)
+
+class TestExtractJSONObject(unittest.TestCase):
+    def test_fenced_answer_with_trailing_commentary(self):
+        content = (
+            'I found {several} variants:\n```json\n{"variants": [{"name": "KRAS G12D"}]}\n```\n'
+            'Entries marked {uncertain} need review.'
+        )
+        candidate = extract_json_object(content)
+        self.assertEqual(candidate.value, {"variants": [{"name": "KRAS G12D"}]})
+        self.assertFalse(candidate.repaired)
+
+    def test_prefers_object_with_expected_keys(self):
+        content = '{"note": "draft"} then {"variants": [], "clinical_evidence": []}'
+        self.assertEqual(extract_json_object(content).value, {"variants": [], "clinical_evidence": []})
+        self.assertEqual(extract_json_object('{"is_valid": true}').value, {"is_valid": True})
+
+    def test_repairs_truncated_final_element(self):
+        content = '{"variants": [{"name": "KRAS G12D", "drugs": ["a]b"]}, {"name": "NRAS Q6'
+        candidate = extract_json_object(content)
+        self.assertTrue(candidate.repaired)
+        self.assertEqual(candidate.value["variants"][0], {"name": "KRAS G12D", "drugs": ["a]b"]})
+
+    def test_unbalanced_prose_brace_and_no_json(self):
+        content = 'Caveat {unclosed. {"variants": [{"name": "TP53"}]}'
+        self.assertEqual(extract_json_object(content).value, {"variants": [{"name": "TP53"}]})
+        self.assertIsNone(extract_json_object("No structured output, sorry."))
+
+class TestDataValidator(unittest.TestCase):
+    def setUp(self):
+        self.validator = DataValidator()
+        self.good = {"description": "KRAS G12D", "variant_type": "mutation",
+                     "significance": "resistance", "confidence": 0.8, "drugs": []}
+
+    def test_dict_records_report_field_failures(self):
+        bad = {**self.good, "significance": "", "drugs": "bortezomib"}
+        failures = self.validator.check_records("variants", [self.good, bad])
+
+        self.assertEqual(failures, [
+            FieldFailure("variants", 1, "significance", "missing", "Missing required field: significance"),
+            FieldFailure("variants", 1, "drugs", "invalid_type", "Invalid type for drugs: expected list, got str"),
+        ])
+
+    def test_many_extractions_in_one_call(self):
+        extractions = [
+            CivicExtraction(variants=[self.good] * 3),
+            CivicExtraction(variants=[self.good, {"description": "NRAS Q61K"}]),
+        ]
+        failures = self.validator.check_extractions(extractions)
+        results = self.validator.validate_extractions(extractions)
+
+        self.assertEqual(failures[0], [])
+        self.assertEqual({f.field for f in failures[1]}, {"variant_type", "significance"})
+        self.assertTrue(results[0].is_valid)
+        self.assertFalse(results[1].is_valid)
+        self.assertIn("variant_type", results[1].suggestions[0])
+        self.assertEqual(self.validator.validate_extraction(extractions[1]), results[1])
+
+class TestConfidenceScoring(unittest.TestCase):
+    def setUp(self):
+        names = ConfidenceCalculator.METRIC_NAMES
+        self.records = [
+            {name: ((i + j) % 10) / 10 for j, name in enumerate(names)}
+            for i in range(25)
+        ]
+
+    def test_batch_matches_weighted_sum(self):
+        scores = ConfidenceCalculator.calculate_scores(self.records)
+        expected = [
+            round(sum(record[name] * weight for name, weight in ConfidenceCalculator.WEIGHTS.items()), 3)
+            for record in self.records
+        ]
+        self.assertEqual(scores.tolist(), expected)
+        self.assertEqual(
+            ConfidenceCalculator.calculate_score(ConfidenceMetrics(**self.records[3])), expected[3]
+        )
+
+    def test_columns_and_custom_weights(self):
+        columns = {name: [record[name] for record in self.records] for name in ConfidenceCalculator.METRIC_NAMES}
+        weights = {"evidence_strength": 1.0}
+
+        scores = ConfidenceCalculator.calculate_scores(columns, weights=weights)
+
+        self.assertEqual(scores.tolist(), [record["evidence_strength"] for record in self.records])
+        with self.assertRaises(ValueError):
+            ConfidenceCalculator.calculate_scores({**columns, "evidence_strength": [2.0] * 25})
+
+    def test_variant_scores(self):
+        variants = [
+            {"name": "KRAS G12D", "type": "mutation", "evidence_level": "a",
+             "supporting_data": ["trial 1", "trial 2"]},
+            {"name": "NRAS Q61K"},
+            {}
+        ]
+        scores = ConfidenceCalculator.score_variants(variants)
+        self.assertEqual(scores.tolist(), [0.78, 0.15, 0.1])
+
+class TestRequestPlanner(unittest.TestCase):
+    def setUp(self):
+        self.planner = RequestPlanner("claude-3-opus-20240229")
+
+    def test_estimate_tracks_text_size(self):
+        sentence = "Patients carrying KRAS p.G12D responded to bortezomib (n=42). "
+        self.assertGreater(estimate_tokens(sentence), len(sentence.split()))
+        self.assertEqual(estimate_tokens(sentence * 10), 10 * estimate_tokens(sentence))
+
+    def test_plan_clamps_output_and_rejects_oversize(self):
+        plan = self.planner.plan("Extract variants.", "KRAS G12D " * 100, max_tokens=10000)
+        self.assertTrue(plan.fits)
+        self.assertEqual(plan.max_tokens, 4096)
+        self.assertAlmostEqual(plan.estimated_cost, (plan.input_tokens * 15 + 4096 * 75) / 1e6)
+
+        small = RequestPlanner("test", limits=ModelLimits(1000, 500, 1.0, 1.0))
+        self.assertEqual(small.plan("prompt", "word " * 700).max_tokens, 950 - 700 - 1 - 16)
+        self.assertFalse(small.plan("prompt", "word " * 900).fits)
+        self.assertEqual(small.max_chunk_tokens("prompt", max_tokens=200), 1000 * 0.95 - 1 - 16 - 200)
+
+    def test_planner_accepts_every_chunk(self):
+        planner = RequestPlanner("test", limits=ModelLimits(16000, 4096, 15.0, 75.0))
+        prompt = "Extract variants."
+        chunk_tokens = planner.max_chunk_tokens(prompt)
+        # Dense notation estimates at well under four characters per token
+        text = "KRAS p.G12D (c.35G>A; 12/14, p<0.001) and TP53 R248* (n=42). " * 2000
+        chunks = TextChunker(max_tokens=chunk_tokens, overlap_tokens=500).split(text)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertTrue(planner.plan(prompt, chunk.text).fits)
+
+    def test_usage_scopes_are_separate(self):
+        plan = self.planner.plan("prompt", "text", max_tokens=100)
+
+        async def paper(requests: int):
+            with usage_scope() as usage:
+                await asyncio.gather(*(
+                    asyncio.to_thread(record_usage, self.planner, plan, {"input_tokens": 1000, "output_tokens": 100})
+                    for _ in range(requests)
+                ))
+                return usage
+
+        async def corpus():
+            return await asyncio.gather(paper(2), paper(3))
+
+        first, second = asyncio.run(corpus())
+        self.assertEqual((first["llm_requests"], second["llm_requests"]), (2, 3))
+        self.assertAlmostEqual(second["estimated_cost_usd"], 3 * (1000 * 15 + 100 * 75) / 1e6)
+        record_usage(self.planner, plan)  # Outside any scope: ignored
+
+class TestOutputSinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def paper(self, n: int):
+        return {
+            "variants": [{"name": f"KRAS G{n}D", "type": "mutation", "evidence": ["a", "b"]}],
+            "clinical_evidence": [{"drug": "bortezomib", "confidence": 0.8}] * n,
+            "molecular_data": [],
+            "metadata": {"pdf": {"page_count": n}},
+            "stats": {"num_variants": 1}
+        }
+
+    def test_jsonl_sink_batches_rows(self):
+        sink = JSONLSink(self.root, batch_size=6, flush_interval=3600)
+        sink.write("p1", self.paper(1))  # 3 rows buffered
+        self.assertFalse((self.root / "variants.jsonl").exists())
+        sink.write("p2", self.paper(2))  # 7 rows: flushed
+        self.assertEqual(sink.rows_written, 7)
+        sink.write("p3", self.paper(3))
+        sink.close()
+
+        corpus = load_corpus(self.root)
+        self.assertEqual([row["paper_id"] for row in corpus["variants"]], ["p1", "p2", "p3"])
+        self.assertEqual(len(corpus["clinical_evidence"]), 6)
+        self.assertEqual(corpus["variants"][0]["evidence"], ["a", "b"])
+        self.assertEqual(corpus["papers"][2]["metadata"]["pdf"]["page_count"], 3)
+
+    def test_reprocessed_papers_keep_latest_attempt(self):
+        with JSONLSink(self.root) as sink:
+            sink.write("p1", self.paper(2))
+            sink.write("p2", self.paper(1))
+            sink.write("p1", {**self.paper(1), "clinical_evidence": []}, attempt=2)
+        # An attempt interrupted mid-flush: item rows without their papers row
+        with JSONLSink(self.root) as sink:
+            sink._write_rows("variants", [{"paper_id": "p1", "attempt": 3, "name": "NRAS Q61K"}])
+
+        corpus = load_corpus(self.root)
+        self.assertEqual([(row["paper_id"], row["attempt"]) for row in corpus["papers"]], [("p2", 1), ("p1", 2)])
+        self.assertEqual([row["name"] for row in corpus["variants"]], ["KRAS G1D", "KRAS G1D"])
+        self.assertEqual([row["paper_id"] for row in corpus["clinical_evidence"]], ["p2"])
+
+    def test_reruns_without_manifest_get_new_attempts(self):
+        for _ in range(2):
+            with JSONLSink(self.root) as sink:
+                sink.write("p1", self.paper(2))
+                sink.write("p2", self.paper(1))
+
+        corpus = load_corpus(self.root)
+        self.assertEqual([(row["paper_id"], row["attempt"]) for row in corpus["papers"]], [("p1", 2), ("p2", 2)])
+        self.assertEqual(len(corpus["clinical_evidence"]), 3)
+
+    def test_async_writes_flush_off_the_event_loop(self):
+        sink = JSONLSink(self.root, batch_size=1)
+        write_rows = sink._write_rows
+        threads = []
+
+        def recording_write_rows(table, rows):
+            threads.append(threading.get_ident())
+            write_rows(table, rows)
+
+        sink._write_rows = recording_write_rows
+        flushed = []
+        sink.on_flush = flushed.extend
+
+        async def run():
+            await sink.awrite("p1", self.paper(1))
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(run())
+        self.assertTrue(threads)
+        self.assertNotIn(loop_thread, threads)
+        self.assertEqual(flushed, ["p1"])
+        self.assertEqual(len(load_corpus(self.root)["variants"]), 1)
+
+    def test_truncated_last_row_is_skipped_and_repaired(self):
+        with JSONLSink(self.root) as sink:
+            sink.write("p1", self.paper(1))
+        with open(self.root / "papers.jsonl", "ab") as f:
+            f.write(b'{"paper_id": "p2", "atte')
+        self.assertEqual([row["paper_id"] for row in load_corpus(self.root)["papers"]], ["p1"])
+
+        with JSONLSink(self.root) as sink:
+            sink.write("p2", self.paper(2))
+        self.assertEqual([row["paper_id"] for row in load_corpus(self.root)["papers"]], ["p1", "p2"])
+
+    def test_failed_flush_drops_the_batch(self):
+        sink = JSONLSink(self.root, batch_size=100)
+        flushed = []
+        sink.on_flush = flushed.extend
+        sink.write("p1", self.paper(1))
+        with mock.patch.object(sink, "_write_rows", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                sink.flush()
+        sink.write("p2", self.paper(2))
+        sink.close()
+
+        self.assertEqual(flushed, ["p2"])
+        self.assertEqual([row["paper_id"] for row in load_corpus(self.root)["papers"]], ["p2"])
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            create_sink("csv", self.root)
+
+    def test_parquet_sink_round_trip(self):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest("pyarrow not installed")
+        with ParquetSink(self.root, batch_size=2) as sink:
+            for n in range(1, 4):
+                sink.write(f"p{n}", self.paper(n))
+
+        corpus = load_corpus(self.root)
+        self.assertEqual(corpus["variants"].column("paper_id").to_pylist(), ["p1", "p2", "p3"])
+        self.assertEqual(corpus["clinical_evidence"].num_rows, 6)
+        self.assertEqual(json.loads(corpus["variants"].column("evidence")[0].as_py()), ["a", "b"])
+        self.assertEqual(corpus["clinical_evidence"].column("confidence")[0].as_py(), "0.8")
+
+    def test_parquet_columns_tolerate_mixed_types(self):
+        columns = ParquetSink._columns([
+            {"paper_id": "p1", "attempt": 2, "confidence": confidence, "frequency": frequency, "drugs": drugs}
+            for confidence, frequency, drugs in [(0.7, 0.3, ["a"]), (1, "rare", None), (None, True, [])]
+        ])
+        self.assertEqual(columns, {
+            "paper_id": ["p1", "p1", "p1"],
+            "attempt": [2, 2, 2],
+            "confidence": [0.7, 1, None],
+            "frequency": ["0.3", "rare", "true"],
+            "drugs": ['["a"]', None, "[]"]
+        })
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest("pyarrow not installed")
+        with ParquetSink(self.root) as sink:
+            sink.write("p1", {"variants": [{"frequency": 0.3}, {"frequency": "rare"}, {"frequency": None}]})
+
+        frequencies = load_corpus(self.root)["variants"].column("frequency").to_pylist()
+        self.assertEqual(frequencies, ["0.3", "rare", None])
+
+class TestRecords(unittest.TestCase):
+    def variant(self, **overrides):
+        variant = {
+            "description": "KRAS G12D", "variant_type": "missense", "significance": "pathogenic",
+            "frequency": "unknown", "drugs": ["bortezomib"], "evidence_level": "B",
+            "molecular_effect": "", "clinical_relevance": "", "resistance_mechanisms": [],
+            "biomarker_status": "positive", "confidence": 0.7, "citations": []
+        }
+        variant.update(overrides)
+        return variant
+
+    def test_dict_round_trip(self):
+        item = self.variant(validation={"is_valid": True})
+        record = VariantRecord.from_dict(item)
+        self.assertEqual(record.to_dict(), item)
+        self.assertEqual(list(record.to_dict()), list(item))
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertEqual(record.get("validation"), {"is_valid": True})
+
+    def test_enum_fields_are_interned(self):
+        first = VariantRecord.from_dict(json.loads(json.dumps(self.variant())))
+        second = VariantRecord.from_dict(json.loads(json.dumps(self.variant())))
+        self.assertIs(first.variant_type, second.variant_type)
+        self.assertIs(first.biomarker_status, second.biomarker_status)
+        second.variant_type = "".join(["mis", "sense"])
+        self.assertIs(first.variant_type, second.variant_type)
+
+    def test_extraction_round_trip(self):
+        extraction = CivicExtraction(
+            variants=[self.variant()],
+            clinical_evidence=[{"description": "Response: PR", "evidence_type": "Response", "drugs": []}],
+            metadata={"source": "test"}
+        )
+        records = extraction.to_records()
+        self.assertIsInstance(records["clinical_evidence"][0], ClinicalEvidenceRecord)
+        rebuilt = CivicExtraction.from_records(records, metadata=extraction.metadata)
+        self.assertEqual(rebuilt.variants, extraction.variants)
+        self.assertEqual(rebuilt.clinical_evidence[0]["evidence_type"], "Response")
+
+class TestSerialization(unittest.TestCase):
+    def extraction(self):
+        return CivicExtraction(
+            variants=[{"description": "KRAS G12D", "drugs": ["bortezomib"], "confidence": 0.8, "note": None}],
+            molecular_data=[{"pathway": "MAPK", "description": "Pathway: MAPK"}],
+            source=SourceReference(path="paper.pdf", content_hash="ab" * 32, page_spans=[(0, 10), (10, 25)]),
+            metadata={"timestamp": "2024-01-01 00:00:00", "confidence_scores": {"overall": 0.8}}
+        )
+
+    def test_round_trip(self):
+        extraction = self.extraction()
+        for validate in (True, False):
+            decoded = CivicExtraction.from_json(extraction.to_json(), validate=validate)
+            self.assertEqual(decoded, extraction)
+            self.assertEqual(decoded.source.page_of(12), 1)
+
+    def test_include_and_exclude(self):
+        extraction = self.extraction()
+        data = serialization.loads(extraction.to_json(exclude={"source", "metadata"}))
+        self.assertEqual(set(data), {"variants", "clinical_evidence", "molecular_data"})
+        data = serialization.loads(extraction.to_json(include={"variants": {0: {"description"}}}))
+        self.assertEqual(data, {"variants": [{"description": "KRAS G12D"}]})
+        # exclude_none only drops top-level fields, whichever form the spec takes
+        by_set = serialization.loads(extraction.to_json(include={"variants", "source"}))
+        by_dict = serialization.loads(extraction.to_json(include={"variants": True, "source": True}))
+        self.assertEqual(by_set, by_dict)
+        self.assertIsNone(by_set["variants"][0]["note"])
+        extraction.source = None
+        self.assertEqual(serialization.loads(extraction.to_json(include={"source": True})), {})
+        self.assertEqual(serialization.loads(extraction.model_dump_json(include={"metadata"})), {
+            "metadata": extraction.metadata
+        })
+
+    def test_stdlib_fallback_matches(self):
+        value = {"when": datetime(2024, 1, 2, 3, 4, 5), "score": np.float64(0.5), "items": ("a", 1)}
+        fast = serialization.loads(serialization.dumps(value))
+        with mock.patch.object(serialization, "orjson", None):
+            slow = serialization.loads(serialization.dumps(value))
+        self.assertEqual(fast, slow)
+        self.assertEqual(slow, {"when": "2024-01-02T03:04:05", "score": 0.5, "items": ["a", 1]})
+
+        value = {"score": float("nan"), "scores": np.array([1.0, np.inf]), "nested": [{"x": np.float64("nan")}]}
+        fast = serialization.loads(serialization.dumps(value))
+        with mock.patch.object(serialization, "orjson", None):
+            slow = serialization.loads(serialization.dumps(value))
+        self.assertEqual(fast, slow)
+        self.assertEqual(slow, {"score": None, "scores": [1.0, None], "nested": [{"x": None}]})
+
+class TestJobManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.manifest = JobManifest(self.root / "manifest.sqlite")
+
+    def tearDown(self):
+        self.manifest.close()
+        self.tmp_dir.cleanup()
+
+    def test_attempts_and_completion(self):
+        paper = self.root / "a.pdf"
+        self.manifest.register([paper])
+        self.assertEqual(self.manifest.stats(), {"pending": 1})
+        self.assertEqual(self.manifest.start(paper, "h1", "p1", "m1"), 1)
+        self.manifest.set_stage(paper, "extracting")
+        self.manifest.fail(paper, "RateLimitError")
+        self.assertEqual(self.manifest.get(paper)["stage"], "extracting")
+
+        self.assertEqual(self.manifest.start(paper, "h1", "p1", "m1"), 2)
+        self.assertFalse(self.manifest.is_complete(paper, "h1", "p1", "m1"))
+        self.manifest.finish(paper, "out.json")
+        self.assertTrue(self.manifest.is_complete(paper, "h1", "p1", "m1"))
+        self.assertFalse(self.manifest.is_complete(paper, "h2", "p1", "m1"))
+        self.assertEqual(self.manifest.stale("p2", "m1"), [str(paper.resolve())])
+        self.assertEqual(self.manifest.stale("p1", "m1"), [])
+
+    def test_flush_before_written_keeps_paper_done(self):
+        paper = self.root / "a.pdf"
+        self.manifest.start(paper, "h", "p", "m")
+        self.manifest.finish(paper)
+        self.manifest.written(paper, "corpus")
+        self.assertEqual(self.manifest.get(paper)["state"], JobManifest.DONE)
+
+if __name__ == '__main__':
+    unittest.main()